@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Benchmark coach and taunt latency against the local mock OpenAI server
+
+Drives the Tutor flow (position, move, tactic and puzzle explanations, and
+the game review) and the VS AI taunt flow through the real ChessCoach,
+AIOpponent and LLMGateway, with the mock server standing in for the API.
+For every feature it reports p50/p99 time to first token and time until
+the player sees text (the first streamed word, or the local fallback once
+the deadline passes). Engine output is scripted, so no Stockfish is needed:
+
+    python3 benchmark_llm.py [rounds] [median_ms] [p99_ms] [tokens_per_second] [error_rate]
+"""
+
+import math
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.ai_opponent import AIOpponent
+from ai.background import executor
+from ai.chess_coach import ChessCoach
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import LLMGateway
+from ai.local_coach import LocalCoach
+from ai.mock_openai import Latency, MockOpenAIServer
+from ui.tutor_screen import TutorScreen
+
+GAME = ['e4', 'e5', 'Nf3', 'Nc6', 'Bc4', 'Bc5', 'c3', 'Nf6', 'd4', 'exd4', 'cxd4', 'Bb4+',
+        'Bd2', 'Bxd2+', 'Nbxd2', 'd5', 'exd5', 'Nxd5', 'Qb3', 'Na5', 'Qa4+', 'c6']
+THEMES = [['fork'], ['pin'], ['mateIn2'], ['hangingPiece'], ['skewer'], ['discoveredAttack']]
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile (None for no values)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Recorder:
+    """Per-feature timings: first token, text on screen, and total"""
+
+    def __init__(self):
+        self.samples: Dict[str, List[Dict]] = {}
+
+    def add(self, feature: str, first_token: Optional[float], display: float, total: float, failed: bool):
+        self.samples.setdefault(feature, []).append(
+            {'first_token': first_token, 'display': display, 'total': total, 'failed': failed})
+
+    def summary(self) -> Dict[str, Dict]:
+        report = {}
+        for feature, samples in self.samples.items():
+            first = [s['first_token'] for s in samples if s['first_token'] is not None]
+            display = [s['display'] for s in samples]
+            report[feature] = {
+                'runs': len(samples),
+                'failed': sum(s['failed'] for s in samples),
+                'p50_first_token': percentile(first, 50),
+                'p99_first_token': percentile(first, 99),
+                'p50_display': percentile(display, 50),
+                'p99_display': percentile(display, 99),
+                'p50_total': percentile([s['total'] for s in samples], 50),
+            }
+        return report
+
+
+def measure_stream(recorder: Recorder, feature: str, fallback: str, fn: Callable, *args,
+                   deadline: float = TutorScreen.FIRST_WORD_DEADLINE):
+    """Time one streamed coach call the way TutorScreen shows it"""
+    first = []
+    arrived = threading.Event()
+
+    def on_token(text):
+        if not first:
+            first.append(time.monotonic() - start)
+            arrived.set()
+
+    start = time.monotonic()
+    future = executor().submit(fn, *args, on_token=on_token)
+    arrived.wait(deadline)
+    text = future.result()
+    total = time.monotonic() - start
+    failed = text == fallback  # The coach hands back the local text on errors
+    display = min(first[0], deadline) if first else deadline
+    recorder.add(feature, None if failed or not first else first[0], display, total, failed)
+
+
+def measure_taunt(recorder: Recorder, ai: AIOpponent, board: chess.Board, move: str):
+    """Time one move taunt the way the VS AI screen shows it"""
+    start = time.monotonic()
+    pending = ai.get_move_taunt_async(board, move)
+    text = pending.result()
+    display = time.monotonic() - start
+    failed = text in AIOpponent.TAUNTS['general'][1]  # Canned line: the LLM was late or failed
+    recorder.add('vs_ai/taunt', None, display, display, failed)
+
+
+def tutor_round(recorder: Recorder, coach: ChessCoach, local: LocalCoach, ply: int):
+    board_before = chess.Board()
+    for san in GAME[:ply]:
+        board_before.push_san(san)
+    move = GAME[ply]
+    board = board_before.copy()
+    board.push_san(move)
+    eval_data = {'score': 0.2 + ply / 100, 'best_move': GAME[ply + 1] if ply + 1 < len(GAME) else None,
+                 'evaluation_text': "Equal position"}
+    analysis = {'classification': 'mistake', 'eval_change': -0.8, 'best_move': 'h3'}
+    top_moves = [(eval_data['best_move'], 0.3), ('a3', 0.1), ('h3', 0.0)]
+    puzzle = {'rating': 1200 + ply * 25, 'themes': THEMES[ply % len(THEMES)] + ['middlegame']}
+    annotations = [{'ply': i, 'move_number': i // 2 + 1, 'color': 'white' if i % 2 == 0 else 'black',
+                    'san': san, 'best_move': san, 'eval_before': 0.2, 'eval_after': 0.2,
+                    'eval_change': -1.2 if i == ply else 0.0,
+                    'classification': 'mistake' if i == ply else 'best'}
+                   for i, san in enumerate(GAME[:ply + 1])]
+
+    measure_stream(recorder, 'tutor/explain_position', local.explain_position(board, eval_data),
+                   coach.explain_position, board, eval_data)
+    measure_stream(recorder, 'tutor/explain_move', local.explain_move(board_before, move, analysis, eval_data),
+                   coach.explain_move, board_before, move, analysis, eval_data)
+    measure_stream(recorder, 'tutor/explain_tactic', local.explain_tactic(board, eval_data['best_move'], top_moves),
+                   coach.explain_tactic, board, eval_data['best_move'], top_moves)
+    measure_stream(recorder, 'tutor/explain_puzzle', local.explain_puzzle(puzzle),
+                   coach.explain_puzzle, puzzle)
+    measure_stream(recorder, 'tutor/review_game', local.review_game(board, annotations),
+                   coach.review_game, board, annotations)
+    return board
+
+
+def run_benchmark(server: MockOpenAIServer, rounds: int = 10) -> Dict:
+    """
+    Run both flows against a started mock server
+
+    Args:
+        server: Running MockOpenAIServer
+        rounds: Moves played per flow
+
+    Returns:
+        {'features': per-feature summary, 'gateway': gateway stats, 'server': request counts}
+    """
+    # Generous limits: this measures latency, not the rate limiter
+    gateway = LLMGateway(server.client(), requests_per_minute=6000, tokens_per_minute=10_000_000)
+    coach = ChessCoach(cache=LLMCache(':memory:'), gateway=gateway)
+    local = LocalCoach(coach.style)
+    ai = AIOpponent(personality='spooky', gateway=gateway, cache=LLMCache(':memory:'))
+    ai.taunt_pool.fill()  # As AIOpponent.start() does at game start
+    recorder = Recorder()
+
+    for i in range(rounds):
+        ply = i % (len(GAME) - 1)
+        board = tutor_round(recorder, coach, local, ply)
+        measure_taunt(recorder, ai, board, GAME[ply])
+
+    return {
+        'features': recorder.summary(),
+        'gateway': gateway.stats(),
+        'server': {'requests': server.requests, 'errors': server.errors},
+        'usage': gateway.usage_report(),
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value * 1000:.0f}" if value is not None else "-"
+
+
+def main():
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    median = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.4
+    p99 = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 1.5
+    tokens_per_second = float(sys.argv[4]) if len(sys.argv) > 4 else 40.0
+    error_rate = float(sys.argv[5]) if len(sys.argv) > 5 else 0.0
+
+    print(f"⏱️  Mock API: first token p50 {median * 1000:.0f}ms / p99 {p99 * 1000:.0f}ms, "
+          f"{tokens_per_second:.0f} tokens/s, {error_rate:.0%} errors; {rounds} rounds\n")
+    with MockOpenAIServer(Latency(median, p99), tokens_per_second=tokens_per_second,
+                          error_rate=error_rate, seed=42) as server:
+        result = run_benchmark(server, rounds)
+
+    print(f"{'feature':24} {'runs':>4} {'fail':>4} {'ttft p50':>9} {'ttft p99':>9} "
+          f"{'shown p50':>9} {'shown p99':>9} {'total p50':>9}")
+    for feature, s in sorted(result['features'].items()):
+        print(f"{feature:24} {s['runs']:>4} {s['failed']:>4} {_ms(s['p50_first_token']):>9} "
+              f"{_ms(s['p99_first_token']):>9} {_ms(s['p50_display']):>9} {_ms(s['p99_display']):>9} "
+              f"{_ms(s['p50_total']):>9}")
+    print("\n📊 Gateway:")
+    for line in result['usage']:
+        print(f"   {line}")
+    print(f"\n✅ {result['server']['requests']} mock requests, {result['server']['errors']} injected errors")
+
+
+if __name__ == "__main__":
+    main()
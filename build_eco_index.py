@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Build the binary ECO index used to name openings
+
+With no arguments this rebuilds src/games/eco.bin from the bundled
+src/games/eco.tsv. For the full tables, download a.tsv ... e.tsv from
+https://github.com/lichess-org/chess-openings and pass them all:
+
+    python3 build_eco_index.py a.tsv b.tsv c.tsv d.tsv e.tsv
+"""
+
+import sys
+import time
+sys.path.insert(0, 'src')
+
+from games.eco_index import ECO_BIN, ECO_TSV, EcoIndex
+
+
+def main():
+    paths = sys.argv[1:] or [ECO_TSV]
+    print(f"📖 Building {ECO_BIN} from {', '.join(paths)}...")
+    start = time.time()
+    try:
+        index = EcoIndex.from_tsv(paths)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    index.save(ECO_BIN)
+    print(f"✅ Wrote {len(index)} openings in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""Build an offline puzzle pack from the Lichess puzzle database CSV
+
+Download lichess_db_puzzle.csv.zst from https://database.lichess.org,
+decompress it, then run:
+
+    python3 build_puzzle_pack.py lichess_db_puzzle.csv puzzles.pack
+"""
+
+import sys
+import time
+sys.path.insert(0, 'src')
+
+from puzzles.puzzle_pack import PuzzlePack
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 build_puzzle_pack.py <lichess_db_puzzle.csv> [puzzles.pack]")
+        sys.exit(1)
+
+    csv_path = sys.argv[1]
+    pack_path = sys.argv[2] if len(sys.argv) > 2 else 'puzzles.pack'
+
+    print(f"📦 Building {pack_path} from {csv_path}...")
+    start = time.time()
+    count = PuzzlePack.write(pack_path, PuzzlePack.iter_lichess_csv(csv_path))
+    print(f"✅ Wrote {count} puzzles in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
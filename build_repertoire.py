@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Build an opening repertoire for the trainer from a PGN file
+
+Every game and variation in the file becomes part of the repertoire:
+
+    python3 build_repertoire.py my_openings.pgn white [repertoire.rep]
+"""
+
+import sys
+import time
+sys.path.insert(0, 'src')
+
+import chess
+
+from games.repertoire import Repertoire
+from settings.config import Config
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[2].lower() not in ('white', 'black'):
+        print("Usage: python3 build_repertoire.py <openings.pgn> <white|black> [repertoire.rep]")
+        sys.exit(1)
+
+    pgn_path = sys.argv[1]
+    color = chess.WHITE if sys.argv[2].lower() == 'white' else chess.BLACK
+    rep_path = sys.argv[3] if len(sys.argv) > 3 else Config().get('repertoire', 'repertoire.rep')
+
+    print(f"📖 Building {rep_path} from {pgn_path}...")
+    start = time.time()
+    try:
+        repertoire = Repertoire.from_pgn(pgn_path, color)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    repertoire.save(rep_path)
+    print(f"✅ Wrote {len(repertoire)} positions and {len(repertoire.leaves())} lines "
+          f"in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
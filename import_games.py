@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Import a PGN archive (plain, .gz, .bz2 or .xz) into the local game library
+
+    python3 import_games.py my_games.pgn.gz [library_dir] [workers]
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+from games.library import GameLibrary
+from games.pgn_import import PgnImporter
+from settings.config import Config
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 import_games.py <games.pgn[.gz|.bz2|.xz]> [library_dir] [workers]")
+        sys.exit(1)
+
+    pgn_path = sys.argv[1]
+    library = sys.argv[2] if len(sys.argv) > 2 else Config().get('game_library', 'game_library')
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    print(f"📥 Importing {pgn_path} into {library}/...")
+    with GameLibrary(library) as lib:
+        store = lib.store
+        before = len(store)
+        lib.update_index()  # Games imported before the index existed
+        try:
+            importer = PgnImporter(store, workers=workers, position_index=lib.positions)
+            stats = importer.import_file(pgn_path)
+        except OSError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        except KeyboardInterrupt:
+            print(f"\n⚠️  Stopped; {len(store) - before} games were imported")
+            sys.exit(1)
+
+        print(f"✅ Imported {stats['games']} games in {stats['seconds']:.1f}s "
+              f"({stats['skipped']} skipped, {len(store)} in library, "
+              f"{len(lib.positions)} positions indexed)")
+
+        print("📖 Updating the opening explorer...")
+        added = lib.update_explorer()
+        print(f"✅ {added} games added to the opening explorer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Mine tactics puzzles from a PGN collection into the offline puzzle pack
+
+Needs Stockfish. Runs one engine per CPU core and checkpoints progress next
+to the PGN, so an interrupted run can simply be started again:
+
+    python3 mine_puzzles.py games.pgn puzzles.pack [workers]
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+from puzzles.tactic_miner import TacticMiner
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 mine_puzzles.py <games.pgn> [puzzles.pack] [workers]")
+        sys.exit(1)
+
+    pgn_path = sys.argv[1]
+    pack_path = sys.argv[2] if len(sys.argv) > 2 else 'puzzles.pack'
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    miner = TacticMiner(pgn_path, pack_path, workers=workers)
+    print(f"⛏️  Mining {pgn_path} into {pack_path}...")
+    try:
+        stats = miner.run()
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print(f"\n⚠️  Stopped after {miner.games} games; run again to resume")
+        sys.exit(1)
+
+    print(f"✅ Mined {stats['puzzles']} puzzles from {stats['games']} games "
+          f"in {stats['seconds']:.0f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Run the mock OpenAI server so the whole app can be played offline
+
+Start it, then launch the game with the client pointed at it:
+
+    python3 mock_openai_server.py [port] [median_ms] [p99_ms] [tokens_per_second] [error_rate]
+    OPENAI_API_KEY=mock OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python3 src/main.py
+"""
+
+import sys
+import time
+sys.path.insert(0, 'src')
+
+from ai.mock_openai import Latency, MockOpenAIServer
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    median = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.4
+    p99 = float(sys.argv[3]) / 1000 if len(sys.argv) > 3 else 1.5
+    tokens_per_second = float(sys.argv[4]) if len(sys.argv) > 4 else 40.0
+    error_rate = float(sys.argv[5]) if len(sys.argv) > 5 else 0.0
+
+    server = MockOpenAIServer(Latency(median, p99), tokens_per_second=tokens_per_second,
+                              error_rate=error_rate, port=port).start()
+    print(f"👻 Mock OpenAI API on {server.base_url} "
+          f"(first token p50 {median * 1000:.0f}ms / p99 {p99 * 1000:.0f}ms, "
+          f"{tokens_per_second:.0f} tokens/s, {error_rate:.0%} errors)")
+    print(f"   OPENAI_API_KEY=mock OPENAI_BASE_URL={server.base_url} python3 src/main.py")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+        print(f"\n✅ Served {server.requests} requests ({server.errors} injected errors)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,16 @@
 """AI Opponent with personality and trash talk"""
 
 import chess
-import os
+import random
 from typing import Dict, Optional
+from ai.background import PendingText, submit_text
 from ai.stockfish_engine import StockfishEngine
 from ai.chess_coach import ChessCoach
-
-try:
-    from openai import OpenAI
-    OPENAI_AVAILABLE = True
-except ImportError:
-    OPENAI_AVAILABLE = False
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import LLMGateway, default_gateway
+from ai.prompt_builder import EXTRA, REQUIRED, USEFUL, PromptBuilder
+from ai.taunt_pool import TauntPool
+from games.eco_index import opening_name
 
 
 class AIOpponent:
@@ -23,31 +23,82 @@ class AIOpponent:
         'frankenstein': 18
     }
     
-    def __init__(self, difficulty: str = 'intermediate', personality: str = 'spooky'):
+    TAUNT_DEADLINE = 2.0  # Seconds a dynamic taunt may take before a canned one is shown
+    
+    TAUNT_SYSTEM = ("You are a spooky, Halloween-themed chess AI called Frankenstein. You trash talk in a "
+                    "playful, ghostly way using emojis like 👻 🎃 💀. Keep responses to 1 short sentence "
+                    "(max 15 words). Be creative and funny, not mean. Use the game context to make "
+                    "relevant comments.")
+    
+    # Taunt kinds that come up many times a game; these are pre-generated in batches
+    POOLED_TAUNTS = ('blunder', 'mistake', 'good_move', 'general')
+    
+    # Taunt kind -> (LLM context, canned fallbacks)
+    TAUNTS = {
+        'opening': ("Generate a spooky opening taunt to start a chess game", [
+            "👻 Prepare to be haunted by my superior moves...",
+            "🎃 Your pieces will tremble before the Frankenstein AI!",
+            "👻 I've calculated your defeat in 1000 variations...",
+            "🎃 Even my worst move is better than your best!",
+            "👻 Boo! Did I scare you? Wait until you see my tactics..."
+        ]),
+        'blunder': ("The player just made a terrible blunder in chess. Mock them playfully", [
+            "💥 BLUNDER! Even a ghost could see that was terrible!",
+            "👻 Bahahaha! Did you just donate that piece to me?",
+            "🎃 That move made my circuits laugh!",
+            "👻 I've seen scarier moves in a graveyard!",
+            "💀 That blunder will haunt you forever!"
+        ]),
+        'mistake': ("The player made a mistake in chess. Tease them lightly", [
+            "👻 Ooh, that's a mistake! The spirits are disappointed...",
+            "🎃 Not your best move... I expected better!",
+            "👻 Tsk tsk... even a zombie could play better!",
+            "🎃 That move gave me the chills... of laughter!",
+            "👻 Mistake detected! My ghostly senses are tingling!"
+        ]),
+        'good_move': ("The player made a good chess move. Acknowledge it but stay confident", [
+            "👻 Hmm, not bad... for a mortal.",
+            "🎃 A decent move, but I've already calculated my response!",
+            "👻 Impressive... but futile!",
+            "🎃 Good move! Too bad it won't save you...",
+            "👻 You're learning... but I'm still 10 moves ahead!"
+        ]),
+        'general': ("You (the AI) just made a chess move. Say something spooky and confident", [
+            "👻 Behold my superior calculation!",
+            "🎃 This move will haunt your position!",
+            "👻 Can you feel the ghostly pressure?",
+            "🎃 My pieces move like phantoms in the night!",
+            "👻 Resistance is futile, mortal!"
+        ]),
+    }
+    
+    def __init__(self, difficulty: str = 'intermediate', personality: str = 'spooky',
+                 gateway: Optional[LLMGateway] = None, cache: Optional[LLMCache] = None):
         """
         Initialize AI opponent
         
         Args:
             difficulty: 'beginner', 'intermediate', 'strong', 'frankenstein'
             personality: 'spooky', 'normal', 'silent'
+            gateway: LLM gateway for dynamic taunts (defaults to the shared one)
+            cache: Response cache for the opponent's coach (defaults to the shared one)
         """
         self.difficulty = difficulty
         self.personality = personality
         depth = self.DIFFICULTY_DEPTHS.get(difficulty, 10)
         self.engine = StockfishEngine(depth=depth)
-        self.coach = ChessCoach(style='spooky' if personality == 'spooky' else 'normal')
+        # Taunts and the coach share one client and its rate limits
+        self.gateway = gateway or default_gateway()
+        self.coach = ChessCoach(style='spooky' if personality == 'spooky' else 'normal',
+                                cache=cache, gateway=self.gateway)
         self.trash_talk_enabled = personality == 'spooky'
-        
-        # Initialize OpenAI client if available
-        self.openai_client = None
-        if OPENAI_AVAILABLE and os.getenv('OPENAI_API_KEY'):
-            try:
-                self.openai_client = OpenAI()
-            except:
-                pass
+        self.taunt_pool = TauntPool(self.gateway, {kind: self.TAUNTS[kind][0] for kind in self.POOLED_TAUNTS},
+                                    self.TAUNT_SYSTEM)
     
     def start(self) -> bool:
-        """Start the AI opponent"""
+        """Start the AI opponent (and pre-generate this game's taunts)"""
+        if self.trash_talk_enabled:
+            self.taunt_pool.fill()
         return self.engine.start()
     
     def stop(self):
@@ -66,30 +117,28 @@ class AIOpponent:
     def _generate_dynamic_taunt(self, context: str, board: Optional[chess.Board] = None, 
                                move: Optional[str] = None) -> Optional[str]:
         """Generate dynamic trash talk using OpenAI with game context"""
-        if not self.openai_client:
+        if not self.gateway.available:
             return None
         
         try:
-            # Build context with game state
-            full_context = context
+            # Compact game context; taunts need the story of the game, not the full position
+            prompt = PromptBuilder('taunt')
             if board:
-                # Add position info
-                full_context += f"\n\nCurrent position: {board.fen()}"
-                if board.is_check():
-                    full_context += " (King is in check!)"
-                
-                # Add material count
                 material = self._get_material_balance(board)
                 if material != 0:
-                    full_context += f"\nMaterial balance: {'+' if material > 0 else ''}{material} (positive = AI winning)"
-            
-            if move:
-                full_context += f"\nMove played: {move}"
+                    prompt.add('Material', f"{'+' if material > 0 else ''}{material} (+ = AI winning)", USEFUL)
+                if board.is_check():
+                    prompt.add('Check', 'yes', USEFUL)
+                prompt.add('Opening', opening_name(board), EXTRA)
+                prompt.add('Pos', board.board_fen(), EXTRA)
+            prompt.add('Move played', move, REQUIRED)
+            full_context = prompt.ask(context).build()
             
-            response = self.openai_client.chat.completions.create(
+            response = self.gateway.complete(
                 model="gpt-4o-mini",  # Fastest model for quick responses
+                kind='taunt',
                 messages=[
-                    {"role": "system", "content": "You are a spooky, Halloween-themed chess AI called Frankenstein. You trash talk in a playful, ghostly way using emojis like 👻 🎃 💀. Keep responses to 1 short sentence (max 15 words). Be creative and funny, not mean. Use the game context to make relevant comments."},
+                    {"role": "system", "content": self.TAUNT_SYSTEM},
                     {"role": "user", "content": full_context}
                 ],
                 max_tokens=30,  # Reduced for faster responses
@@ -119,42 +168,49 @@ class AIOpponent:
         
         return balance
     
+    def _pending_taunt(self, kind: str, board: Optional[chess.Board] = None,
+                       move: Optional[str] = None) -> PendingText:
+        """Start a dynamic taunt in the background, with a canned line as fallback"""
+        context, canned = self.TAUNTS[kind]
+        fallback = random.choice(canned)
+        if not self.gateway.available:
+            return PendingText.done(fallback)
+        pooled = self.taunt_pool.take(kind) if kind in self.POOLED_TAUNTS else None
+        if pooled:
+            return PendingText.done(pooled)
+        # The board keeps changing on the main thread; give the worker its own copy
+        board = board.copy() if board is not None else None
+        return submit_text(self._generate_dynamic_taunt, context, board, move,
+                           fallback=fallback, deadline=self.TAUNT_DEADLINE)
+    
+    def get_opening_taunt_async(self) -> PendingText:
+        """Start the opening trash talk without waiting for it"""
+        if not self.trash_talk_enabled:
+            return PendingText.done("")
+        return self._pending_taunt('opening')
+    
     def get_opening_taunt(self) -> str:
         """Get opening trash talk"""
-        if not self.trash_talk_enabled:
-            return ""
-        
-        # Try dynamic generation first
-        dynamic = self._generate_dynamic_taunt("Generate a spooky opening taunt to start a chess game")
-        if dynamic:
-            return dynamic
-        
-        # Fallback to static taunts
-        taunts = [
-            "👻 Prepare to be haunted by my superior moves...",
-            "🎃 Your pieces will tremble before the Frankenstein AI!",
-            "👻 I've calculated your defeat in 1000 variations...",
-            "🎃 Even my worst move is better than your best!",
-            "👻 Boo! Did I scare you? Wait until you see my tactics..."
-        ]
-        import random
-        return random.choice(taunts)
+        return self.get_opening_taunt_async().result()
     
-    def get_move_taunt(self, board_after: chess.Board, my_move: str, 
-                       player_last_move: Optional[str] = None) -> str:
+    def get_move_taunt_async(self, board_after: chess.Board, my_move: str,
+                             player_last_move=None) -> PendingText:
         """
-        Get trash talk after making a move
+        Start trash talk about a move without waiting for the LLM
         
         Args:
             board_after: Board after AI's move
             my_move: AI's move
-            player_last_move: Player's last move (for analysis)
+            player_last_move: Player's last move, SAN or (from, to, SAN)
         
         Returns:
-            Trash talk message
+            PendingText; canned if the dynamic taunt misses TAUNT_DEADLINE
         """
         if not self.trash_talk_enabled:
-            return ""
+            return PendingText.done("")
+        
+        if isinstance(player_last_move, tuple):
+            player_last_move = player_last_move[-1]
         
         # Analyze player's last move if provided
         if player_last_move:
@@ -165,14 +221,29 @@ class AIOpponent:
             analysis = self.engine.analyze_move(board_before, player_last_move)
             
             if analysis['classification'] == 'blunder':
-                return self._get_blunder_taunt(board_after, player_last_move)
+                return self._pending_taunt('blunder', board_after, player_last_move)
             elif analysis['classification'] == 'mistake':
-                return self._get_mistake_taunt(board_after, player_last_move)
+                return self._pending_taunt('mistake', board_after, player_last_move)
             elif analysis['classification'] in ['best', 'good']:
-                return self._get_good_move_taunt(board_after, player_last_move)
+                return self._pending_taunt('good_move', board_after, player_last_move)
         
         # General taunts
-        return self._get_general_taunt(board_after, my_move)
+        return self._pending_taunt('general', board_after, my_move)
+    
+    def get_move_taunt(self, board_after: chess.Board, my_move: str, 
+                       player_last_move=None) -> str:
+        """
+        Get trash talk after making a move
+        
+        Args:
+            board_after: Board after AI's move
+            my_move: AI's move
+            player_last_move: Player's last move (for analysis)
+        
+        Returns:
+            Trash talk message
+        """
+        return self.get_move_taunt_async(board_after, my_move, player_last_move).result()
     
     def get_response_to_player_move(self, board: chess.Board, 
                                     player_move: str) -> str:
@@ -228,87 +299,6 @@ class AIOpponent:
                 "👻 Checkmate... but I let you win to give you false hope!"
             ]
         
-        import random
-        return random.choice(taunts)
-    
-    def _get_blunder_taunt(self, board: Optional[chess.Board] = None, 
-                          move: Optional[str] = None) -> str:
-        """Taunt for player's blunder"""
-        dynamic = self._generate_dynamic_taunt(
-            "The player just made a terrible blunder in chess. Mock them playfully",
-            board, move
-        )
-        if dynamic:
-            return dynamic
-        
-        taunts = [
-            "💥 BLUNDER! Even a ghost could see that was terrible!",
-            "👻 Bahahaha! Did you just donate that piece to me?",
-            "🎃 That move made my circuits laugh!",
-            "👻 I've seen scarier moves in a graveyard!",
-            "💀 That blunder will haunt you forever!"
-        ]
-        import random
-        return random.choice(taunts)
-    
-    def _get_mistake_taunt(self, board: Optional[chess.Board] = None,
-                          move: Optional[str] = None) -> str:
-        """Taunt for player's mistake"""
-        dynamic = self._generate_dynamic_taunt(
-            "The player made a mistake in chess. Tease them lightly",
-            board, move
-        )
-        if dynamic:
-            return dynamic
-        
-        taunts = [
-            "👻 Ooh, that's a mistake! The spirits are disappointed...",
-            "🎃 Not your best move... I expected better!",
-            "👻 Tsk tsk... even a zombie could play better!",
-            "🎃 That move gave me the chills... of laughter!",
-            "👻 Mistake detected! My ghostly senses are tingling!"
-        ]
-        import random
-        return random.choice(taunts)
-    
-    def _get_good_move_taunt(self, board: Optional[chess.Board] = None,
-                            move: Optional[str] = None) -> str:
-        """Taunt when player makes a good move"""
-        dynamic = self._generate_dynamic_taunt(
-            "The player made a good chess move. Acknowledge it but stay confident",
-            board, move
-        )
-        if dynamic:
-            return dynamic
-        
-        taunts = [
-            "👻 Hmm, not bad... for a mortal.",
-            "🎃 A decent move, but I've already calculated my response!",
-            "👻 Impressive... but futile!",
-            "🎃 Good move! Too bad it won't save you...",
-            "👻 You're learning... but I'm still 10 moves ahead!"
-        ]
-        import random
-        return random.choice(taunts)
-    
-    def _get_general_taunt(self, board: Optional[chess.Board] = None,
-                          move: Optional[str] = None) -> str:
-        """General trash talk"""
-        dynamic = self._generate_dynamic_taunt(
-            "You (the AI) just made a chess move. Say something spooky and confident",
-            board, move
-        )
-        if dynamic:
-            return dynamic
-        
-        taunts = [
-            "👻 Behold my superior calculation!",
-            "🎃 This move will haunt your position!",
-            "👻 Can you feel the ghostly pressure?",
-            "🎃 My pieces move like phantoms in the night!",
-            "👻 Resistance is futile, mortal!"
-        ]
-        import random
         return random.choice(taunts)
     
     def _get_blunder_reaction(self) -> str:
@@ -320,7 +310,6 @@ class AIOpponent:
             "💀 That piece is MINE now! Mwahahaha!",
             "👻 *spooky laughter* Thank you for the free piece!"
         ]
-        import random
         return random.choice(reactions)
     
     def _get_mistake_reaction(self) -> str:
@@ -332,7 +321,6 @@ class AIOpponent:
             "🎃 Interesting choice... for me!",
             "👻 My ghostly senses detect an error!"
         ]
-        import random
         return random.choice(reactions)
     
     def _get_inaccuracy_reaction(self) -> str:
@@ -344,7 +332,6 @@ class AIOpponent:
             "🎃 Acceptable, but not perfect!",
             "👻 My calculations show a superior alternative!"
         ]
-        import random
         return random.choice(reactions)
     
     def _get_good_move_reaction(self) -> str:
@@ -356,5 +343,4 @@ class AIOpponent:
             "🎃 The spirits approve... barely!",
             "👻 Not bad! This might be interesting after all..."
         ]
-        import random
         return random.choice(reactions)
@@ -0,0 +1,93 @@
+"""Run slow LLM calls off the move path
+
+LLM text (taunts, coach explanations) is requested on a small shared thread
+pool. Callers get a PendingText straight away and show the board first; the
+text is picked up when it is ready, and a canned line stands in if it misses
+its deadline.
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Callable, Optional
+
+MAX_WORKERS = 4
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def executor() -> ThreadPoolExecutor:
+    """The shared pool for LLM requests (created on first use)"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='llm')
+        return _executor
+
+
+class PendingText:
+    """
+    Text that is still being generated
+
+    ``result()`` waits at most until the deadline, then gives the fallback;
+    ``get()`` never waits. Empty results and errors also give the fallback.
+    """
+
+    def __init__(self, future: Future, fallback: str = "", deadline: Optional[float] = None):
+        """
+        Args:
+            future: Future resolving to the text (or None)
+            fallback: Canned text used when the real one is late or missing
+            deadline: Seconds from now the text may take (None = no limit)
+        """
+        self.future = future
+        self.fallback = fallback
+        self.expires = time.monotonic() + deadline if deadline is not None else None
+
+    @classmethod
+    def done(cls, text: str) -> 'PendingText':
+        """Already-known text (e.g. a canned line when the LLM is off)"""
+        future = Future()
+        future.set_result(text)
+        return cls(future, text)
+
+    def ready(self) -> bool:
+        """Whether the text arrived (or the deadline passed)"""
+        return self.future.done() or self.expired()
+
+    def expired(self) -> bool:
+        return self.expires is not None and time.monotonic() >= self.expires
+
+    def _value(self) -> str:
+        try:
+            return self.future.result(timeout=0) or self.fallback
+        except Exception:
+            return self.fallback
+
+    def get(self) -> Optional[str]:
+        """The text if it is ready, the fallback if it is late, else None"""
+        if self.future.done():
+            return self._value()
+        return self.fallback if self.expired() else None
+
+    def result(self) -> str:
+        """Wait until the text arrives or the deadline passes"""
+        timeout = None if self.expires is None else max(0.0, self.expires - time.monotonic())
+        try:
+            self.future.result(timeout=timeout)
+        except TimeoutError:
+            return self.fallback
+        except Exception:
+            pass
+        return self._value()
+
+    def cancel(self):
+        """Drop the request if it has not started yet"""
+        self.future.cancel()
+
+
+def submit_text(fn: Callable[..., Optional[str]], *args, fallback: str = "",
+                deadline: Optional[float] = None, **kwargs) -> PendingText:
+    """Run ``fn(*args, **kwargs)`` on the LLM pool"""
+    return PendingText(executor().submit(fn, *args, **kwargs), fallback, deadline)
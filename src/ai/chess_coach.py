@@ -1,60 +1,159 @@
 """LLM-powered chess coach using OpenAI"""
 
-import os
-from typing import Dict, Optional
+import threading
+from typing import Callable, Dict, List, Optional
 from openai import OpenAI
 import chess
 
+from ai.game_review import CRITICAL_LABELS, accuracy_counts, critical_moments, game_hash, move_label
+from ai.llm_cache import LLMCache, default_cache
+from ai.llm_gateway import INTERACTIVE, LLMGateway, default_gateway
+from ai.local_coach import LocalCoach
+from ai.prompt_builder import EXTRA, REQUIRED, USEFUL, PromptBuilder, tactics_summary
+from games.eco_index import opening_name
+
 
 class ChessCoach:
     """AI chess coach that explains moves and provides teaching"""
     
-    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini", style: str = "normal"):
+    TEMPERATURE = 0.7
+    
+    def __init__(self, api_key: Optional[str] = None, model: str = "gpt-4o-mini", style: str = "normal",
+                 cache: Optional[LLMCache] = None, gateway: Optional[LLMGateway] = None):
         """
         Initialize chess coach
         
         Args:
-            api_key: OpenAI API key (or uses OPENAI_API_KEY env var)
+            api_key: OpenAI API key (defaults to the shared gateway, which uses OPENAI_API_KEY)
             model: OpenAI model to use
             style: Coaching style ('normal', 'spooky', 'beginner', 'advanced')
+            cache: Response cache for repeatable explanations (defaults to the shared one)
+            gateway: LLM gateway to send requests through (defaults to the shared one)
         """
-        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
         self.model = model
         self.style = style
-        self.client = OpenAI(api_key=self.api_key) if self.api_key else None
+        if gateway is None:
+            gateway = LLMGateway(OpenAI(api_key=api_key, max_retries=1)) if api_key else default_gateway()
+        self.gateway = gateway
+        self.cache = cache if cache is not None else (default_cache() if gateway.available else None)
     
-    def explain_position(self, board: chess.Board, eval_data: Dict) -> str:
+    def _complete(self, prompt: str, max_tokens: int, cached: bool = False,
+                  on_token: Optional[Callable[[str], None]] = None,
+                  cancel: Optional[threading.Event] = None,
+                  kind: str = 'coach', priority: str = INTERACTIVE, fallback: str = "",
+                  cache_key: Optional[str] = None) -> str:
+        """
+        Send one coaching request
+        
+        Args:
+            prompt: User prompt
+            max_tokens: Completion limit
+            cached: Serve repeats of the same request from the response cache
+            on_token: Stream the reply, calling this with each piece of text as it arrives
+            cancel: Stop streaming once this is set (the partial text is returned)
+            kind: Call type for the gateway's stats
+            priority: Gateway priority (INTERACTIVE or PREFETCH)
+            fallback: Local explanation used if the request fails
+            cache_key: Cache under this key instead of the prompt text
+        """
+        system = self._get_system_prompt()
+        cache_key = cache_key or prompt
+        if cached and self.cache is not None:
+            hit = self.cache.get(self.model, system, cache_key, self.TEMPERATURE)
+            if hit is not None:
+                if on_token:
+                    on_token(hit)
+                return hit
+        
+        messages = [
+            {"role": "system", "content": system},
+            {"role": "user", "content": prompt}
+        ]
+        parts = []
+        try:
+            if on_token:
+                complete = self._stream(messages, max_tokens, parts, on_token, cancel, kind, priority)
+                text = ''.join(parts).strip()
+            else:
+                response = self.gateway.complete(
+                    messages,
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=self.TEMPERATURE,
+                    kind=kind,
+                    priority=priority
+                )
+                text = response.choices[0].message.content.strip()
+                complete = True
+        except Exception as e:
+            text = fallback or f"⚠️  Coach error: {str(e)}"
+            if on_token:
+                on_token(f"\n{text}" if parts else text)
+            return text
+        
+        # Errors and cancelled streams are never cached
+        if complete and cached and self.cache is not None:
+            self.cache.put(self.model, system, cache_key, self.TEMPERATURE, text)
+        return text
+    
+    def _stream(self, messages, max_tokens, parts, on_token, cancel, kind, priority) -> bool:
+        """Stream a completion into ``parts``; False if it was cancelled"""
+        stream = self.gateway.stream(
+            messages,
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=self.TEMPERATURE,
+            kind=kind,
+            priority=priority
+        )
+        try:
+            for chunk in stream:
+                if cancel is not None and cancel.is_set():
+                    return False
+                if not chunk.choices:
+                    continue
+                token = chunk.choices[0].delta.content
+                if not parts and token:
+                    token = token.lstrip()
+                if token:
+                    parts.append(token)
+                    on_token(token)
+            return True
+        finally:
+            close = getattr(stream, 'close', None)
+            if close:
+                close()  # Frees the gateway slot and drops the connection when cancelled early
+    
+    def explain_position(self, board: chess.Board, eval_data: Dict,
+                         on_token: Optional[Callable[[str], None]] = None,
+                         cancel: Optional[threading.Event] = None) -> str:
         """
         Explain the current position
         
         Args:
             board: Current board state
             eval_data: Stockfish evaluation data
+            on_token: Stream the explanation to this callback as it is written
+            cancel: Event that stops a stream early
         
         Returns:
             Human-friendly explanation
         """
-        if not self.client:
-            return "⚠️  OpenAI API key not set. Set OPENAI_API_KEY environment variable."
+        local = LocalCoach(self.style).explain_position(board, eval_data)
+        if not self.gateway.available:
+            return local
         
         prompt = self._build_position_prompt(board, eval_data)
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            return f"⚠️  Coach error: {str(e)}"
+        return self._complete(prompt, max_tokens=200, cached=True,
+                              on_token=on_token, cancel=cancel, kind='explain_position',
+                              fallback=local)
     
     def explain_move(self, board_before: chess.Board, move_san: str, 
-                     analysis: Dict, eval_before: Dict) -> str:
+                     analysis: Dict, eval_before: Dict,
+                     on_token: Optional[Callable[[str], None]] = None,
+                     cancel: Optional[threading.Event] = None,
+                     priority: str = INTERACTIVE) -> str:
         """
         Explain why a move is good or bad
         
@@ -63,31 +162,27 @@ class ChessCoach:
             move_san: Move in SAN notation
             analysis: Move analysis from Stockfish
             eval_before: Position evaluation before move
+            on_token: Stream the explanation to this callback as it is written
+            cancel: Event that stops a stream early
+            priority: Gateway priority (PREFETCH for speculative explanations)
         
         Returns:
             Explanation of the move
         """
-        if not self.client:
-            return "⚠️  OpenAI API key not set."
+        local = LocalCoach(self.style).explain_move(board_before, move_san, analysis, eval_before)
+        if not self.gateway.available:
+            return local
         
         prompt = self._build_move_explanation_prompt(board_before, move_san, analysis, eval_before)
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=150,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            return f"⚠️  Coach error: {str(e)}"
+        return self._complete(prompt, max_tokens=150,
+                              on_token=on_token, cancel=cancel,
+                              kind='explain_move', priority=priority, fallback=local)
     
     def explain_tactic(self, board: chess.Board, best_move: str, 
-                       top_moves: list) -> str:
+                       top_moves: list,
+                       on_token: Optional[Callable[[str], None]] = None,
+                       cancel: Optional[threading.Event] = None) -> str:
         """
         Explain tactical ideas in the position
         
@@ -95,64 +190,83 @@ class ChessCoach:
             board: Current board state
             best_move: Best move from engine
             top_moves: List of top moves with scores
+            on_token: Stream the explanation to this callback as it is written
+            cancel: Event that stops a stream early
         
         Returns:
             Tactical explanation
         """
-        if not self.client:
-            return "⚠️  OpenAI API key not set."
+        local = LocalCoach(self.style).explain_tactic(board, best_move, top_moves)
+        if not self.gateway.available:
+            return local
         
         prompt = self._build_tactic_prompt(board, best_move, top_moves)
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=200,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            return f"⚠️  Coach error: {str(e)}"
+        return self._complete(prompt, max_tokens=200, cached=True,
+                              on_token=on_token, cancel=cancel, kind='explain_tactic',
+                              fallback=local)
     
-    def explain_puzzle(self, puzzle_data: Dict) -> str:
+    def explain_puzzle(self, puzzle_data: Dict,
+                       on_token: Optional[Callable[[str], None]] = None,
+                       cancel: Optional[threading.Event] = None) -> str:
         """
         Explain a puzzle's theme and what to look for
         
         Args:
             puzzle_data: Puzzle information
+            on_token: Stream the explanation to this callback as it is written
+            cancel: Event that stops a stream early
         
         Returns:
             Puzzle explanation
         """
-        if not self.client:
-            return "⚠️  OpenAI API key not set."
+        local = LocalCoach(self.style).explain_puzzle(puzzle_data)
+        if not self.gateway.available:
+            return local
         
-        themes = ', '.join(puzzle_data.get('themes', []))
-        rating = puzzle_data.get('rating', 'unknown')
+        prompt = (PromptBuilder('explain_puzzle')
+                  .add('Puzzle rating', puzzle_data.get('rating'), USEFUL)
+                  .add('Themes', ', '.join(puzzle_data.get('themes', [])), REQUIRED)
+                  .ask("Give a 1-2 sentence hint on the pattern to look for; don't reveal the solution.")
+                  .build())
         
-        prompt = f"""Explain this chess puzzle briefly:
-Rating: {rating}
-Themes: {themes}
-
-Give a 1-2 sentence hint about what tactical pattern to look for, without giving away the solution."""
+        return self._complete(prompt, max_tokens=100, cached=True,
+                              on_token=on_token, cancel=cancel, kind='explain_puzzle',
+                              fallback=local)
+    
+    def review_game(self, board: chess.Board, annotations: List[Dict],
+                    on_token: Optional[Callable[[str], None]] = None,
+                    cancel: Optional[threading.Event] = None) -> str:
+        """
+        Debrief a whole game in one request
         
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self._get_system_prompt()},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=100,
-                temperature=0.7
-            )
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            return f"⚠️  Coach error: {str(e)}"
+        Args:
+            board: Board whose move stack is the game
+            annotations: Per-move engine annotations (see game_review.annotate_game)
+            on_token: Stream the review to this callback as it is written
+            cancel: Event that stops a stream early
+        
+        Returns:
+            Review with a summary, key moments and lessons (cached by game hash)
+        """
+        local = LocalCoach(self.style).review_game(board, annotations)
+        if not self.gateway.available:
+            return local
+        
+        prompt = self._build_review_prompt(board, annotations)
+        
+        return self._complete(prompt, max_tokens=350, cached=True,
+                              on_token=on_token, cancel=cancel, kind='review_game',
+                              fallback=local, cache_key=self._review_key(board))
+    
+    def cached_review(self, board: chess.Board) -> Optional[str]:
+        """A stored review of this game, if any (no engine work needed)"""
+        if self.cache is None:
+            return None
+        return self.cache.get(self.model, self._get_system_prompt(), self._review_key(board), self.TEMPERATURE)
+    
+    def _review_key(self, board: chess.Board) -> str:
+        return f"game-review {game_hash(board)}"
     
     def _get_system_prompt(self) -> str:
         """Get system prompt based on coaching style"""
@@ -169,50 +283,63 @@ Give a 1-2 sentence hint about what tactical pattern to look for, without giving
     
     def _build_position_prompt(self, board: chess.Board, eval_data: Dict) -> str:
         """Build prompt for position explanation"""
-        fen = board.fen()
-        score = eval_data.get('score', 0)
-        best_move = eval_data.get('best_move', 'unknown')
-        
-        return f"""Analyze this chess position briefly:
-FEN: {fen}
-Evaluation: {score:+.2f} (positive = white advantage)
-Best move: {best_move}
-Turn: {'White' if board.turn else 'Black'}
-
-In 2-3 sentences, explain:
-1. Who is better and why
-2. What the key idea or plan is"""
+        return (PromptBuilder('explain_position')
+                .add_position(board, eval_data)
+                .ask("In 2-3 sentences: who is better and why, and the key plan.")
+                .build())
     
     def _build_move_explanation_prompt(self, board: chess.Board, move_san: str,
                                       analysis: Dict, eval_before: Dict) -> str:
         """Build prompt for move explanation"""
         classification = analysis.get('classification', 'unknown')
-        eval_change = analysis.get('eval_change', 0)
-        best_move = analysis.get('best_move', 'unknown')
+        prompt = (PromptBuilder('explain_move')
+                  .add('Move', move_san, REQUIRED)
+                  .add('Verdict', classification, REQUIRED)
+                  .add('Eval change', f"{analysis.get('eval_change', 0):+.2f}", REQUIRED))
         
         if classification in ['best', 'good']:
-            return f"""The player just played {move_san}, which is a {classification} move.
-Evaluation change: {eval_change:+.2f}
-
-In 1-2 sentences, briefly explain why this move is good."""
+            prompt.ask("In 1-2 sentences, say why the move is good.")
         else:
-            return f"""The player just played {move_san}, which is a {classification}.
-Evaluation change: {eval_change:+.2f}
-Better move was: {best_move}
-
-In 2 sentences, explain:
-1. Why the played move is problematic
-2. Why the better move is superior"""
+            prompt.add('Better', analysis.get('best_move'), REQUIRED)
+            prompt.add('Tactics', tactics_summary(_after(board, move_san)), USEFUL)
+            prompt.ask("In 2 sentences: why the move is problematic and why the better move is superior.")
+        return prompt.build()
+    
+    def _build_review_prompt(self, board: chess.Board, annotations: List[Dict]) -> str:
+        """Build prompt for a whole-game review"""
+        result = board.result() if board.is_game_over() else "unfinished"
+        prompt = (PromptBuilder('review_game')
+                  .add('Game', f"{result}, {len(annotations)} plies", REQUIRED)
+                  .add('Opening', opening_name(board), USEFUL))
+        for color, counts in accuracy_counts(annotations).items():
+            errors = ', '.join(f"{counts[label]} {label}" for label in CRITICAL_LABELS if counts.get(label))
+            prompt.add(f"{color.capitalize()} errors", errors or "none", REQUIRED)
+        for i, moment in enumerate(critical_moments(annotations)):
+            prompt.add(move_label(moment),
+                       f"{moment['classification']} {moment['eval_change']:+.2f}, best {moment['best_move']}",
+                       REQUIRED if i < 3 else USEFUL)
+        prompt.add('Moves', ' '.join(move_label(a) if a['color'] == 'white' else a['san']
+                                     for a in annotations), EXTRA)
+        return prompt.ask("Review this game in three parts: 'Summary:' (2 sentences), "
+                          "'Key moments:' (one line per listed move) and 'Lessons:' (2 short bullets).").build()
     
     def _build_tactic_prompt(self, board: chess.Board, best_move: str,
                             top_moves: list) -> str:
         """Build prompt for tactical explanation"""
-        fen = board.fen()
-        moves_str = ', '.join([f"{move} ({score:+.2f})" for move, score in top_moves[:3]])
+        moves_str = ', '.join([f"{move} {score:+.2f}" for move, score in top_moves[:3]])
         
-        return f"""Explain the key tactical idea in this position:
-FEN: {fen}
-Best move: {best_move}
-Top moves: {moves_str}
+        return (PromptBuilder('explain_tactic')
+                .add_position(board, {'best_move': best_move})
+                .add('Top', moves_str, USEFUL)
+                .ask("In 2-3 sentences, name the key tactical pattern or strategic idea.")
+                .build())
+
 
-In 2-3 sentences, explain what tactical pattern or strategic idea is present."""
+def _after(board: chess.Board, move_san: str) -> chess.Board:
+    """Board after a SAN move (unchanged if the move does not parse)"""
+    after = board.copy(stack=False)
+    try:
+        after.push_san(move_san)
+    except ValueError:
+        pass
+    return after
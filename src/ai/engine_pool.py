@@ -0,0 +1,93 @@
+"""Pool of Stockfish worker processes for batch analysis"""
+
+import os
+import shutil
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.util import Finalize
+from typing import Callable, Iterable, Iterator, Optional
+
+import chess.engine
+
+# Engine owned by the current worker process (set by _init_worker)
+_worker_engine: Optional[chess.engine.SimpleEngine] = None
+
+
+def _init_worker(stockfish_path: str, hash_mb: int):
+    """Start one single-threaded engine per worker process"""
+    global _worker_engine
+    _worker_engine = chess.engine.SimpleEngine.popen_uci(stockfish_path)
+    try:
+        _worker_engine.configure({'Threads': 1, 'Hash': hash_mb})
+    except chess.engine.EngineError:
+        pass  # Not every UCI engine exposes these options
+    Finalize(None, _worker_engine.quit, exitpriority=10)
+
+
+def worker_engine() -> chess.engine.SimpleEngine:
+    """Engine of the calling worker process"""
+    if _worker_engine is None:
+        raise RuntimeError("worker_engine() called outside an EnginePool worker")
+    return _worker_engine
+
+
+class EnginePool:
+    """
+    Run analysis jobs across processes, each with its own Stockfish
+
+    Jobs are module-level functions that call worker_engine(). One engine
+    thread per process keeps throughput scaling with cores instead of
+    fighting over a shared engine.
+    """
+
+    def __init__(self, workers: Optional[int] = None, stockfish_path: str = "stockfish",
+                 hash_mb: int = 32):
+        """
+        Args:
+            workers: Worker process count (defaults to CPU count)
+            stockfish_path: Path to stockfish binary
+            hash_mb: Transposition table size per engine
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.stockfish_path = stockfish_path
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(stockfish_path, hash_mb)
+        )
+
+    @staticmethod
+    def is_available(stockfish_path: str = "stockfish") -> bool:
+        """Check that the engine binary can be found"""
+        return bool(shutil.which(stockfish_path)) or os.path.isfile(stockfish_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop all workers (and their engines)"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def imap_unordered(self, fn: Callable, items: Iterable,
+                       max_pending: Optional[int] = None) -> Iterator:
+        """
+        Yield fn(item) results as they complete
+
+        At most ``max_pending`` jobs are in flight, so ``items`` can be a lazy
+        generator over an arbitrarily large input.
+        """
+        max_pending = max_pending or self.workers * 2
+        pending = set()
+        for item in items:
+            pending.add(self._executor.submit(fn, item))
+            if len(pending) >= max_pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
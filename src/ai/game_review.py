@@ -0,0 +1,100 @@
+"""Engine annotations for a whole game, condensed for a one-call review
+
+A game is annotated with one engine evaluation per position (not two per
+move, as analyze_move does), classified with the engine's move labels,
+and reduced to its critical moments. ChessCoach.review_game turns that
+into a single LLM request; the answer is stored under the game's hash.
+"""
+
+import hashlib
+from typing import Callable, Dict, List, Optional
+
+import chess
+
+CRITICAL_LABELS = ('blunder', 'mistake', 'inaccuracy')
+
+
+def game_hash(board: chess.Board) -> str:
+    """Stable ID for the game that led to ``board`` (start position + moves)"""
+    start = board.root().fen()
+    moves = ' '.join(move.uci() for move in board.move_stack)
+    return hashlib.sha1(f"{start}|{moves}".encode('utf-8')).hexdigest()[:16]
+
+
+def annotate_game(stockfish, board: chess.Board, depth: int = 12,
+                  progress: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+    """
+    Engine annotation for every move played on ``board``
+
+    Args:
+        stockfish: Running StockfishEngine
+        board: Board whose move stack is the game
+        depth: Search depth per position (shallower than live analysis; the review covers every move)
+        progress: Called with (positions done, total) after each evaluation
+
+    Returns:
+        One dict per move: ply, move_number, color, san, best_move,
+        eval_before, eval_after (White's view), eval_change (mover's view)
+        and classification
+    """
+    replay = board.root()
+    moves = list(board.move_stack)
+    evals = [_white_view(stockfish.get_evaluation(replay, depth=depth), replay)]
+    sans = []
+    for i, move in enumerate(moves):
+        sans.append(replay.san(move))
+        replay.push(move)
+        evals.append(_white_view(stockfish.get_evaluation(replay, depth=depth), replay))
+        if progress:
+            progress(i + 1, len(moves))
+
+    annotations = []
+    replay = board.root()
+    for ply, (move, san) in enumerate(zip(moves, sans)):
+        mover = replay.turn
+        before, after = evals[ply], evals[ply + 1]
+        change = after['score'] - before['score']
+        if mover == chess.BLACK:
+            change = -change
+        annotations.append({
+            'ply': ply,
+            'move_number': replay.fullmove_number,
+            'color': 'white' if mover == chess.WHITE else 'black',
+            'san': san,
+            'best_move': before['best_move'],
+            'eval_before': before['score'],
+            'eval_after': after['score'],
+            'eval_change': change,
+            'classification': stockfish.classify_move(change, san == before['best_move']),
+        })
+        replay.push(move)
+    return annotations
+
+
+def _white_view(evaluation: Dict, board: chess.Board) -> Dict:
+    """The engine scores from the side to move; turn that into White's view"""
+    if board.turn == chess.BLACK:
+        return {**evaluation, 'score': -evaluation['score']}
+    return evaluation
+
+
+def critical_moments(annotations: List[Dict], limit: int = 5) -> List[Dict]:
+    """The costliest errors, in game order"""
+    errors = [a for a in annotations if a['classification'] in CRITICAL_LABELS]
+    worst = sorted(errors, key=lambda a: a['eval_change'])[:limit]
+    return sorted(worst, key=lambda a: a['ply'])
+
+
+def move_label(annotation: Dict) -> str:
+    """'12. Nxe5' for White, '12... Nxe5' for Black"""
+    dots = '.' if annotation['color'] == 'white' else '...'
+    return f"{annotation['move_number']}{dots} {annotation['san']}"
+
+
+def accuracy_counts(annotations: List[Dict]) -> Dict[str, Dict[str, int]]:
+    """Per side: how many moves got each classification"""
+    counts = {'white': {}, 'black': {}}
+    for a in annotations:
+        side = counts[a['color']]
+        side[a['classification']] = side.get(a['classification'], 0) + 1
+    return counts
@@ -0,0 +1,116 @@
+"""Persistent cache of LLM responses
+
+Completions are stored in SQLite under a hash of everything that shapes
+them: model, system prompt, user prompt and temperature (bucketed to one
+decimal). Entries expire after a TTL and the least recently used ones are
+evicted past a size cap, so repeat explanations come back instantly without
+an API call.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+DAY = 86400
+
+
+def cache_key(model: str, system: str, prompt: str, temperature: float) -> str:
+    """Stable key for one request"""
+    bucket = round(temperature, 1)
+    payload = json.dumps([model, system, prompt, bucket], ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class LLMCache:
+    """On-disk LRU cache with a TTL and hit-rate stats"""
+
+    CACHE_FILE = 'llm_cache.sqlite'
+
+    def __init__(self, path: str = CACHE_FILE, max_entries: int = 5000, ttl: float = 30 * DAY):
+        """
+        Args:
+            path: SQLite file (':memory:' for a throwaway cache)
+            max_entries: Entries kept before the least recently used are evicted
+            ttl: Seconds an entry stays valid
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()  # Background LLM threads share the connection
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""CREATE TABLE IF NOT EXISTS responses (
+            key TEXT PRIMARY KEY,
+            response TEXT NOT NULL,
+            created REAL NOT NULL,
+            accessed REAL NOT NULL)""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._db.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def get(self, model: str, system: str, prompt: str, temperature: float,
+            now: Optional[float] = None) -> Optional[str]:
+        """Cached response, or None (counted as a miss)"""
+        now = time.time() if now is None else now
+        key = cache_key(model, system, prompt, temperature)
+        with self._lock:
+            row = self._db.execute("SELECT response, created FROM responses WHERE key = ?",
+                                   (key,)).fetchone()
+            if row is None or row[1] < now - self.ttl:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, model: str, system: str, prompt: str, temperature: float, response: str,
+            now: Optional[float] = None):
+        """Store a response, evicting the least recently used past the cap"""
+        now = time.time() if now is None else now
+        key = cache_key(model, system, prompt, temperature)
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                             (key, response, now, now))
+            self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            count = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                self._db.execute("""DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed LIMIT ?)""",
+                                 (count - self.max_entries,))
+            self._db.commit()
+
+    def stats(self) -> Dict:
+        """{'hits', 'misses', 'hit_rate', 'entries'} for this session"""
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'entries': len(self),
+        }
+
+
+_default_cache = None
+
+
+def default_cache() -> Optional[LLMCache]:
+    """The shared on-disk cache (None if the file cannot be opened)"""
+    global _default_cache
+    if _default_cache is None:
+        try:
+            _default_cache = LLMCache()
+        except sqlite3.Error:
+            return None
+    return _default_cache
@@ -0,0 +1,311 @@
+"""Process-wide gateway for OpenAI requests
+
+Every LLM call in the app (taunts, coach explanations, prefetches) goes
+through one LLMGateway so they share a single client and its keep-alive
+connection pool. The gateway also applies request and token rate limits,
+lets interactive calls jump ahead of speculative ones, trips a circuit
+breaker when the API keeps failing, and records latency and token counts
+per call type.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, Optional
+
+try:
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+INTERACTIVE = 'interactive'  # Someone is waiting for the text
+PREFETCH = 'prefetch'  # Speculative; may be refused or kept waiting
+
+
+class GatewayError(Exception):
+    """A request the gateway refused (no client, rate limited, busy or circuit open)"""
+
+
+def estimate_tokens(messages: List[Dict]) -> int:
+    """Rough prompt size (about four characters per token)"""
+    return sum(len(m.get('content') or '') // 4 + 4 for m in messages)
+
+
+class TokenBucket:
+    """Refills continuously up to a burst size; callers hold the gateway lock"""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = burst or per_minute
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, reserve: float = 0.0) -> float:
+        """Seconds until ``amount`` can be taken while leaving ``reserve`` behind"""
+        self._refill()
+        needed = min(amount + reserve, self.capacity) - self.level
+        return max(0.0, needed / self.rate)
+
+    def take(self, amount: float):
+        self.level -= amount
+
+
+class CallStats:
+    """Latency and token totals for one call type"""
+
+    def __init__(self, window: int = 200):
+        self.calls = 0
+        self.errors = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.latencies = deque(maxlen=window)
+        self.first_token = deque(maxlen=window)
+
+    def summary(self) -> Dict:
+        def p50(values):
+            return sorted(values)[len(values) // 2] * 1000 if values else None
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'prompt_tokens': self.prompt_tokens,
+            'completion_tokens': self.completion_tokens,
+            'p50_ms': p50(self.latencies),
+            'p50_first_token_ms': p50(self.first_token),
+            'avg_prompt_tokens': self.prompt_tokens / self.calls if self.calls else 0,
+        }
+
+
+class LLMGateway:
+    """Shared client with rate limits, priorities, timeouts and a circuit breaker"""
+
+    def __init__(self, client=None, requests_per_minute: int = 60, tokens_per_minute: int = 60000,
+                 max_concurrent: int = 4, max_prefetch: int = 2, timeout: float = 20.0,
+                 failure_threshold: int = 5, reset_after: float = 30.0):
+        """
+        Args:
+            client: OpenAI client (None = LLM features off)
+            requests_per_minute: Request rate limit
+            tokens_per_minute: Prompt + completion token rate limit
+            max_concurrent: Requests in flight at once
+            max_prefetch: Of those, how many may be speculative
+            timeout: Default per-request timeout in seconds
+            failure_threshold: Consecutive failures that open the circuit
+            reset_after: Seconds the circuit stays open before a trial request
+        """
+        self.client = client
+        self.max_concurrent = max_concurrent
+        self.max_prefetch = min(max_prefetch, max_concurrent)
+        self.timeout = timeout
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.requests = TokenBucket(requests_per_minute, burst=max(1, requests_per_minute // 6))
+        self.tokens = TokenBucket(tokens_per_minute, burst=max(1, tokens_per_minute // 6))
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._waiting_interactive = 0
+        self._failures = 0
+        self._opened_at = None
+        self._trial = False
+        self._stats: Dict[str, CallStats] = {}
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None
+
+    def complete(self, messages: List[Dict], model: str = "gpt-4o-mini", max_tokens: int = 200,
+                 temperature: float = 0.7, kind: str = 'chat', priority: str = INTERACTIVE,
+                 timeout: Optional[float] = None):
+        """
+        Send one chat completion
+
+        Args:
+            messages: Chat messages
+            model: Model name
+            max_tokens: Completion limit
+            temperature: Sampling temperature
+            kind: Call type for the stats ('taunt', 'explain_move', ...)
+            priority: INTERACTIVE or PREFETCH
+            timeout: Seconds for the whole call, queueing included
+
+        Returns:
+            The client's response object
+
+        Raises:
+            GatewayError: The request was refused; client errors are re-raised as-is
+        """
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        prompt_tokens = estimate_tokens(messages)
+        self._acquire(priority, prompt_tokens + max_tokens, deadline)
+        start = time.monotonic()
+        try:
+            response = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=max(0.1, deadline - time.monotonic())
+            )
+        except Exception:
+            self._release(kind, start, ok=False)
+            raise
+        usage = getattr(response, 'usage', None)
+        self._release(kind, start, ok=True,
+                      prompt_tokens=getattr(usage, 'prompt_tokens', None) or prompt_tokens,
+                      completion_tokens=getattr(usage, 'completion_tokens', None) or 0)
+        return response
+
+    def stream(self, messages: List[Dict], model: str = "gpt-4o-mini", max_tokens: int = 200,
+               temperature: float = 0.7, kind: str = 'chat', priority: str = INTERACTIVE,
+               timeout: Optional[float] = None) -> Iterator:
+        """
+        Stream a chat completion chunk by chunk (same arguments as complete)
+
+        Closing the iterator early cancels the request and frees its slot
+        without counting as a failure.
+        """
+        timeout = timeout or self.timeout
+        deadline = time.monotonic() + timeout
+        prompt_tokens = estimate_tokens(messages)
+        self._acquire(priority, prompt_tokens + max_tokens, deadline)
+        start = time.monotonic()
+        first_token = None
+        pieces = 0
+        failed = False
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                timeout=max(0.1, deadline - time.monotonic()),
+                stream=True
+            )
+            try:
+                for chunk in stream:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        if first_token is None:
+                            first_token = time.monotonic() - start
+                        pieces += 1  # About one token per delta
+                    yield chunk
+            finally:
+                close = getattr(stream, 'close', None)
+                if close:
+                    close()
+        except GeneratorExit:
+            raise  # Cancelled by the caller
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self._release(kind, start, ok=not failed, prompt_tokens=prompt_tokens,
+                          completion_tokens=pieces, first_token=first_token)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Per call type: calls, errors, token totals and median latencies"""
+        with self._cond:
+            return {kind: s.summary() for kind, s in self._stats.items()}
+
+    def usage_report(self) -> List[str]:
+        """One line per call type: calls, tokens in/out and median latency"""
+        lines = []
+        for kind, s in sorted(self.stats().items()):
+            latency = f"{s['p50_ms']:.0f}ms" if s['p50_ms'] is not None else "-"
+            lines.append(f"{kind}: {s['calls']} calls, {s['prompt_tokens']} prompt / "
+                         f"{s['completion_tokens']} completion tokens, p50 {latency}")
+        return lines
+
+    def circuit_open(self) -> bool:
+        with self._cond:
+            return self._opened_at is not None
+
+    def _acquire(self, priority: str, cost: int, deadline: float):
+        """Wait for a slot and rate budget (prefetch waits behind interactive callers)"""
+        if not self.client:
+            raise GatewayError("OpenAI API key not set")
+        interactive = priority == INTERACTIVE
+        limit = self.max_concurrent if interactive else self.max_prefetch
+        # Speculative calls leave part of each bucket for interactive ones
+        reserve = 0.0 if interactive else 0.5
+        with self._cond:
+            if interactive:
+                self._waiting_interactive += 1
+            try:
+                while True:
+                    trial = self._check_circuit()
+                    wait = max(self.requests.wait_time(1, reserve * self.requests.capacity),
+                               self.tokens.wait_time(cost, reserve * self.tokens.capacity))
+                    slot = self._in_flight < limit and (interactive or not self._waiting_interactive)
+                    if slot and wait == 0:
+                        # Only a caller that actually gets to send can be the half-open trial
+                        self._trial = trial
+                        self.requests.take(1)
+                        self.tokens.take(cost)
+                        self._in_flight += 1
+                        return
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise GatewayError("LLM gateway busy (rate limit or concurrency)")
+                    self._cond.wait(min(remaining, wait) if slot else remaining)
+            finally:
+                if interactive:
+                    self._waiting_interactive -= 1
+
+    def _check_circuit(self) -> bool:
+        """Raise while the circuit is open; True if a request now would be the half-open trial"""
+        # Caller holds the lock
+        if self._opened_at is None:
+            return False
+        if time.monotonic() - self._opened_at < self.reset_after or self._trial:
+            raise GatewayError("LLM temporarily unavailable (circuit open)")
+        return True  # Half-open: let one request test the API
+
+    def _release(self, kind: str, start: float, ok: bool, prompt_tokens: int = 0,
+                 completion_tokens: int = 0, first_token: Optional[float] = None):
+        with self._cond:
+            self._in_flight -= 1
+            stats = self._stats.setdefault(kind, CallStats())
+            stats.calls += 1
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            if ok:
+                stats.latencies.append(time.monotonic() - start)
+                if first_token is not None:
+                    stats.first_token.append(first_token)
+                self._failures = 0
+                self._opened_at = None
+            else:
+                stats.errors += 1
+                self._failures += 1
+                if self._trial or self._failures >= self.failure_threshold:
+                    self._opened_at = time.monotonic()
+            self._trial = False
+            self._cond.notify_all()
+
+
+_default_gateway = None
+_default_lock = threading.Lock()
+
+
+def default_gateway() -> LLMGateway:
+    """The shared gateway (without a client when OPENAI_API_KEY is unset)"""
+    global _default_gateway
+    with _default_lock:
+        if _default_gateway is None:
+            client = None
+            if OPENAI_AVAILABLE and os.getenv('OPENAI_API_KEY'):
+                try:
+                    # One client = one pooled keep-alive HTTP connection set; the
+                    # gateway does its own timeouts, so keep the SDK's retries short
+                    client = OpenAI(max_retries=1)
+                except Exception:
+                    client = None
+            _default_gateway = LLMGateway(client)
+        return _default_gateway
@@ -0,0 +1,354 @@
+"""Rule-based coach that explains positions without an LLM
+
+Turns engine output (score, best move or PV, the move classification) and a
+few board features (hanging pieces, forks, pins, mate threats) into short
+templated explanations in each coach style. It runs offline in well under a
+millisecond, so it stands in whenever the LLM is off, failing or slow.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import chess
+
+from ai.game_review import CRITICAL_LABELS, accuracy_counts, critical_moments, move_label
+
+PIECE_VALUES = {
+    chess.PAWN: 1,
+    chess.KNIGHT: 3,
+    chess.BISHOP: 3,
+    chess.ROOK: 5,
+    chess.QUEEN: 9,
+    chess.KING: 100,
+}
+
+# Sentence templates per coach style. Features are worded for the player being
+# coached; a '<key>_opponent' entry, where present, is used when the feature
+# belongs to the other side instead
+TEMPLATES = {
+    'normal': {
+        'verdict': "{verdict}.",
+        'plan': "The key idea is {move}.",
+        'line': "A likely continuation is {line}.",
+        'hanging': "The {piece} on {square} is hanging.",
+        'fork': "The {piece} on {square} is forking the {targets}.",
+        'pin': "The {piece} on {square} is pinned to its king.",
+        'mate_threat': "Watch out: {side} threatens mate with {move}.",
+        'mate_in_one': "There is mate in one with {move}!",
+        'best': "{move} is the best move - exactly what the engine wanted.",
+        'good': "{move} is a good move that keeps the balance ({change:+.2f}).",
+        'bad': "{move} is {article} {label} ({change:+.2f}); {best} was stronger.",
+        'puzzle': "Look for {themes}.",
+        'quiet': "No immediate tactics - improve your worst piece.",
+    },
+    'spooky': {
+        'verdict': "👻 The spirits whisper: {verdict_lower}.",
+        'plan': "🎃 Summon {move} to haunt the position.",
+        'line': "The séance reveals {line}.",
+        'hanging': "💀 The {piece} on {square} is left for the ghosts!",
+        'fork': "👻 The {piece} on {square} haunts the {targets} at once.",
+        'pin': "🕸️ The {piece} on {square} is trapped in a web before its king.",
+        'mate_threat': "💀 Beware - {side} plots mate with {move}!",
+        'mate_in_one': "👻 The grave is dug: {move} is mate!",
+        'best': "👻 {move} - even the ghosts approve.",
+        'good': "🎃 {move} keeps the spirits calm ({change:+.2f}).",
+        'bad': "💀 {move} is {article} {label} ({change:+.2f}); {best} would have scared them more.",
+        'puzzle': "👻 Sense the {themes} lurking here...",
+        'quiet': "🕯️ All is quiet... for now. Bring your sleepiest piece to life.",
+    },
+    'beginner': {
+        'verdict': "{verdict}.",
+        'plan': "A good move here is {move}.",
+        'line': "The game might go {line}.",
+        'hanging': "Careful! Your opponent can win the {piece} on {square} for free.",
+        'hanging_opponent': "The {piece} on {square} is unprotected - you can win it for free!",
+        'fork': "The {piece} on {square} attacks two things at once: the {targets}.",
+        'pin': "The {piece} on {square} can't move, or its king would be in check.",
+        'mate_threat': "You threaten to checkmate next move with {move}!",
+        'mate_threat_opponent': "Danger! {side} can checkmate next move with {move}.",
+        'mate_in_one': "You can checkmate right now with {move}!",
+        'mate_in_one_opponent': "Danger! {side} can checkmate right now with {move}.",
+        'best': "{move} - great job, that's the best move!",
+        'good': "{move} is a fine move.",
+        'bad': "{move} was {article} {label}. Next time try {best}.",
+        'puzzle': "Hint: look for {themes}.",
+        'quiet': "No tricks right now - bring out a piece that isn't doing much.",
+    },
+    'advanced': {
+        'verdict': "{verdict} ({score:+.2f}).",
+        'plan': "Engine choice: {move}.",
+        'line': "PV: {line}.",
+        'hanging': "{piece_cap} {square} en prise.",
+        'fork': "{piece_cap} {square} forks {targets}.",
+        'pin': "{piece_cap} {square} absolutely pinned.",
+        'mate_threat': "{side} threatens {move}.",
+        'mate_in_one': "{move} available.",
+        'best': "{move}: engine's first choice.",
+        'good': "{move}: within tolerance ({change:+.2f}).",
+        'bad': "{move}?! {label_cap} ({change:+.2f}); {best} preferred.",
+        'puzzle': "Motifs: {themes}.",
+        'quiet': "No forcing tactics; maneuvering position.",
+    },
+}
+
+
+def _value(piece: chess.Piece) -> int:
+    return PIECE_VALUES[piece.piece_type]
+
+
+def hanging_pieces(board: chess.Board, color: chess.Color) -> List[chess.Square]:
+    """Pieces of ``color`` that are attacked and undefended, or attacked by something cheaper"""
+    hanging = []
+    for square in chess.SquareSet(board.occupied_co[color] & ~board.kings):
+        attackers = board.attackers(not color, square)
+        if not attackers:
+            continue
+        value = _value(board.piece_at(square))
+        cheapest = min(_value(board.piece_at(a)) for a in attackers)
+        if cheapest < value or not board.attackers(color, square):
+            hanging.append(square)
+    return hanging
+
+
+def forks(board: chess.Board, color: chess.Color) -> List[Tuple[chess.Square, List[chess.Square]]]:
+    """Pieces of ``color`` attacking two or more enemy pieces worth taking"""
+    found = []
+    for square in chess.SquareSet(board.occupied_co[color]):
+        value = _value(board.piece_at(square))
+        targets = []
+        for target in board.attacks(square) & board.occupied_co[not color]:
+            piece = board.piece_at(target)
+            if _value(piece) > value or not board.attackers(not color, target):
+                targets.append(target)
+        if len(targets) >= 2:
+            found.append((square, targets))
+    return found
+
+
+def pins(board: chess.Board, color: chess.Color) -> List[chess.Square]:
+    """Pieces of ``color`` pinned to their own king"""
+    return [square for square in chess.SquareSet(board.occupied_co[color] & ~board.kings)
+            if board.is_pinned(color, square)]
+
+
+def mate_in_one(board: chess.Board) -> Optional[str]:
+    """A mating move for the side to move, in SAN"""
+    for move in board.legal_moves:
+        if board.gives_check(move):
+            board.push(move)
+            mate = board.is_checkmate()
+            board.pop()
+            if mate:
+                return board.san(move)
+    return None
+
+
+def mate_threat(board: chess.Board) -> Optional[str]:
+    """The mate the side *not* to move would play if it were their turn"""
+    if board.is_check():
+        return None
+    passed = board.copy(stack=False)
+    passed.push(chess.Move.null())
+    return mate_in_one(passed)
+
+
+def position_features(board: chess.Board) -> Dict:
+    """Tactical features for both sides (keys: hanging, forks, pins per color; mate, threat)"""
+    return {
+        'hanging': {color: hanging_pieces(board, color) for color in chess.COLORS},
+        'forks': {color: forks(board, color) for color in chess.COLORS},
+        'pins': {color: pins(board, color) for color in chess.COLORS},
+        'mate': mate_in_one(board),
+        'threat': mate_threat(board),
+    }
+
+
+def _verdict(score: float) -> str:
+    if score > 3.0:
+        return "White is winning"
+    if score > 1.0:
+        return "White is better"
+    if score > 0.3:
+        return "White is slightly better"
+    if score > -0.3:
+        return "The position is equal"
+    if score > -1.0:
+        return "Black is slightly better"
+    if score > -3.0:
+        return "Black is better"
+    return "Black is winning"
+
+
+class LocalCoach:
+    """Offline, deterministic stand-in for ChessCoach (same explain_* methods)"""
+
+    MAX_SENTENCES = 4
+
+    def __init__(self, style: str = 'normal'):
+        """
+        Args:
+            style: Coaching style ('normal', 'spooky', 'beginner', 'advanced')
+        """
+        self.style = style
+
+    def _say(self, key: str, opponent: bool = False, **fields) -> str:
+        """Fill a template; ``opponent`` picks the wording for the other side's feature"""
+        templates = TEMPLATES.get(self.style, TEMPLATES['normal'])
+        if opponent and key + '_opponent' in templates:
+            key += '_opponent'
+        return templates[key].format(**fields)
+
+    def _piece(self, board: chess.Board, square: chess.Square) -> Dict:
+        name = chess.piece_name(board.piece_at(square).piece_type)
+        return {'piece': name, 'piece_cap': name.capitalize(), 'square': chess.square_name(square)}
+
+    def _feature_sentences(self, board: chess.Board, player: Optional[chess.Color] = None) -> List[str]:
+        """
+        Most urgent features first: mates, then material, then pins
+
+        ``player`` is the side being coached (default: the side to move).
+        """
+        features = position_features(board)
+        mover, other = board.turn, not board.turn
+        if player is None:
+            player = mover
+        sentences = []
+        if features['mate']:
+            sentences.append(self._say('mate_in_one', opponent=mover != player,
+                                       side=chess.COLOR_NAMES[mover].capitalize(), move=features['mate']))
+        if features['threat']:
+            sentences.append(self._say('mate_threat', opponent=other != player,
+                                       side=chess.COLOR_NAMES[other].capitalize(), move=features['threat']))
+        for color in (mover, other):
+            for square, targets in features['forks'][color][:1]:
+                names = ' and '.join(chess.piece_name(board.piece_at(t).piece_type) for t in targets[:2])
+                sentences.append(self._say('fork', targets=names, **self._piece(board, square)))
+        for color in (mover, other):
+            for square in features['hanging'][color][:1]:
+                sentences.append(self._say('hanging', opponent=color != player, **self._piece(board, square)))
+        for square in features['pins'][mover][:1] + features['pins'][other][:1]:
+            sentences.append(self._say('pin', **self._piece(board, square)))
+        return sentences
+
+    def _line(self, board: chess.Board, pv) -> Optional[str]:
+        """First few PV moves in SAN (accepts Move objects or SAN strings)"""
+        if not pv:
+            return None
+        probe = board.copy(stack=False)
+        sans = []
+        try:
+            for move in list(pv)[:4]:
+                if isinstance(move, str):
+                    move = probe.parse_san(move)
+                sans.append(probe.san(move))
+                probe.push(move)
+        except ValueError:
+            pass
+        return ' '.join(sans) if len(sans) > 1 else None
+
+    def _join(self, sentences: List[str]) -> str:
+        return ' '.join(sentences[:self.MAX_SENTENCES])
+
+    def explain_position(self, board: chess.Board, eval_data: Dict, **_) -> str:
+        """Verdict, concrete tactics, then the engine's plan"""
+        score = eval_data.get('score', 0) or 0
+        verdict = _verdict(score)
+        if eval_data.get('mate'):
+            verdict = f"{eval_data.get('evaluation_text', 'Mate is on the board')}"
+        sentences = [self._say('verdict', verdict=verdict, verdict_lower=verdict[0].lower() + verdict[1:],
+                               score=score)]
+        tactics = self._feature_sentences(board)
+        sentences += tactics
+        if eval_data.get('best_move'):
+            sentences.append(self._say('plan', move=eval_data['best_move']))
+        line = self._line(board, eval_data.get('pv'))
+        if line:
+            sentences.append(self._say('line', line=line))
+        if not tactics and not eval_data.get('best_move'):
+            sentences.append(self._say('quiet'))
+        return self._join(sentences)
+
+    def explain_move(self, board_before: chess.Board, move_san: str, analysis: Dict,
+                     eval_before: Optional[Dict] = None, **_) -> str:
+        """Verdict on the move, then what it allowed or missed"""
+        label = analysis.get('classification', 'unknown')
+        change = analysis.get('eval_change', 0) or 0
+        best = analysis.get('best_move') or "another move"
+        if label == 'best':
+            sentences = [self._say('best', move=move_san)]
+        elif label == 'good':
+            sentences = [self._say('good', move=move_san, change=change)]
+        else:
+            article = 'an' if label[:1] in 'aeiou' else 'a'
+            sentences = [self._say('bad', move=move_san, label=label, label_cap=label.capitalize(),
+                                   article=article, change=change, best=best)]
+
+        try:
+            board_after = board_before.copy(stack=False)
+            board_after.push_san(move_san)
+        except ValueError:
+            return self._join(sentences)
+        if label not in ('best', 'good'):
+            # What the opponent can now do
+            sentences += self._feature_sentences(board_after, player=board_before.turn)
+        else:
+            # What the move set up for the player
+            mover = board_before.turn
+            for square, targets in forks(board_after, mover)[:1]:
+                names = ' and '.join(chess.piece_name(board_after.piece_at(t).piece_type) for t in targets[:2])
+                sentences.append(self._say('fork', targets=names, **self._piece(board_after, square)))
+        return self._join(sentences)
+
+    def explain_tactic(self, board: chess.Board, best_move: str, top_moves: list, **_) -> str:
+        """Concrete tactics, then the engine's choice"""
+        sentences = self._feature_sentences(board)
+        if best_move:
+            sentences.append(self._say('plan', move=best_move))
+        if not sentences:
+            sentences.append(self._say('quiet'))
+        return self._join(sentences)
+
+    def explain_puzzle(self, puzzle_data: Dict, **_) -> str:
+        """A hint from the puzzle's themes"""
+        themes = [t for t in puzzle_data.get('themes', [])
+                  if t not in ('short', 'long', 'veryLong', 'oneMove', 'middlegame', 'opening', 'endgame')]
+        if not themes:
+            return self._say('quiet')
+        words = ' or '.join(_theme_words(t) for t in themes[:2])
+        return self._say('puzzle', themes=words)
+
+    def review_game(self, board: chess.Board, annotations: List[Dict], **_) -> str:
+        """Error counts, the critical moments and a lesson from the commonest mistake"""
+        result = board.result() if board.is_game_over() else "unfinished"
+        counts = accuracy_counts(annotations)
+        totals = []
+        for color in ('white', 'black'):
+            errors = ', '.join(f"{counts[color][label]} {label}" for label in CRITICAL_LABELS
+                               if counts[color].get(label))
+            totals.append(f"{color.capitalize()}: {errors or 'no errors'}")
+        lines = [f"Summary: game {result} after {len(annotations)} plies. {'; '.join(totals)}."]
+
+        moments = critical_moments(annotations, limit=3)
+        if moments:
+            lines.append("Key moments:")
+            for a in moments:
+                label = a['classification']
+                article = 'an' if label[:1] in 'aeiou' else 'a'
+                lines.append("- " + self._say('bad', move=move_label(a), label=label,
+                                              label_cap=label.capitalize(), article=article,
+                                              change=a['eval_change'], best=a['best_move'] or "another move"))
+        lines.append("Lessons: " + ("check what each move leaves undefended before playing it."
+                                    if moments else "steady play - keep it up."))
+        return '\n'.join(lines)
+
+
+def _theme_words(theme: str) -> str:
+    """'mateIn2' -> 'mate in 2', 'hangingPiece' -> 'hanging piece'"""
+    words = []
+    for ch in theme:
+        if ch.isupper() or (ch.isdigit() and words and not words[-1][-1:].isdigit()):
+            words.append(ch.lower())
+        elif words:
+            words[-1] += ch
+        else:
+            words.append(ch)
+    return ' '.join(words)
@@ -0,0 +1,221 @@
+"""Local stand-in for the OpenAI chat completions endpoint
+
+Serves ``POST /v1/chat/completions`` (plain and ``stream=True`` server-sent
+events) on localhost, so the coach and the opponent's taunts can be timed
+and tested without an API key or a network. Latency before the first token,
+token rate and error injection are configurable; replies are filler words
+(or a JSON object of taunt lists when the prompt asks for JSON).
+
+Point the real client at it with ``MockOpenAIServer.client()``, or run
+``mock_openai_server.py`` and set ``OPENAI_BASE_URL`` for the whole app.
+"""
+
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+try:
+    import httpx
+    from openai import OpenAI
+    OPENAI_AVAILABLE = True
+except ImportError:
+    OPENAI_AVAILABLE = False
+
+WORDS = ("the knight eyes a weak square while your king still waits to castle so "
+         "trade the bishop keep the center closed and push the passed pawn").split()
+
+
+class Latency:
+    """Log-normal delay given its median and 99th percentile, in seconds"""
+
+    def __init__(self, median: float, p99: Optional[float] = None):
+        """
+        Args:
+            median: Typical delay
+            p99: Slow-tail delay (None = always the median)
+        """
+        self.median = median
+        self.p99 = p99
+        # z(0.99) = 2.326: the p99 sits that many sigmas above the median
+        self.sigma = math.log(p99 / median) / 2.326 if p99 and median and p99 > median else 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if not self.sigma:
+            return self.median
+        return rng.lognormvariate(math.log(self.median), self.sigma)
+
+
+class MockOpenAIServer:
+    """Chat completions endpoint with scripted latency and failures"""
+
+    def __init__(self, first_token: Optional[Latency] = None, tokens_per_second: float = 40.0,
+                 reply_tokens: int = 40, error_rate: float = 0.0, error_status: int = 500,
+                 host: str = '127.0.0.1', port: int = 0, seed: Optional[int] = None):
+        """
+        Args:
+            first_token: Delay before the response starts (default median 0.4s, p99 1.5s)
+            tokens_per_second: Generation speed after the first token
+            reply_tokens: Reply length in tokens (capped by the request's max_tokens)
+            error_rate: Fraction of requests answered with error_status
+            error_status: HTTP status of injected errors (429, 500, 503...)
+            host: Interface to bind
+            port: Port to bind (0 = any free port)
+            seed: Seed for the latency and error draws
+        """
+        self.first_token = first_token or Latency(0.4, 1.5)
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests = 0
+        self.errors = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), _handler(self))
+        self._httpd.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> 'MockOpenAIServer':
+        """Serve in a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='mock-openai', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def client(self, max_retries: int = 1):
+        """An OpenAI client aimed at this server (same retry setting as default_gateway)"""
+        if not OPENAI_AVAILABLE:
+            raise RuntimeError("openai package not installed")
+        # An explicit httpx client: older SDKs pass httpx options that newer httpx rejects
+        return OpenAI(api_key='mock', base_url=self.base_url, max_retries=max_retries,
+                      http_client=httpx.Client())
+
+    def __enter__(self) -> 'MockOpenAIServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _draw(self) -> Dict:
+        """Latency and fate of one request"""
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+            return {'fail': fail, 'delay': self.first_token.sample(self._rng),
+                    'offset': self._rng.randrange(len(WORDS))}
+
+    def reply(self, request: Dict, offset: int = 0) -> List[str]:
+        """Reply tokens for a request (one word per token)"""
+        prompt = (request.get('messages') or [{}])[-1].get('content') or ''
+        limit = request.get('max_tokens') or self.reply_tokens
+        if 'JSON object' in prompt:
+            text = _json_reply(prompt)
+            return [text[i:i + 4] for i in range(0, len(text), 4)]
+        count = max(1, min(limit, self.reply_tokens))
+        return [('' if i == 0 else ' ') + WORDS[(offset + i) % len(WORDS)] for i in range(count)]
+
+
+def _json_reply(prompt: str) -> str:
+    """Taunt lists for each ``category: context`` line of a batch prompt"""
+    lines = prompt.splitlines()
+    count = re.search(r'(\d+)', lines[-1])
+    count = int(count.group(1)) if count else 3
+    kinds = [line.split(':', 1)[0] for line in lines[:-1] if ':' in line]
+    return json.dumps({kind: [f"Mock {kind} taunt {i + 1}!" for i in range(count)] for kind in kinds})
+
+
+def _handler(server: MockOpenAIServer):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive, like the real API
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+            if not self.path.rstrip('/').endswith('/chat/completions'):
+                self._json(404, {'error': {'message': f"Unknown path {self.path}", 'type': 'invalid_request_error'}})
+                return
+            try:
+                request = json.loads(body or b'{}')
+            except ValueError:
+                self._json(400, {'error': {'message': "Invalid JSON", 'type': 'invalid_request_error'}})
+                return
+
+            draw = server._draw()
+            time.sleep(draw['delay'])
+            if draw['fail']:
+                self._json(server.error_status, {'error': {'message': "Injected failure", 'type': 'server_error'}})
+                return
+
+            tokens = server.reply(request, draw['offset'])
+            prompt_tokens = sum(len(m.get('content') or '') // 4 + 4 for m in request.get('messages', []))
+            completion = {
+                'id': f"chatcmpl-{uuid.uuid4().hex[:12]}",
+                'created': int(time.time()),
+                'model': request.get('model', 'mock'),
+            }
+            try:
+                if request.get('stream'):
+                    self._stream(completion, tokens)
+                else:
+                    time.sleep(len(tokens) / server.tokens_per_second)
+                    self._json(200, {
+                        **completion,
+                        'object': 'chat.completion',
+                        'choices': [{'index': 0, 'finish_reason': 'stop',
+                                     'message': {'role': 'assistant', 'content': ''.join(tokens)}}],
+                        'usage': {'prompt_tokens': prompt_tokens, 'completion_tokens': len(tokens),
+                                  'total_tokens': prompt_tokens + len(tokens)},
+                    })
+            except (BrokenPipeError, ConnectionResetError):
+                self.close_connection = True  # The client cancelled the stream
+
+        def _json(self, status: int, payload: Dict):
+            data = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _chunk(self, data: bytes):
+            self.wfile.write(f"{len(data):X}\r\n".encode('ascii') + data + b"\r\n")
+            self.wfile.flush()
+
+        def _event(self, completion: Dict, delta: Dict, finish: Optional[str] = None):
+            payload = {**completion, 'object': 'chat.completion.chunk',
+                       'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish}]}
+            self._chunk(f"data: {json.dumps(payload)}\n\n".encode('utf-8'))
+
+        def _stream(self, completion: Dict, tokens: List[str]):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/event-stream')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            self._event(completion, {'role': 'assistant', 'content': ''})
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(1.0 / server.tokens_per_second)
+                self._event(completion, {'content': token})
+            self._event(completion, {}, finish='stop')
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+
+    return Handler
@@ -0,0 +1,148 @@
+"""Speculative coach explanations for the moves a player is likely to make
+
+While the player thinks, the engine's top candidate moves are explained in
+the background. If the player then plays one of them and the engine agrees
+with the predicted verdict, the explanation is shown at once instead of
+being requested after the move.
+"""
+
+import threading
+from typing import Dict, Optional
+
+import chess
+
+from ai.background import executor
+from ai.llm_gateway import PREFETCH
+
+
+class ExplanationPrefetcher:
+    """Explain likely moves ahead of time, within a concurrency and request budget"""
+
+    CANDIDATES = 3  # Candidate moves explained per position (besides the best move)
+    SEARCH_DEPTH = 10  # Shallow search: the player's own analysis waits for the engine lock
+
+    def __init__(self, coach, stockfish, max_in_flight: int = 2, budget: int = 40):
+        """
+        Args:
+            coach: ChessCoach used for the explanations
+            stockfish: StockfishEngine supplying candidate moves
+            max_in_flight: Speculative requests allowed at the same time
+            budget: Speculative requests allowed for the whole session
+        """
+        self.coach = coach
+        self.stockfish = stockfish
+        self.budget = budget
+        self.requested = 0
+        self.hits = 0
+        self._slots = threading.BoundedSemaphore(max_in_flight)
+        # Re-entrant: cancelling a future in _drop runs its done-callback on this thread
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._fen = None
+        self._entries = {}  # san -> (classification, best_move, Future)
+        self._queue = []  # (board, san, analysis, eval_data) waiting for a free slot
+
+    def start(self, board: chess.Board, eval_data: Dict):
+        """Begin explaining candidates for this position (replacing any older one)"""
+        if not self.coach.gateway.available or self.requested >= self.budget:
+            return
+        with self._lock:
+            fen = board.fen()
+            if fen == self._fen:
+                return
+            self._drop()
+            self._fen = fen
+            generation = self._generation
+        executor().submit(self._run, generation, board.copy(), eval_data)
+
+    def stop(self):
+        """Abandon the current position's prefetches"""
+        with self._lock:
+            self._drop()
+            self._fen = None
+
+    def take(self, board_before: chess.Board, move_san: str, analysis: Dict) -> Optional[str]:
+        """The prefetched explanation for a played move, if it is ready and still fits"""
+        with self._lock:
+            if board_before.fen() != self._fen:
+                return None
+            entry = self._entries.get(move_san)
+        if entry is None:
+            return None
+        classification, best_move, future = entry
+        if (classification != analysis.get('classification') or best_move != analysis.get('best_move')
+                or not future.done() or future.cancelled()):
+            return None
+        try:
+            text = future.result()
+        except Exception:
+            return None
+        if not text or text.startswith("⚠️"):
+            return None
+        self.hits += 1
+        return text
+
+    def stats(self) -> Dict:
+        """{'requested', 'hits', 'hit_rate'} for this session"""
+        return {
+            'requested': self.requested,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.requested if self.requested else 0.0,
+        }
+
+    def _drop(self):
+        # Caller holds the lock; requests that have not started are cancelled
+        self._generation += 1
+        self._queue = []
+        for _, _, future in self._entries.values():
+            future.cancel()
+        self._entries = {}
+
+    def _current(self, generation: int) -> bool:
+        return generation == self._generation
+
+    def _run(self, generation: int, board: chess.Board, eval_data: Dict):
+        """Find candidates and queue their explanations"""
+        if not self._current(generation):
+            return  # The player moved before this job left the queue
+        top_moves = self.stockfish.get_top_moves(board, self.CANDIDATES + 1, depth=self.SEARCH_DEPTH)
+        if not top_moves:
+            return
+        best_move = eval_data.get('best_move')
+        best_score = top_moves[0][1]
+        queue = []
+        for san, score in top_moves:
+            if san == best_move:
+                continue  # Best moves are praised without the coach
+            # Same verdict the engine would give after the move, from the multipv scores
+            analysis = {
+                'classification': self.stockfish.classify_move(score - best_score, False),
+                'eval_change': score - best_score,
+                'best_move': best_move,
+            }
+            queue.append((board, san, analysis, eval_data))
+        with self._lock:
+            if not self._current(generation):
+                return
+            self._queue = queue
+        self._pump()
+
+    def _pump(self):
+        """Start queued explanations while slots are free; never waits for one"""
+        started = []
+        with self._lock:
+            while self._queue and self.requested < self.budget and self._slots.acquire(blocking=False):
+                board, san, analysis, eval_data = self._queue.pop(0)
+                self.requested += 1
+                future = executor().submit(self.coach.explain_move, board, san, analysis, eval_data,
+                                           priority=PREFETCH)
+                self._entries[san] = (analysis['classification'], analysis['best_move'], future)
+                started.append(future)
+        # Outside the lock: a future that is already done runs its callback right here
+        for future in started:
+            future.add_done_callback(self._finished)
+
+    def _finished(self, _future):
+        # A slot freed up: the next queued candidate (of the current position) takes it
+        self._slots.release()
+        self._pump()
@@ -0,0 +1,128 @@
+"""Compact, budgeted prompts for the coach and the opponent
+
+Prompts are built as short ``Key: value`` lines instead of prose. Every
+field has a priority, and the lowest-priority fields are dropped until the
+prompt fits its call type's token budget. Positions are summarised as the
+piece placement and side to move (no castling or clock fields), plus the
+material balance and any tactics LocalCoach spots.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import chess
+
+from ai.llm_gateway import estimate_tokens
+from ai.local_coach import PIECE_VALUES, position_features
+from games.eco_index import opening_name
+
+# Prompt token budgets per call type (the system prompt is not counted)
+BUDGETS = {
+    'explain_position': 110,
+    'explain_move': 70,
+    'explain_tactic': 110,
+    'explain_puzzle': 50,
+    'taunt': 70,
+    'taunt_batch': 160,
+    'review_game': 260,
+}
+
+REQUIRED = 0  # Never dropped
+USEFUL = 1
+EXTRA = 2  # First to go when over budget
+
+
+class PromptBuilder:
+    """Collect prioritised fields, then render them within a token budget"""
+
+    def __init__(self, kind: str, budget: Optional[int] = None):
+        """
+        Args:
+            kind: Call type (selects the default budget)
+            budget: Prompt token budget (overrides BUDGETS[kind])
+        """
+        self.kind = kind
+        self.budget = budget or BUDGETS.get(kind, 120)
+        self.fields: List[Tuple[str, str, int]] = []
+        self.task = ""
+        self.dropped: List[str] = []
+
+    def add(self, key: str, value, priority: int = USEFUL) -> 'PromptBuilder':
+        """Add a ``key: value`` line (skipped when value is empty)"""
+        if value not in (None, ''):
+            self.fields.append((key, str(value), priority))
+        return self
+
+    def ask(self, task: str) -> 'PromptBuilder':
+        """The instruction, always kept and placed last"""
+        self.task = task
+        return self
+
+    def add_position(self, board: chess.Board, eval_data: Optional[Dict] = None,
+                     tactics: bool = True) -> 'PromptBuilder':
+        """Compact position summary: placement, side to move, eval, opening, material, tactics"""
+        eval_data = eval_data or {}
+        self.add('Pos', f"{board.board_fen()} {'w' if board.turn else 'b'}", REQUIRED)
+        if 'score' in eval_data:
+            self.add('Eval', f"{eval_data['score']:+.2f} (+ = White)", REQUIRED)
+        self.add('Best', eval_data.get('best_move'), REQUIRED)
+        self.add('Opening', opening_name(board), EXTRA)
+        material = material_balance(board)
+        if material:
+            self.add('Material', f"{'White' if material > 0 else 'Black'} +{abs(material)}", USEFUL)
+        if tactics:
+            self.add('Tactics', tactics_summary(board), USEFUL)
+        return self
+
+    def _render(self, fields) -> str:
+        lines = [f"{key}: {value}" for key, value, _ in fields]
+        if self.task:
+            lines.append(self.task)
+        return '\n'.join(lines)
+
+    def build(self) -> str:
+        """The prompt, with optional fields dropped until it fits the budget"""
+        fields = list(self.fields)
+        self.dropped = []
+        prompt = self._render(fields)
+        while prompt_tokens(prompt) > self.budget:
+            optional = [f for f in fields if f[2] != REQUIRED]
+            if not optional:
+                break
+            victim = max(reversed(optional), key=lambda f: f[2])  # Lowest priority, latest first
+            fields.remove(victim)
+            self.dropped.append(victim[0])
+            prompt = self._render(fields)
+        return prompt
+
+
+def prompt_tokens(text: str) -> int:
+    """Token estimate matching the gateway's accounting"""
+    return estimate_tokens([{'content': text}])
+
+
+def material_balance(board: chess.Board) -> int:
+    """White's material minus Black's, in pawns"""
+    balance = 0
+    for piece_type in (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN):
+        value = PIECE_VALUES[piece_type]
+        balance += value * (len(board.pieces(piece_type, chess.WHITE)) - len(board.pieces(piece_type, chess.BLACK)))
+    return balance
+
+
+def tactics_summary(board: chess.Board) -> str:
+    """Terse list of what LocalCoach sees, e.g. 'mate Qxf7#; pin f7'"""
+    features = position_features(board)
+    notes = []
+    if features['mate']:
+        notes.append(f"mate {features['mate']}")
+    if features['threat']:
+        notes.append(f"threat {features['threat']}")
+    for color in chess.COLORS:
+        side = 'W' if color == chess.WHITE else 'B'
+        for square, targets in features['forks'][color][:1]:
+            notes.append(f"{side} fork {chess.square_name(square)}>{','.join(chess.square_name(t) for t in targets)}")
+        for square in features['hanging'][color][:2]:
+            notes.append(f"{side} hanging {chess.square_name(square)}")
+        for square in features['pins'][color][:1]:
+            notes.append(f"{side} pinned {chess.square_name(square)}")
+    return '; '.join(notes)
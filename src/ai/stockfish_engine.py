@@ -1,5 +1,7 @@
 """Stockfish chess engine integration"""
 
+import threading
+
 import chess
 import chess.engine
 from typing import Optional, Dict, List, Tuple
@@ -19,6 +21,9 @@ class StockfishEngine:
         self.stockfish_path = stockfish_path
         self.depth = depth
         self.engine: Optional[chess.engine.SimpleEngine] = None
+        # One command at a time: a new UCI search cancels the one in progress,
+        # and the prefetcher searches from a worker thread
+        self._lock = threading.RLock()
     
     def start(self):
         """Start the engine"""
@@ -31,9 +36,10 @@ class StockfishEngine:
     
     def stop(self):
         """Stop the engine"""
-        if self.engine:
-            self.engine.quit()
-            self.engine = None
+        with self._lock:
+            if self.engine:
+                self.engine.quit()
+                self.engine = None
     
     def get_best_move(self, board: chess.Board) -> Optional[str]:
         """
@@ -46,16 +52,20 @@ class StockfishEngine:
             return None
         
         try:
-            result = self.engine.play(board, chess.engine.Limit(depth=self.depth, time=5.0))
+            with self._lock:
+                result = self.engine.play(board, chess.engine.Limit(depth=self.depth, time=5.0))
             return board.san(result.move)
         except Exception as e:
             print(f"Stockfish error: {e}")
             return None
     
-    def get_evaluation(self, board: chess.Board) -> Dict:
+    def get_evaluation(self, board: chess.Board, depth: Optional[int] = None) -> Dict:
         """
         Get position evaluation
         
+        Args:
+            depth: Search depth for this call (defaults to the engine's depth)
+        
         Returns:
             {
                 'score': float (in pawns, positive = white advantage),
@@ -73,7 +83,8 @@ class StockfishEngine:
             }
         
         try:
-            info = self.engine.analyse(board, chess.engine.Limit(depth=self.depth, time=3.0))
+            with self._lock:
+                info = self.engine.analyse(board, chess.engine.Limit(depth=depth or self.depth, time=3.0))
             score = info['score'].relative
             
             # Extract score
@@ -120,9 +131,6 @@ class StockfishEngine:
         if not self.engine:
             return {'classification': 'unknown', 'eval_before': 0, 'eval_after': 0, 'eval_change': 0, 'best_move': None}
         
-        # Get evaluation before move
-        eval_before = self.get_evaluation(board_before)
-        
         # Make the move
         board_after = board_before.copy()
         try:
@@ -131,8 +139,10 @@ class StockfishEngine:
         except:
             return {'classification': 'illegal', 'eval_before': 0, 'eval_after': 0, 'eval_change': 0, 'best_move': None}
         
-        # Get evaluation after move
-        eval_after = self.get_evaluation(board_after)
+        # Both evaluations in one turn at the engine, so no other search slips in between
+        with self._lock:
+            eval_before = self.get_evaluation(board_before)
+            eval_after = self.get_evaluation(board_after)
         
         # Calculate change (from perspective of player who moved)
         score_before = eval_before['score'] if board_before.turn else -eval_before['score']
@@ -140,7 +150,7 @@ class StockfishEngine:
         eval_change = score_after - score_before
         
         # Classify move
-        classification = self._classify_move(eval_change, move_san == eval_before['best_move'])
+        classification = self.classify_move(eval_change, move_san == eval_before['best_move'])
         
         return {
             'classification': classification,
@@ -150,8 +160,8 @@ class StockfishEngine:
             'best_move': eval_before['best_move']
         }
     
-    def _classify_move(self, eval_change: float, is_best: bool) -> str:
-        """Classify move quality based on evaluation change"""
+    def classify_move(self, eval_change: float, is_best: bool) -> str:
+        """Classify move quality from the mover's evaluation change (also used for game review and prefetch)"""
         if is_best:
             return 'best'
         elif eval_change >= -0.1:
@@ -180,10 +190,14 @@ class StockfishEngine:
         else:
             return "Black is winning"
     
-    def get_top_moves(self, board: chess.Board, num_moves: int = 3) -> List[Tuple[str, float]]:
+    def get_top_moves(self, board: chess.Board, num_moves: int = 3,
+                      depth: Optional[int] = None) -> List[Tuple[str, float]]:
         """
         Get top N moves with their evaluations
         
+        Args:
+            depth: Search depth for this call (defaults to the engine's depth)
+        
         Returns:
             List of (move_san, score) tuples
         """
@@ -191,7 +205,9 @@ class StockfishEngine:
             return []
         
         try:
-            info = self.engine.analyse(board, chess.engine.Limit(depth=self.depth, time=3.0), multipv=num_moves)
+            limit = chess.engine.Limit(depth=depth or self.depth, time=3.0)
+            with self._lock:
+                info = self.engine.analyse(board, limit, multipv=num_moves)
             
             moves = []
             for pv_info in info:
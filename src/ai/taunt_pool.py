@@ -0,0 +1,131 @@
+"""Pools of pre-generated taunts, filled in batches
+
+Instead of one LLM request per game event, a single structured request at
+game start asks for several taunts in every category. Taunts are served
+from the per-category pools with no wait, and a pool that runs low is
+refilled (together with any other low pools) by one background request.
+A batch that fails or yields nothing backs off before the next try, and
+after a few in a row the pool gives up so taunts fall back to per-event
+requests instead of paying for a large batch on every event.
+"""
+
+import json
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+from ai.background import executor
+from ai.llm_gateway import PREFETCH
+from ai.prompt_builder import REQUIRED, PromptBuilder
+
+MAX_TAUNT_CHARS = 120
+
+
+def parse_batch(text: str, kinds: List[str]) -> Dict[str, List[str]]:
+    """Taunt lists from a JSON object reply (tolerates code fences and stray text)"""
+    start, end = text.find('{'), text.rfind('}')
+    if start < 0 or end < start:
+        return {}
+    try:
+        data = json.loads(text[start:end + 1])
+    except ValueError:
+        return {}
+    batch = {}
+    for kind in kinds:
+        taunts = data.get(kind) if isinstance(data, dict) else None
+        if isinstance(taunts, list):
+            batch[kind] = [t.strip() for t in taunts
+                           if isinstance(t, str) and t.strip() and len(t) <= MAX_TAUNT_CHARS]
+    return batch
+
+
+class TauntPool:
+    """Per-category taunt pools with batched background refills"""
+
+    def __init__(self, gateway, contexts: Dict[str, str], system_prompt: str,
+                 batch_size: int = 5, low_water: int = 2, retry_after: float = 30.0,
+                 max_failures: int = 3):
+        """
+        Args:
+            gateway: LLMGateway for the batch requests
+            contexts: Category -> what the taunt reacts to
+            system_prompt: Persona for the taunts
+            batch_size: Taunts requested per category in each batch
+            low_water: Pool size that triggers a refill
+            retry_after: Seconds to wait after a failed batch (doubled each time)
+            max_failures: Failed batches in a row before the pool stops refilling
+        """
+        self.gateway = gateway
+        self.contexts = contexts
+        self.system_prompt = system_prompt
+        self.batch_size = batch_size
+        self.low_water = low_water
+        self.retry_after = retry_after
+        self.max_failures = max_failures
+        self.requests = 0
+        self.failures = 0
+        self._retry_at = 0.0
+        self._pools: Dict[str, List[str]] = {kind: [] for kind in contexts}
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def size(self, kind: str) -> int:
+        with self._lock:
+            return len(self._pools.get(kind, []))
+
+    def fill(self):
+        """Start filling every low pool in the background (call at game start)"""
+        with self._lock:
+            kinds = self._low_kinds()
+            if not kinds or self._refilling or not self.gateway.available:
+                return
+            if self.failures >= self.max_failures or time.monotonic() < self._retry_at:
+                return  # Backing off (or given up) after failed batches
+            self._refilling = True
+        executor().submit(self._refill, kinds)
+
+    def take(self, kind: str) -> Optional[str]:
+        """A pooled taunt, or None if that pool is empty; low pools are refilled"""
+        with self._lock:
+            pool = self._pools.get(kind)
+            taunt = pool.pop(random.randrange(len(pool))) if pool else None
+        self.fill()
+        return taunt
+
+    def _low_kinds(self) -> List[str]:
+        # Caller holds the lock
+        return [kind for kind, pool in self._pools.items() if len(pool) <= self.low_water]
+
+    def _prompt(self, kinds: List[str]) -> str:
+        prompt = PromptBuilder('taunt_batch')
+        for kind in kinds:
+            prompt.add(kind, self.contexts[kind], REQUIRED)
+        return prompt.ask(f"Write {self.batch_size} different one-sentence taunts for each category above. "
+                          "Reply with only a JSON object mapping each category to a list of strings.").build()
+
+    def _refill(self, kinds: List[str]):
+        try:
+            self.requests += 1
+            response = self.gateway.complete(
+                [
+                    {"role": "system", "content": self.system_prompt},
+                    {"role": "user", "content": self._prompt(kinds)}
+                ],
+                max_tokens=self.batch_size * len(kinds) * 30,
+                temperature=0.9,
+                kind='taunt_batch',
+                priority=PREFETCH
+            )
+            batch = parse_batch(response.choices[0].message.content or '', kinds)
+        except Exception:
+            batch = {}
+        with self._lock:
+            for kind, taunts in batch.items():
+                self._pools[kind].extend(taunts)
+            if any(batch.values()):
+                self.failures = 0
+            else:
+                self.failures += 1
+                self._retry_at = time.monotonic() + self.retry_after * 2 ** (self.failures - 1)
+            self._refilling = False
@@ -3,7 +3,8 @@
 class InputParser:
     """Parse user input for chess commands and moves"""
     
-    COMMANDS = ['quit', 'exit', 'undo', 'moves', 'help', 'menu', 'hint', 'solution']
+    COMMANDS = ['quit', 'exit', 'undo', 'moves', 'help', 'menu', 'hint', 'solution', 'games',
+                'explain', 'best', 'review']
     
     @staticmethod
     def parse(user_input):
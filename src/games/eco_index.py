@@ -0,0 +1,192 @@
+"""ECO opening classification by Zobrist key
+
+The ECO tables (code, name, move sequence) are replayed once at build time
+and every named position is stored under its polyglot Zobrist key, so a
+position reached by a different move order still finds its name. The
+compact binary file holds the sorted keys, the 3-letter codes and a string
+table of names; loading it builds a dict for O(1) lookups.
+"""
+
+import array
+import os
+import re
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import chess
+import chess.polyglot
+
+MAGIC = b'CPZO'
+VERSION = 1
+
+# magic, version, deepest named ply, entry count, name table bytes
+HEADER = struct.Struct('<4sHHII')
+
+ECO_TSV = os.path.join(os.path.dirname(__file__), 'eco.tsv')
+ECO_BIN = os.path.join(os.path.dirname(__file__), 'eco.bin')
+
+MOVE_NUMBER = re.compile(r'^\d+\.+')
+
+Opening = Tuple[str, str]  # (ECO code, name)
+
+
+def read_tsv(paths: Iterable[str]) -> Iterator[Tuple[str, str, chess.Board]]:
+    """
+    Replay ECO tables in the lichess chess-openings format (eco, name, pgn)
+
+    Yields:
+        (ECO code, name, position after the moves)
+    """
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line_number, line in enumerate(f, 1):
+                fields = line.rstrip('\n').split('\t')
+                if len(fields) < 3 or fields[0] == 'eco':
+                    continue
+                eco, name, pgn = fields[:3]
+                board = chess.Board()
+                try:
+                    for token in pgn.split():
+                        token = MOVE_NUMBER.sub('', token)
+                        if token:
+                            board.push_san(token)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: bad move in {name!r}: {e}") from e
+                yield eco, name, board
+
+
+def _to_le(values: array.array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class EcoIndex:
+    """Opening names looked up by position"""
+
+    def __init__(self, openings: Dict[int, Opening], max_ply: int = 0xFFFF):
+        """
+        Args:
+            openings: {Zobrist key: (ECO code, name)}
+            max_ply: Deepest named position (bounds the walk back in classify)
+        """
+        self.openings = openings
+        self.max_ply = max_ply
+
+    def __len__(self):
+        return len(self.openings)
+
+    @classmethod
+    def from_tsv(cls, paths: Iterable[str]) -> 'EcoIndex':
+        """Build from ECO tables; the first name given to a position wins"""
+        openings: Dict[int, Opening] = {}
+        max_ply = 0
+        for eco, name, board in read_tsv(paths):
+            openings.setdefault(chess.polyglot.zobrist_hash(board), (eco, name))
+            max_ply = max(max_ply, board.ply())
+        return cls(openings, max_ply)
+
+    def save(self, path: str):
+        """Write the compact binary form"""
+        keys = sorted(self.openings)
+        codes = b''.join(self.openings[key][0].encode('ascii')[:3].ljust(3) for key in keys)
+        names = [self.openings[key][1].encode('utf-8') for key in keys]
+        ends = array.array('I')
+        total = 0
+        for name in names:
+            total += len(name)
+            ends.append(total)
+
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, min(self.max_ply, 0xFFFF), len(keys), total))
+            f.write(_to_le(array.array('Q', keys)))
+            f.write(codes)
+            f.write(_to_le(ends))
+            f.write(b''.join(names))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = ECO_BIN) -> 'EcoIndex':
+        """Read a file written by save"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"Not an ECO index: {path}")
+        magic, version, max_ply, count, name_bytes = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not an ECO index (or unsupported version): {path}")
+        if len(data) != HEADER.size + count * (8 + 3 + 4) + name_bytes:
+            raise ValueError(f"Truncated ECO index: {path}")
+
+        offset = HEADER.size
+        keys = array.array('Q')
+        keys.frombytes(data[offset:offset + 8 * count])
+        offset += 8 * count
+        codes = data[offset:offset + 3 * count].decode('ascii')
+        offset += 3 * count
+        ends = array.array('I')
+        ends.frombytes(data[offset:offset + 4 * count])
+        offset += 4 * count
+        if sys.byteorder == 'big':
+            keys.byteswap()
+            ends.byteswap()
+
+        openings = {}
+        start = offset
+        for i, key in enumerate(keys):
+            end = offset + ends[i]
+            openings[key] = (codes[3 * i:3 * i + 3], data[start:end].decode('utf-8'))
+            start = end
+        return cls(openings, max_ply)
+
+    def lookup(self, board: chess.Board) -> Optional[Opening]:
+        """(ECO code, name) of exactly this position, or None"""
+        return self.openings.get(chess.polyglot.zobrist_hash(board))
+
+    def classify(self, board: chess.Board) -> Optional[Opening]:
+        """
+        Opening of a game: the last named position in its move stack
+
+        Positions after the game leaves the tables keep the name of the
+        last known one; the current position is tried first, so this is a
+        single lookup while the game is still in the tables. The walk back
+        skips plies deeper than any named position without hashing them.
+        """
+        opening = self.lookup(board)
+        if opening or not board.move_stack:
+            return opening
+        board = board.copy()
+        while board.move_stack:
+            board.pop()
+            if len(board.move_stack) > self.max_ply:
+                continue
+            opening = self.lookup(board)
+            if opening:
+                return opening
+        return None
+
+
+_default_index = None
+_default_loaded = False
+
+
+def default_index() -> Optional[EcoIndex]:
+    """The shipped ECO index (loaded once), or None if it is missing"""
+    global _default_index, _default_loaded
+    if not _default_loaded:
+        _default_loaded = True
+        try:
+            _default_index = EcoIndex.load(ECO_BIN)
+        except (OSError, ValueError):
+            _default_index = None
+    return _default_index
+
+
+def opening_name(board: chess.Board) -> Optional[str]:
+    """'B90 Sicilian Defense: Najdorf Variation' for a game's position, or None"""
+    index = default_index()
+    opening = index.classify(board) if index else None
+    return f"{opening[0]} {opening[1]}" if opening else None
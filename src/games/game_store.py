@@ -0,0 +1,197 @@
+"""Append-only local store for imported games
+
+Games live in ``games.dat`` as compact records (PGN tags plus 16-bit move
+codes) and ``games.idx`` holds one 64-bit offset per game, so game ``i`` is
+a single seek away. The index is written after the data, which makes it the
+commit point: data past the last indexed record is a torn write and is cut
+off when the store is next opened for writing.
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, Iterable, List
+
+import chess
+import chess.pgn
+
+from puzzles.puzzle_pack import decode_move, encode_move
+
+DATA_FILE = 'games.dat'
+INDEX_FILE = 'games.idx'
+
+# tag block length, move count
+GAME_HEADER = struct.Struct('<HH')
+OFFSET = struct.Struct('<Q')
+
+MAX_TAG_BYTES = 0xFFFF
+MAX_MOVES = 0xFFFF
+
+
+def encode_game(headers: Dict[str, str], moves: Iterable[chess.Move]) -> bytes:
+    """Encode tags and mainline moves as one store record"""
+    tags = '\n'.join(f"{key}\t{value}" for key, value in headers.items()
+                     if '\n' not in key + value and '\t' not in key)
+    tag_bytes = tags.encode('utf-8')[:MAX_TAG_BYTES]
+    codes = [encode_move(move) for move in moves][:MAX_MOVES]
+    return (GAME_HEADER.pack(len(tag_bytes), len(codes)) + tag_bytes
+            + struct.pack(f'<{len(codes)}H', *codes))
+
+
+def decode_tags(data, offset: int = 0) -> Dict[str, str]:
+    """Read only the tags of the record at ``offset``"""
+    tag_len, _ = GAME_HEADER.unpack_from(data, offset)
+    start = offset + GAME_HEADER.size
+    tags = bytes(data[start:start + tag_len]).decode('utf-8', 'replace')
+    return dict(line.split('\t', 1) for line in tags.split('\n') if '\t' in line)
+
+
+def decode_moves(data, offset: int = 0) -> List[chess.Move]:
+    """Read only the moves of the record at ``offset``"""
+    tag_len, move_count = GAME_HEADER.unpack_from(data, offset)
+    start = offset + GAME_HEADER.size + tag_len
+    codes = struct.unpack_from(f'<{move_count}H', data, start)
+    return [decode_move(code) for code in codes]
+
+
+class GameStore:
+    """Random access to games, and appending new ones"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Directory holding the data and index files (created if missing)
+        """
+        self.path = path
+        self.data_path = os.path.join(path, DATA_FILE)
+        self.index_path = os.path.join(path, INDEX_FILE)
+        self._data = None
+        self._data_map = None
+        self._index = None
+        self._index_map = None
+        self._writer = None
+        self._pending: List[int] = []  # Offsets not yet in the index
+        self.count = 0
+        os.makedirs(path, exist_ok=True)
+        self._refresh()
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _unmap(self):
+        for name in ('_data_map', '_index_map', '_data', '_index'):
+            handle = getattr(self, name)
+            if handle is not None:
+                handle.close()
+                setattr(self, name, None)
+
+    def _refresh(self):
+        """(Re)map both files after the store changed"""
+        self._unmap()
+        if not os.path.exists(self.index_path) or not os.path.getsize(self.index_path):
+            self.count = 0
+            return
+        self._index = open(self.index_path, 'rb')
+        self._index_map = mmap.mmap(self._index.fileno(), 0, access=mmap.ACCESS_READ)
+        self.count = len(self._index_map) // OFFSET.size
+        if os.path.exists(self.data_path) and os.path.getsize(self.data_path):
+            self._data = open(self.data_path, 'rb')
+            self._data_map = mmap.mmap(self._data.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def close(self):
+        """Finish any pending writes and release file handles"""
+        self.flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        self._unmap()
+
+    def _offset(self, game_id: int) -> int:
+        if self._index_map is None or not 0 <= game_id < len(self._index_map) // OFFSET.size:
+            raise IndexError(f"Game {game_id} out of range (or not flushed yet)")
+        return OFFSET.unpack_from(self._index_map, game_id * OFFSET.size)[0]
+
+    def get_headers(self, game_id: int) -> Dict[str, str]:
+        """PGN tags of a game"""
+        return decode_tags(self._data_map, self._offset(game_id))
+
+    def get_moves(self, game_id: int) -> List[chess.Move]:
+        """Mainline moves of a game"""
+        return decode_moves(self._data_map, self._offset(game_id))
+
+    def get_board(self, game_id: int) -> chess.Board:
+        """Starting position of a game (honours the FEN tag)"""
+        fen = self.get_headers(game_id).get('FEN')
+        return chess.Board(fen) if fen else chess.Board()
+
+    def get_game(self, game_id: int) -> chess.pgn.Game:
+        """Rebuild a python-chess game (tags and mainline)"""
+        headers = self.get_headers(game_id)
+        game = chess.pgn.Game()
+        if 'FEN' in headers:
+            game.setup(headers['FEN'])
+        for key, value in headers.items():
+            game.headers[key] = value
+        node = game
+        for move in self.get_moves(game_id):
+            node = node.add_variation(move)
+        return game
+
+    def _open_writer(self):
+        """Open both files for appending, dropping any torn tail first"""
+        self._unmap()
+        index_size = os.path.getsize(self.index_path) if os.path.exists(self.index_path) else 0
+        index_size -= index_size % OFFSET.size
+        data_end = 0
+        if index_size:
+            with open(self.index_path, 'rb') as f:
+                f.seek(index_size - OFFSET.size)
+                last = OFFSET.unpack(f.read(OFFSET.size))[0]
+            with open(self.data_path, 'rb') as f:
+                f.seek(last)
+                tag_len, move_count = GAME_HEADER.unpack(f.read(GAME_HEADER.size))
+            data_end = last + GAME_HEADER.size + tag_len + 2 * move_count
+
+        with open(self.index_path, 'ab') as f:
+            f.truncate(index_size)
+        self._writer = open(self.data_path, 'ab')
+        self._writer.truncate(data_end)
+        self._writer.seek(data_end)
+        self.count = index_size // OFFSET.size
+
+    def append_record(self, record: bytes) -> int:
+        """Append a record made by encode_game, returns the new game ID"""
+        if self._writer is None:
+            self._open_writer()
+        self._pending.append(self._writer.tell())
+        self._writer.write(record)
+        self.count += 1
+        return self.count - 1
+
+    def append(self, headers: Dict[str, str], moves: Iterable[chess.Move]) -> int:
+        """Append one game, returns its ID"""
+        return self.append_record(encode_game(headers, moves))
+
+    def flush(self):
+        """Make appended games durable and readable"""
+        if self._writer is None or not self._pending:
+            return
+        # Data must be on disk before the index entries that point at it
+        self._writer.flush()
+        os.fsync(self._writer.fileno())
+        with open(self.index_path, 'ab') as f:
+            f.write(struct.pack(f'<{len(self._pending)}Q', *self._pending))
+        self._pending = []
+        self._refresh()
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Whether ``path`` holds a store with at least one game"""
+        index_path = os.path.join(path, INDEX_FILE)
+        return os.path.exists(index_path) and os.path.getsize(index_path) >= OFFSET.size
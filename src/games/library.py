@@ -0,0 +1,76 @@
+"""The user's game library: stored games plus their position index"""
+
+import os
+from typing import Dict, List
+
+import chess
+
+from games.game_store import GameStore
+from games.opening_explorer import OpeningExplorer
+from games.position_index import PositionIndex
+
+POSITIONS_DIR = 'positions'
+EXPLORER_FILE = 'explorer.bin'
+
+
+def explorer_path(path: str) -> str:
+    """Opening explorer table of the library at ``path``"""
+    return os.path.join(path, EXPLORER_FILE)
+
+
+class GameLibrary:
+    """Open a library directory and answer questions about its games"""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Library directory (see the game_library setting)
+        """
+        self.path = path
+        self.store = GameStore(path)
+        self.positions = PositionIndex(os.path.join(path, POSITIONS_DIR))
+        self.explorer = OpeningExplorer(explorer_path(path))
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Whether ``path`` holds any imported games"""
+        return GameStore.exists(path)
+
+    def __len__(self):
+        return len(self.store)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Flush and release the store, the index and the explorer"""
+        self.explorer.close()
+        self.positions.close()
+        self.store.close()
+
+    def update_index(self) -> int:
+        """Index games imported without positions, returns how many"""
+        return self.positions.catch_up(self.store)
+
+    def update_explorer(self) -> int:
+        """Add games imported since the last update to the opening explorer, returns how many"""
+        return self.explorer.catch_up(self.store)
+
+    def games_reaching(self, board: chess.Board, limit: int = 10) -> List[Dict]:
+        """
+        Games that reached ``board``'s position, by any move order
+
+        Returns:
+            [{'id', 'ply', 'White', 'Black', 'Date', 'Result', ...tags}]
+        """
+        results = []
+        for game_id, ply in self.positions.lookup(board)[:limit]:
+            results.append({'id': game_id, 'ply': ply, **self.store.get_headers(game_id)})
+        return results
+
+    def count_reaching(self, board: chess.Board) -> int:
+        """Number of distinct games that reached ``board``'s position"""
+        return len({game_id for game_id, _ in self.positions.lookup(board)})
@@ -0,0 +1,321 @@
+"""Opening explorer built from the game library
+
+Statistics for every (position, move) pair in the opening phase of the
+library's games: how often the move was played, how those games ended and
+the average rating of the players. They live in one memory-mapped
+open-addressing hash table keyed by the position's Zobrist key and the move,
+so a lookup is a handful of probes per legal move.
+
+The table is built by a streaming pass over the GameStore. Counts are
+aggregated in memory for a batch of games and then merged into the table,
+which doubles in size whenever it gets too full. A merge first writes the
+final contents of the slots it touches to a small journal, so a crash
+mid-merge is finished from the journal on the next open.
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, List, Optional
+
+import chess
+import chess.polyglot
+
+from puzzles.puzzle_pack import encode_move
+
+MAGIC = b'CPZE'
+VERSION = 1
+
+# magic, version, max ply, capacity (slots), used slots, games indexed
+HEADER = struct.Struct('<4sHHQQQ')
+# zobrist key, move code, used flag, games, white wins, draws, black wins,
+# rated games, sum of average player ratings
+SLOT = struct.Struct('<QHHIIIIIQ')
+
+JOURNAL_MAGIC = b'CPZJ'
+# magic, used slots, games indexed, entry count
+JOURNAL_HEADER = struct.Struct('<4sQQQ')
+# slot index, then the slot's merged contents
+JOURNAL_ENTRY = struct.Struct('<Q' + SLOT.format[1:])
+
+KEY_MIX = 0x9E3779B97F4A7C15
+
+RESULTS = {'1-0': 0, '1/2-1/2': 1, '0-1': 2}
+
+
+def _rating(value: Optional[str]) -> Optional[int]:
+    return int(value) if value and value.isdigit() else None
+
+
+class OpeningExplorer:
+    """Move statistics per position from the imported games"""
+
+    MAX_PLY = 30                # Plies of each game that are counted
+    BATCH_ENTRIES = 500_000     # (position, move) counts held before merging
+    INITIAL_CAPACITY = 1 << 16  # Slots in a new table (a power of two)
+    MAX_LOAD = 0.7              # Fill ratio that triggers a resize
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Table file (created on the first flush)
+        """
+        self.path = path
+        self._journal = path + '.journal'
+        self._file = None
+        self._mmap = None
+        self._writable = False
+        self._batch: Dict[tuple, List[int]] = {}
+        self.capacity = 0
+        self.used = 0
+        self.games_indexed = 0
+        self.max_ply = self.MAX_PLY
+        self._open()
+        self._saved_games = self.games_indexed
+
+    @staticmethod
+    def exists(path: str) -> bool:
+        """Whether ``path`` holds a table with at least one game"""
+        if not os.path.exists(path) or os.path.getsize(path) < HEADER.size:
+            return False
+        with open(path, 'rb') as f:
+            magic, _, _, _, _, games = HEADER.unpack(f.read(HEADER.size))
+        return magic == MAGIC and games > 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _open(self, write: bool = False):
+        self._unmap()
+        if not os.path.exists(self.path):
+            return
+        replay = os.path.exists(self._journal)
+        write = write or replay
+        self._file = open(self.path, 'r+b' if write else 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0,
+                               access=mmap.ACCESS_WRITE if write else mmap.ACCESS_READ)
+        self._writable = write
+        magic, version, max_ply, capacity, used, games = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC or version != VERSION:
+            self._unmap()
+            raise ValueError(f"Not an opening explorer table (or unsupported version): {self.path}")
+        self.max_ply, self.capacity, self.used, self.games_indexed = max_ply, capacity, used, games
+        if replay:
+            self._replay()
+
+    def _unmap(self):
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._writable = False
+
+    def close(self):
+        """Merge pending counts and release the table"""
+        self.flush()
+        self._unmap()
+
+    def _slot(self, key: int, code: int, placed: Optional[Dict[int, tuple]] = None) -> int:
+        """
+        Index of the slot holding (key, code), or of the empty slot where it belongs
+
+        ``placed`` maps slot indices to the (key, code) of entries planned for
+        them but not yet written, which count as occupied.
+        """
+        mask = self.capacity - 1
+        index = (key ^ (code * KEY_MIX)) & mask
+        while True:
+            if placed is not None and index in placed:
+                if placed[index] == (key, code):
+                    return index
+            else:
+                offset = HEADER.size + index * SLOT.size
+                found, found_code, used = struct.unpack_from('<QHH', self._mmap, offset)
+                if not used or (found == key and found_code == code):
+                    return index
+            index = (index + 1) & mask
+
+    def _get(self, key: int, code: int) -> Optional[tuple]:
+        if not self.capacity:
+            return None
+        slot = SLOT.unpack_from(self._mmap, HEADER.size + self._slot(key, code) * SLOT.size)
+        return slot if slot[2] else None
+
+    def moves(self, board: chess.Board) -> List[Dict]:
+        """
+        Moves played from ``board``'s position, most popular first
+
+        Returns:
+            [{'move', 'san', 'games', 'white', 'draws', 'black',
+              'score' (percent for the side to move), 'rating' (average or None)}]
+        """
+        if not self.capacity:
+            return []
+        key = chess.polyglot.zobrist_hash(board)
+        results = []
+        for move in board.legal_moves:
+            slot = self._get(key, encode_move(move))
+            if slot is None:
+                continue
+            games, white, draws, black, rated, rating_sum = slot[3:]
+            wins = white if board.turn == chess.WHITE else black
+            results.append({
+                'move': move,
+                'san': board.san(move),
+                'games': games,
+                'white': white,
+                'draws': draws,
+                'black': black,
+                'score': 100.0 * (wins + draws / 2) / games,
+                'rating': rating_sum // rated if rated else None,
+            })
+        results.sort(key=lambda entry: -entry['games'])
+        return results
+
+    def add_game(self, board: chess.Board, moves, headers: Dict[str, str]):
+        """Count the opening moves of one game (unfinished games only advance the count)"""
+        self.games_indexed += 1
+        result = RESULTS.get(headers.get('Result', '*'))
+        if result is None:
+            return
+        white_elo = _rating(headers.get('WhiteElo'))
+        black_elo = _rating(headers.get('BlackElo'))
+        rating = (white_elo + black_elo) // 2 if white_elo and black_elo else None
+
+        board = board.copy(stack=False)
+        for move in moves[:self.max_ply]:
+            entry = (chess.polyglot.zobrist_hash(board), encode_move(move))
+            counts = self._batch.get(entry)
+            if counts is None:
+                counts = self._batch[entry] = [0] * 6
+            counts[0] += 1
+            counts[1 + result] += 1
+            if rating is not None:
+                counts[4] += 1
+                counts[5] += rating
+            board.push(move)
+
+        if len(self._batch) >= self.BATCH_ENTRIES:
+            self.flush()
+
+    def _create(self, path: str, capacity: int):
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, self.max_ply, capacity, 0, self._saved_games))
+            f.truncate(HEADER.size + capacity * SLOT.size)
+
+    def _grow(self, capacity: int, games: int):
+        """Rehash the table plus the batch into a bigger temp file, then swap it in"""
+        old_map = self._mmap
+        old_capacity = self.capacity
+        tmp_path = self.path + '.tmp'
+        self._create(tmp_path, capacity)
+        with open(tmp_path, 'r+b') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_WRITE)
+            self.capacity = capacity
+            for i in range(old_capacity):
+                slot = SLOT.unpack_from(old_map, HEADER.size + i * SLOT.size)
+                if slot[2]:
+                    index = self._slot(slot[0], slot[1])
+                    SLOT.pack_into(self._mmap, HEADER.size + index * SLOT.size, *slot)
+            self._apply(*self._plan(), games)
+            self._mmap.close()
+        self._mmap = old_map
+        self._unmap()
+        os.replace(tmp_path, self.path)
+        self._open(write=True)
+
+    def _plan(self) -> tuple:
+        """
+        Merged contents of every slot the batch touches, without writing them
+
+        Returns:
+            (journal entries as bytes, used slots afterwards)
+        """
+        entries = bytearray()
+        placed = {}
+        for (key, code), counts in self._batch.items():
+            index = self._slot(key, code, placed)
+            slot = SLOT.unpack_from(self._mmap, HEADER.size + index * SLOT.size)
+            if not slot[2]:
+                placed[index] = (key, code)
+                slot = (key, code, 1, 0, 0, 0, 0, 0, 0)
+            merged = [old + new for old, new in zip(slot[3:], counts)]
+            entries += JOURNAL_ENTRY.pack(index, key, code, 1, *merged)
+        return entries, self.used + len(placed)
+
+    def _apply(self, entries, used: int, games: int):
+        """Write planned slots and the header into the mapped table"""
+        for offset in range(0, len(entries), JOURNAL_ENTRY.size):
+            index = struct.unpack_from('<Q', entries, offset)[0]
+            start = HEADER.size + index * SLOT.size
+            self._mmap[start:start + SLOT.size] = entries[offset + 8:offset + JOURNAL_ENTRY.size]
+        self.used = used
+        self._write_header(games)
+
+    def _write_journal(self, entries, used: int, games: int):
+        tmp_path = self._journal + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(JOURNAL_HEADER.pack(JOURNAL_MAGIC, used, games, len(entries) // JOURNAL_ENTRY.size))
+            f.write(entries)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self._journal)
+
+    def _replay(self):
+        """Finish a merge that was journaled but maybe not fully written before a crash"""
+        with open(self._journal, 'rb') as f:
+            data = f.read()
+        if len(data) >= JOURNAL_HEADER.size:
+            magic, used, games, count = JOURNAL_HEADER.unpack_from(data, 0)
+            if magic == JOURNAL_MAGIC and len(data) == JOURNAL_HEADER.size + count * JOURNAL_ENTRY.size:
+                # Entries hold final values, so applying them twice is harmless
+                self._apply(memoryview(data)[JOURNAL_HEADER.size:], used, games)
+                self.games_indexed = games
+        os.remove(self._journal)
+
+    def _write_header(self, games: int):
+        HEADER.pack_into(self._mmap, 0, MAGIC, VERSION, self.max_ply,
+                         self.capacity, self.used, games)
+        self._mmap.flush()
+
+    def flush(self):
+        """Merge the counted batch into the table"""
+        if not self._batch and self.games_indexed == self._saved_games:
+            return
+        games = self.games_indexed  # Reopening the file reloads the saved count
+        if not os.path.exists(self.path):
+            capacity = self.INITIAL_CAPACITY
+            while len(self._batch) > capacity * self.MAX_LOAD:
+                capacity *= 2
+            self._create(self.path, capacity)
+        if not self._writable:
+            self._open(write=True)
+
+        capacity = self.capacity
+        while self.used + len(self._batch) > capacity * self.MAX_LOAD:
+            capacity *= 2
+        if capacity != self.capacity:
+            self._grow(capacity, games)
+        else:
+            # Counts and game count go to the journal before the table, so a
+            # crash mid-merge is redone on the next open instead of half-applied
+            entries, used = self._plan()
+            self._write_journal(entries, used, games)
+            self._apply(entries, used, games)
+            os.remove(self._journal)
+        self._batch = {}
+        self.games_indexed = self._saved_games = games
+
+    def catch_up(self, store) -> int:
+        """Count games added to ``store`` since the last update, returns how many"""
+        start = self.games_indexed
+        for game_id in range(start, len(store)):
+            self.add_game(store.get_board(game_id), store.get_moves(game_id),
+                          store.get_headers(game_id))
+        self.flush()
+        return len(store) - start
@@ -0,0 +1,200 @@
+"""Streaming PGN import with parallel parsing
+
+The file is cut into chunks at ``[Event`` tags, worker processes parse the
+chunks, and the main process appends the encoded games to a GameStore. Only
+a bounded number of chunks is ever in flight, so memory stays flat however
+large the file is. Plain files are split by byte range (workers read their
+own slice); compressed files are streamed and chunks are sent as text.
+"""
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import chess.pgn
+
+from games.game_store import GameStore, encode_game
+from games.position_index import PositionIndex, position_keys
+
+COMPRESSED_OPENERS = {
+    '.gz': gzip.open,
+    '.bz2': bz2.open,
+    '.xz': lzma.open,
+}
+
+GAME_START = b'\n[Event '
+SCAN_BLOCK = 1 << 16
+
+
+def open_pgn(path: str):
+    """Open a PGN file as text, decompressing by extension"""
+    opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower())
+    if opener:
+        return opener(path, 'rt', encoding='utf-8', errors='replace')
+    return open(path, 'r', encoding='utf-8', errors='replace')
+
+
+def byte_ranges(path: str, chunk_bytes: int) -> Iterator[Tuple[int, int]]:
+    """Split an uncompressed PGN into [start, end) ranges that begin at a game"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        start = 0
+        while start < size:
+            end = start + chunk_bytes
+            if end >= size:
+                yield start, size
+                return
+
+            # Move the cut forward to the next "[Event" at the start of a line
+            f.seek(end - 1)
+            carry = b''
+            boundary = size
+            while True:
+                block = f.read(SCAN_BLOCK)
+                if not block:
+                    break
+                window = carry + block
+                found = window.find(GAME_START)
+                if found >= 0:
+                    boundary = f.tell() - len(window) + found + 1
+                    break
+                carry = window[-(len(GAME_START) - 1):]
+            yield start, boundary
+            start = boundary
+
+
+def text_chunks(stream, chunk_bytes: int) -> Iterator[str]:
+    """Split a text stream into chunks that begin at a game"""
+    lines: List[str] = []
+    size = 0
+    for line in stream:
+        if size >= chunk_bytes and line.startswith('[Event '):
+            yield ''.join(lines)
+            lines = []
+            size = 0
+        lines.append(line)
+        size += len(line)
+    if lines:
+        yield ''.join(lines)
+
+
+class _QuietGameBuilder(chess.pgn.GameBuilder):
+    """Collect parse errors on the game instead of logging each one"""
+
+    def handle_error(self, error: Exception) -> None:
+        self.game.errors.append(error)
+
+
+def parse_games(text: str, with_keys: bool = False) -> Tuple[List[bytes], int, List[List[int]]]:
+    """
+    Parse PGN text into store records
+
+    Returns:
+        (encoded games, number of games skipped for errors, Zobrist keys of
+        each game's positions if ``with_keys`` else an empty list)
+    """
+    records = []
+    keys = []
+    skipped = 0
+    stream = io.StringIO(text)
+    while True:
+        try:
+            game = chess.pgn.read_game(stream, Visitor=_QuietGameBuilder)
+        except (ValueError, UnicodeDecodeError):
+            skipped += 1
+            continue
+        if game is None:
+            break
+        if game.errors:
+            skipped += 1
+            continue
+        moves = list(game.mainline_moves())
+        records.append(encode_game(dict(game.headers), moves))
+        if with_keys:
+            keys.append(position_keys(game.board(), moves))
+    return records, skipped, keys
+
+
+def _parse_range(path: str, start: int, end: int, with_keys: bool = False):
+    """Worker job: parse one byte range of an uncompressed file"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return parse_games(data.decode('utf-8', 'replace'), with_keys)
+
+
+class PgnImporter:
+    """Import PGN files into a GameStore using a pool of parser processes"""
+
+    def __init__(self, store: GameStore, workers: Optional[int] = None,
+                 chunk_bytes: int = 4 * 1024 * 1024, max_pending: Optional[int] = None,
+                 position_index: Optional[PositionIndex] = None):
+        """
+        Args:
+            store: Destination game store
+            position_index: Index to add every imported position to (optional)
+            workers: Parser processes (defaults to CPU count)
+            chunk_bytes: Approximate PGN text per job
+            max_pending: Chunks in flight at once (bounds memory)
+        """
+        self.store = store
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bytes = chunk_bytes
+        self.max_pending = max_pending or self.workers * 2
+        self.position_index = position_index
+
+    def _jobs(self, executor: ProcessPoolExecutor, path: str):
+        """Submit chunks lazily, yielding futures in file order"""
+        with_keys = self.position_index is not None
+        opener = COMPRESSED_OPENERS.get(os.path.splitext(path)[1].lower())
+        if opener:
+            with open_pgn(path) as stream:
+                for chunk in text_chunks(stream, self.chunk_bytes):
+                    yield executor.submit(parse_games, chunk, with_keys)
+        else:
+            for start, end in byte_ranges(path, self.chunk_bytes):
+                yield executor.submit(_parse_range, path, start, end, with_keys)
+
+    def import_file(self, path: str, progress: Optional[Callable[[str], None]] = print) -> Dict:
+        """
+        Import every game in a (possibly compressed) PGN file
+
+        Returns:
+            {'games': int, 'skipped': int, 'seconds': float}
+        """
+        start_time = time.time()
+        games = 0
+        skipped = 0
+        pending = deque()
+
+        def collect(future):
+            nonlocal games, skipped
+            records, errors, keys = future.result()
+            ids = [self.store.append_record(record) for record in records]
+            for game_id, game_keys in zip(ids, keys):
+                self.position_index.add_game(game_id, game_keys)
+            games += len(records)
+            skipped += errors
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            for future in self._jobs(executor, path):
+                pending.append(future)
+                if len(pending) >= self.max_pending:
+                    collect(pending.popleft())
+                    self.store.flush()
+                    if progress:
+                        rate = games / max(time.time() - start_time, 1e-9)
+                        progress(f"📥 {games} games imported ({rate:.0f} games/s)")
+            while pending:
+                collect(pending.popleft())
+
+        self.store.flush()
+        if self.position_index is not None:
+            self.position_index.flush()
+        return {'games': games, 'skipped': skipped, 'seconds': time.time() - start_time}
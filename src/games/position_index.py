@@ -0,0 +1,222 @@
+"""Zobrist position index over the game library
+
+Maps the 64-bit polyglot Zobrist key of every position to (game, ply)
+postings. Postings are buffered in memory and written as sorted run files;
+a lookup binary-searches each memory-mapped run, and runs are merged once
+there are too many of them (a small log-structured merge tree).
+"""
+
+import glob
+import heapq
+import json
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, List, Tuple
+
+import chess
+import chess.polyglot
+
+RUN_MAGIC = b'CPZP'
+RUN_VERSION = 1
+
+# magic, version, posting count
+RUN_HEADER = struct.Struct('<4sHQ')
+# zobrist key, game ID, ply
+POSTING = struct.Struct('<QIH')
+
+META_FILE = 'meta.json'
+
+
+def position_keys(board: chess.Board, moves: Iterable[chess.Move]) -> List[int]:
+    """Zobrist key of the start position and of the position after each move"""
+    board = board.copy(stack=False)
+    keys = [chess.polyglot.zobrist_hash(board)]
+    for move in moves:
+        board.push(move)
+        keys.append(chess.polyglot.zobrist_hash(board))
+    return keys
+
+
+class _Run:
+    """One sorted, memory-mapped run file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count = RUN_HEADER.unpack_from(self._mmap, 0)
+        if magic != RUN_MAGIC or version != RUN_VERSION:
+            self.close()
+            raise ValueError(f"Not a position run (or unsupported version): {path}")
+        self.count = min(count, (len(self._mmap) - RUN_HEADER.size) // POSTING.size)
+
+    def close(self):
+        self._mmap.close()
+        self._file.close()
+
+    def _key_at(self, i: int) -> int:
+        return struct.unpack_from('<Q', self._mmap, RUN_HEADER.size + i * POSTING.size)[0]
+
+    def find(self, key: int) -> Iterator[Tuple[int, int]]:
+        """(game, ply) postings for ``key``"""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        offset = RUN_HEADER.size + lo * POSTING.size
+        end = RUN_HEADER.size + self.count * POSTING.size
+        while offset < end:
+            found, game, ply = POSTING.unpack_from(self._mmap, offset)
+            if found != key:
+                break
+            yield game, ply
+            offset += POSTING.size
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        for i in range(self.count):
+            yield POSTING.unpack_from(self._mmap, RUN_HEADER.size + i * POSTING.size)
+
+
+class PositionIndex:
+    """
+    Which games reached a position, and at which ply
+
+    ``games_indexed`` records how many games of the store are covered, so
+    the index can be brought up to date incrementally after an import.
+    """
+
+    BUFFER_POSTINGS = 500_000    # Postings held in memory before a run is written (about 25 MB)
+    MAX_RUNS = 8                 # Runs allowed before they are merged into one
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: Directory for run files (created if missing)
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        # Each posting packed into one int (key << 48 | game << 16 | ply): half the
+        # memory of a tuple, and it sorts in the same (key, game, ply) order
+        self._buffer: List[int] = []
+        self.games_indexed = 0
+        self._runs: List[_Run] = []
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _load(self):
+        meta_path = os.path.join(self.path, META_FILE)
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path, 'r') as f:
+                    self.games_indexed = json.load(f).get('games', 0)
+            except (OSError, ValueError):
+                self.games_indexed = 0
+        self._open_runs()
+
+    def _open_runs(self):
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        for run_path in sorted(glob.glob(os.path.join(self.path, 'run-*.pos'))):
+            try:
+                self._runs.append(_Run(run_path))
+            except (OSError, ValueError, struct.error):
+                continue
+
+    def __len__(self):
+        """Number of postings on disk"""
+        return sum(run.count for run in self._runs)
+
+    def close(self):
+        """Write buffered postings and release the runs"""
+        self.flush()
+        for run in self._runs:
+            run.close()
+        self._runs = []
+
+    def add_game(self, game_id: int, keys: Iterable[int]):
+        """Add the postings of one game (keys from position_keys)"""
+        self._buffer.extend((key << 48) | (game_id << 16) | min(ply, 0xFFFF) for ply, key in enumerate(keys))
+        self.games_indexed = max(self.games_indexed, game_id + 1)
+        if len(self._buffer) >= self.BUFFER_POSTINGS:
+            self.flush()
+
+    def _next_run_path(self) -> str:
+        numbers = [int(os.path.basename(run.path)[4:-4]) for run in self._runs]
+        return os.path.join(self.path, f"run-{max(numbers, default=0) + 1:08d}.pos")
+
+    def _write_run(self, postings: Iterable[Tuple[int, int, int]], path: str):
+        tmp_path = path + '.tmp'
+        count = 0
+        with open(tmp_path, 'wb') as f:
+            f.write(RUN_HEADER.pack(RUN_MAGIC, RUN_VERSION, 0))
+            for posting in postings:
+                f.write(POSTING.pack(*posting))
+                count += 1
+            f.seek(0)
+            f.write(RUN_HEADER.pack(RUN_MAGIC, RUN_VERSION, count))
+        os.replace(tmp_path, path)
+
+    def _save_meta(self):
+        tmp_path = os.path.join(self.path, META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({'games': self.games_indexed}, f)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+    def flush(self):
+        """Write buffered postings as a new run, merging runs if there are too many"""
+        if self._buffer:
+            self._buffer.sort()
+            postings = ((p >> 48, (p >> 16) & 0xFFFFFFFF, p & 0xFFFF) for p in self._buffer)
+            self._write_run(postings, self._next_run_path())
+            self._buffer = []
+            self._open_runs()
+            if len(self._runs) > self.MAX_RUNS:
+                self.compact()
+        self._save_meta()
+
+    def compact(self):
+        """Merge all runs into one (streaming; memory use stays flat)"""
+        if len(self._runs) < 2:
+            return
+        old_paths = [run.path for run in self._runs]
+        self._write_run(heapq.merge(*self._runs), self._next_run_path())
+        for run in self._runs:
+            run.close()
+        self._runs = []
+        for old_path in old_paths:
+            os.remove(old_path)
+        self._open_runs()
+
+    def lookup(self, position) -> List[Tuple[int, int]]:
+        """
+        Games that reached a position
+
+        Args:
+            position: chess.Board or Zobrist key
+
+        Returns:
+            Sorted (game ID, ply) pairs
+        """
+        key = chess.polyglot.zobrist_hash(position) if isinstance(position, chess.Board) else position
+        postings = set()
+        for run in self._runs:
+            postings.update(run.find(key))
+        return sorted(postings)
+
+    def catch_up(self, store) -> int:
+        """Index games added to ``store`` since the last update, returns how many"""
+        start = self.games_indexed
+        for game_id in range(start, len(store)):
+            self.add_game(game_id, position_keys(store.get_board(game_id), store.get_moves(game_id)))
+        self.flush()
+        return len(store) - start
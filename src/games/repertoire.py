@@ -0,0 +1,256 @@
+"""Opening repertoire stored as a move trie keyed by position
+
+Every position of the repertoire is one node, identified by its Zobrist
+key, so lines that transpose share their nodes. The trie is kept as flat
+arrays (sorted keys, CSR edge lists and a parent pointer per node) that are
+written to disk as they are and read back with ``array.frombytes``, which
+loads tens of thousands of nodes in a few milliseconds.
+"""
+
+import array
+import bisect
+import os
+import struct
+import sys
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+import chess
+import chess.pgn
+import chess.polyglot
+
+from puzzles.puzzle_pack import decode_move, encode_move
+
+MAGIC = b'CPZR'
+VERSION = 1
+
+# magic, version, colour (1 = white), root node, node count, edge count,
+# length of the root FEN that follows the header
+HEADER = struct.Struct('<4sHBxIIIH')
+NO_PARENT = 0xFFFFFFFF
+
+
+def _array(typecode: str, data: bytes = b'') -> array.array:
+    """Array from little-endian bytes"""
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def _bytes(values: array.array) -> bytes:
+    if sys.byteorder == 'big':
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+class Repertoire:
+    """The moves a player has prepared, looked up by position"""
+
+    def __init__(self, color: chess.Color, keys: array.array, edge_start: array.array,
+                 edge_move: array.array, edge_child: array.array,
+                 parent: array.array, parent_move: array.array, root: int,
+                 root_fen: str = chess.STARTING_FEN):
+        """Use from_pgn or load rather than building the arrays by hand"""
+        self.color = color
+        self.root_fen = root_fen
+        self.keys = keys                # Node -> Zobrist key (sorted)
+        self.edge_start = edge_start    # Node -> first edge (one extra entry at the end)
+        self.edge_move = edge_move      # Edge -> 16-bit move code
+        self.edge_child = edge_child    # Edge -> child node
+        self.parent = parent            # Node -> parent on a shortest line from the root
+        self.parent_move = parent_move  # Node -> move code from that parent
+        self.root = root
+
+    def __len__(self):
+        return len(self.keys)
+
+    @classmethod
+    def from_pgn(cls, path: str, color: chess.Color) -> 'Repertoire':
+        """Build a repertoire from every game and variation in a PGN file"""
+        children: Dict[int, Dict[int, int]] = {}
+        root_key = None
+        root_fen = chess.STARTING_FEN
+
+        def walk(node: chess.pgn.GameNode, board: chess.Board):
+            key = chess.polyglot.zobrist_hash(board)
+            edges = children.setdefault(key, {})
+            for variation in node.variations:
+                board.push(variation.move)
+                edges[encode_move(variation.move)] = chess.polyglot.zobrist_hash(board)
+                walk(variation, board)
+                board.pop()
+
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            while True:
+                game = chess.pgn.read_game(f)
+                if game is None:
+                    break
+                board = game.board()
+                if root_key is None:
+                    root_key = chess.polyglot.zobrist_hash(board)
+                    root_fen = board.fen()
+                walk(game, board)
+
+        if root_key is None:
+            raise ValueError(f"No games found in {path}")
+        return cls._from_edges(color, root_key, children, root_fen)
+
+    @classmethod
+    def _from_edges(cls, color: chess.Color, root_key: int, children: Dict[int, Dict[int, int]],
+                    root_fen: str = chess.STARTING_FEN) -> 'Repertoire':
+        """Flatten {key: {move code: child key}} into arrays"""
+        for edges in list(children.values()):
+            for child in edges.values():
+                children.setdefault(child, {})
+        sorted_keys = sorted(children)
+        index = {key: i for i, key in enumerate(sorted_keys)}
+
+        keys = array.array('Q', sorted_keys)
+        edge_start = array.array('I', [0])
+        edge_move = array.array('H')
+        edge_child = array.array('I')
+        for key in sorted_keys:
+            for code, child in sorted(children[key].items()):
+                edge_move.append(code)
+                edge_child.append(index[child])
+            edge_start.append(len(edge_move))
+
+        # Breadth-first parents give every node its shortest line from the root
+        root = index[root_key]
+        parent = array.array('I', [NO_PARENT]) * len(keys)
+        parent_move = array.array('H', [0]) * len(keys)
+        seen = {root}
+        queue = deque([root])
+        while queue:
+            node = queue.popleft()
+            for edge in range(edge_start[node], edge_start[node + 1]):
+                child = edge_child[edge]
+                if child not in seen:
+                    seen.add(child)
+                    parent[child] = node
+                    parent_move[child] = edge_move[edge]
+                    queue.append(child)
+
+        return cls(color, keys, edge_start, edge_move, edge_child, parent, parent_move,
+                   root, root_fen)
+
+    def save(self, path: str):
+        """Write the arrays to ``path``"""
+        fen = self.root_fen.encode('ascii')
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, 1 if self.color == chess.WHITE else 0,
+                                self.root, len(self.keys), len(self.edge_move), len(fen)))
+            f.write(fen)
+            for values in (self.keys, self.edge_start, self.edge_move, self.edge_child,
+                           self.parent, self.parent_move):
+                f.write(_bytes(values))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'Repertoire':
+        """Read a repertoire written by save"""
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < HEADER.size:
+            raise ValueError(f"Not a repertoire file: {path}")
+        magic, version, white, root, nodes, edges, fen_len = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"Not a repertoire file (or unsupported version): {path}")
+
+        root_fen = data[HEADER.size:HEADER.size + fen_len].decode('ascii')
+        arrays = []
+        offset = HEADER.size + fen_len
+        for typecode, count in (('Q', nodes), ('I', nodes + 1), ('H', edges),
+                                ('I', edges), ('I', nodes), ('H', nodes)):
+            size = array.array(typecode).itemsize * count
+            if offset + size > len(data):
+                raise ValueError(f"Truncated repertoire file: {path}")
+            arrays.append(_array(typecode, data[offset:offset + size]))
+            offset += size
+        return cls(chess.WHITE if white else chess.BLACK, *arrays, root, root_fen)
+
+    def find(self, key: int) -> Optional[int]:
+        """Node with Zobrist key ``key``, or None"""
+        i = bisect.bisect_left(self.keys, key)
+        if i < len(self.keys) and self.keys[i] == key:
+            return i
+        return None
+
+    def node(self, board: chess.Board) -> Optional[int]:
+        """Node of ``board``'s position, or None if it is outside the repertoire"""
+        return self.find(chess.polyglot.zobrist_hash(board))
+
+    def moves(self, board: chess.Board) -> List[chess.Move]:
+        """Repertoire moves from ``board``'s position"""
+        node = self.node(board)
+        if node is None:
+            return []
+        return [decode_move(self.edge_move[edge])
+                for edge in range(self.edge_start[node], self.edge_start[node + 1])]
+
+    def contains(self, board: chess.Board, move: chess.Move) -> bool:
+        """Whether ``move`` from ``board``'s position is in the repertoire"""
+        node = self.node(board)
+        if node is None:
+            return False
+        code = encode_move(move)
+        return any(self.edge_move[edge] == code
+                   for edge in range(self.edge_start[node], self.edge_start[node + 1]))
+
+    def root_board(self) -> chess.Board:
+        """Position every line starts from"""
+        return chess.Board(self.root_fen)
+
+    def leaves(self) -> List[int]:
+        """Nodes where a line ends (reachable from the root)"""
+        return [node for node in range(len(self.keys))
+                if self.edge_start[node] == self.edge_start[node + 1]
+                and (node == self.root or self.parent[node] != NO_PARENT)]
+
+    def line(self, node: int) -> List[chess.Move]:
+        """Shortest move sequence from the root to ``node``"""
+        moves = []
+        while node != self.root:
+            if self.parent[node] == NO_PARENT:
+                raise ValueError(f"Node {node} is not reachable from the root")
+            moves.append(decode_move(self.parent_move[node]))
+            node = self.parent[node]
+        moves.reverse()
+        return moves
+
+
+def line_id(repertoire: Repertoire, node: int) -> str:
+    """Review queue key of the line ending at ``node``"""
+    return f"{repertoire.keys[node]:016x}"
+
+
+def pick_line(repertoire: Repertoire, reviews, now: Optional[float] = None) -> Optional[Tuple[str, int]]:
+    """
+    Next line to drill: the most overdue review, else the first line never drilled
+
+    Reviews of lines that are no longer in the repertoire are dropped from
+    the queue, so they cannot hide the reviews due behind them.
+
+    Args:
+        reviews: ReviewQueue holding the drilled lines
+
+    Returns:
+        (line ID, leaf node), or None when nothing is due
+    """
+    while True:
+        item = reviews.next_due(now)
+        if item is None:
+            break
+        node = repertoire.find(int(item['id'], 16))
+        if node is not None:
+            return item['id'], node
+        reviews.remove(item['id'])  # Line deleted or re-imported away
+    for node in repertoire.leaves():
+        item_id = line_id(repertoire, node)
+        if item_id not in reviews:
+            return item_id, node
+    return None
@@ -1,14 +1,29 @@
 """Endless puzzle mode - rapid-fire puzzle stream"""
 
+import os
+import chess
 from puzzles.lichess_api import LichessAPI
 from puzzles.puzzle_parser import PuzzleParser
 from puzzles.puzzle_engine import PuzzleEngine
+from puzzles.puzzle_pack import PuzzlePack
+from puzzles.theme_index import ThemeIndex
+from puzzles.user_rating import UserRating
+from puzzles.review_queue import ReviewQueue
+from puzzles.seen_filter import SeenFilter
+from puzzles.solution_checker import SolutionChecker
+from puzzles.similarity import SimilarityIndex
 from chess_game.renderer import BoardRenderer
 from chess_game.input_parser import InputParser
 
 class EndlessMode:
     """Endless puzzle solving mode"""
     
+    # Draws from the pack before accepting a puzzle the filter says was seen
+    MAX_SEEN_RETRIES = 20
+    
+    # Look-alike puzzles queued after a miss
+    SIMILAR_PUZZLES = 3
+    
     def __init__(self, config):
         """Initialize endless mode"""
         self.config = config
@@ -19,18 +34,131 @@ class EndlessMode:
             use_unicode=config.get('use_unicode', True),
             large_board=config.get('large_board', True)
         )
+        self.pack = None
+        self.index = None
+        self.themes = []
+        self.user_rating = UserRating()
+        self.reviews = ReviewQueue()
+        self.last_was_review = False
+        self.seen = SeenFilter()
+        self.checker = SolutionChecker() if config.get('accept_alternatives', True) else None
+        self.similarity = None
+        self.similar_queue = []
+    
+    def _open_pack(self):
+        """Open the local puzzle pack and its theme index, if configured"""
+        pack_path = self.config.get('puzzle_pack')
+        if not pack_path or not os.path.exists(pack_path):
+            return
+        
+        try:
+            self.pack = PuzzlePack(pack_path)
+            self.index = ThemeIndex.load_or_build(self.pack)
+            print(f"📦 Using local puzzle pack ({len(self.pack)} puzzles)")
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not open puzzle pack, using Lichess: {e}")
+            if self.pack is not None:
+                self.pack.close()
+            self.pack = None
+            self.index = None
+            return
+        
+        themes = input("Themes to drill (e.g. 'fork endgame', Enter for all): ").split()
+        unknown = [t for t in themes if t not in self.index.theme_bits]
+        if unknown:
+            print(f"⚠️  No puzzles with theme(s): {', '.join(unknown)}")
+        self.themes = [t for t in themes if t in self.index.theme_bits]
+        
+        if self.config.get('adaptive_puzzles', True):
+            count = self.index.count(self.themes)
+            print(f"📈 Your puzzle rating: {self.user_rating.rating:.0f}")
+        else:
+            count = self.index.count(self.themes, *self._rating_range())
+        print(f"🎯 {count} matching puzzles\n")
+    
+    def _rating_range(self):
+        """Configured puzzle rating range"""
+        return (self.config.get('puzzle_min_rating', 0),
+                self.config.get('puzzle_max_rating', 3500))
+    
+    def _select_adaptive(self):
+        """Sample a puzzle near the rating the user should solve ~65% of the time"""
+        low, high = self.user_rating.target_range()
+        width = high - low
+        
+        # Widen the window until something matches the theme filter
+        for _ in range(6):
+            index = self.index.sample(self.themes, low, high)
+            if index is not None:
+                return index
+            low -= width
+            high += width
+            width *= 2
+        return None
+    
+    def _select_unseen(self):
+        """Pick a pack index, skipping puzzles this user has already been shown"""
+        index = None
+        for _ in range(self.MAX_SEEN_RETRIES):
+            if self.config.get('adaptive_puzzles', True):
+                index = self._select_adaptive()
+            else:
+                index = self.index.sample(self.themes, *self._rating_range())
+            if index is None or self.pack.get_id(index) not in self.seen:
+                break
+        return index
+    
+    def _queue_similar(self, puzzle_data):
+        """Queue unseen pack puzzles whose positions resemble ``puzzle_data``"""
+        if self.similarity is None:
+            print("🔍 Indexing positions (first time only)...")
+            self.similarity = SimilarityIndex.load_or_build(self.pack)
+        
+        matches = self.similarity.similar_to(puzzle_data, k=self.SIMILAR_PUZZLES * 4)
+        for index, _ in matches:
+            puzzle_id = self.pack.get_id(index)
+            if puzzle_id != puzzle_data.get('id') and puzzle_id not in self.seen:
+                self.similar_queue.append(index)
+                if len(self.similar_queue) >= self.SIMILAR_PUZZLES:
+                    break
+        if not self.similar_queue:
+            print("No similar puzzles left to try")
+    
+    def _fetch_puzzle(self):
+        """Get the next puzzle: a due review, the local pack, then Lichess"""
+        # Alternate due reviews with new puzzles so reviews never take over
+        if not self.last_was_review:
+            item = self.reviews.next_due()
+            if item:
+                self.last_was_review = True
+                return {**item['payload'], 'review': True}
+        self.last_was_review = False
+        
+        if self.similar_queue:
+            return {**self.pack.get_puzzle(self.similar_queue.pop(0)), 'similar': True}
+        
+        if self.index is not None and len(self.index):
+            index = self._select_unseen()
+            if index is None:
+                # Nothing matches the filter - fall back to any puzzle
+                index = self.pack.random_index()
+            return self.pack.get_puzzle(index)
+        
+        print("Fetching puzzle...")
+        puzzle_json = LichessAPI.get_random_puzzle()
+        return PuzzleParser.parse(puzzle_json)
     
     def run(self):
         """Run endless puzzle loop"""
         print("\n🎯 ENDLESS PUZZLE MODE")
         print("Solve puzzles rapidly. Type 'quit' to exit.\n")
         
+        self._open_pack()
+        
         while True:
             try:
-                # Fetch puzzle
-                print("Fetching puzzle...")
-                puzzle_json = LichessAPI.get_random_puzzle()
-                puzzle_data = PuzzleParser.parse(puzzle_json)
+                puzzle_data = self._fetch_puzzle()
+                self.seen.add(puzzle_data['id'])
                 
                 # Solve puzzle
                 result = self._solve_puzzle(puzzle_data)
@@ -42,10 +170,24 @@ class EndlessMode:
                 
                 self.attempts += 1
                 
+                change = self._record_result(puzzle_data, result == 'solved')
+                if self.attempts % 20 == 0:
+                    self.seen.save()
+                
                 # Show stats
                 accuracy = (self.score / self.attempts * 100) if self.attempts > 0 else 0
                 print(f"\n📊 Score: {self.score}/{self.attempts} ({accuracy:.1f}%)")
-                input("\nPress Enter for next puzzle...")
+                if change is None:
+                    print(f"📈 Puzzle rating: {self.user_rating.rating:.0f} (review, unrated)")
+                else:
+                    print(f"📈 Puzzle rating: {self.user_rating.rating:.0f} ({change:+.0f})")
+                
+                if result == 'failed' and self.pack is not None and not self.similar_queue:
+                    answer = input("\n🔍 Try some similar puzzles next? (y/N): ").strip().lower()
+                    if answer in ('y', 'yes'):
+                        self._queue_similar(puzzle_data)
+                else:
+                    input("\nPress Enter for next puzzle...")
                 
             except KeyboardInterrupt:
                 break
@@ -53,12 +195,38 @@ class EndlessMode:
                 print(f"❌ Error: {e}")
                 continue
         
+        self.seen.save()
+        if self.checker:
+            self.checker.close()
+        if self.pack is not None:
+            self.pack.close()
+            self.pack = None
+            self.index = None
+        
         print(f"\n\n🏁 Final Score: {self.score}/{self.attempts}")
         print("Thanks for playing! 👻\n")
     
+    def _record_result(self, puzzle_data, solved):
+        """
+        Update the rating and review schedule after an attempt
+        
+        Returns:
+            Rating change, or None for a review (already seen, so unrated)
+        """
+        self.reviews.record_puzzle(puzzle_data, solved)
+        if puzzle_data.get('review'):
+            return None
+        change = self.user_rating.update(puzzle_data.get('rating', 1500), solved)
+        self.user_rating.save()
+        return change
+    
     def _solve_puzzle(self, puzzle_data):
-        """Solve a single puzzle"""
-        engine = PuzzleEngine(puzzle_data)
+        """
+        Solve a single puzzle
+        Returns: 'solved', 'failed' (wrong move or solution shown) or 'quit'
+        """
+        engine = PuzzleEngine(puzzle_data, self.checker)
+        failed = False
         
         # Get the initial position's last move (the move that led to this puzzle position)
         board = engine.get_board()
@@ -76,6 +244,10 @@ class EndlessMode:
             initial_move = board.move_stack[-1]
             last_move = (initial_move.from_square, initial_move.to_square, board.san(initial_move))
         
+        if puzzle_data.get('review'):
+            print("\n🔁 Review - you missed this one before")
+        elif puzzle_data.get('similar'):
+            print("\n🔍 Similar to the one you missed")
         print(f"\n🧩 Puzzle #{puzzle_data['id']}")
         print(f"Rating: {puzzle_data['rating']}")
         print(f"Themes: {', '.join(puzzle_data['themes'])}\n")
@@ -124,6 +296,7 @@ class EndlessMode:
                     input("Press Enter to continue...")
                     continue
                 elif value == 'solution':
+                    failed = True
                     solution = engine.get_solution_str()
                     print(f"🔑 Solution: {solution}")
                     input("Press Enter to continue...")
@@ -167,8 +340,8 @@ class EndlessMode:
                         print(self.renderer.render(engine.get_board(), [last_move[1]], last_move[0]))
                     else:
                         print(self.renderer.render(engine.get_board()))
-                    print("🎉 Puzzle solved!")
-                    return 'solved'
+                    print("🎉 Puzzle solved!" if not failed else "🏁 Puzzle complete")
+                    return 'failed' if failed else 'solved'
                 elif result == 'incorrect':
                     # Check if it's a square query
                     moves, dest_squares = engine.get_moves_from_square(value)
@@ -181,6 +354,7 @@ class EndlessMode:
                         input("Press Enter to continue...")
                     else:
                         feedback_message = "❌ Incorrect. Try again!"
+                        failed = True
                         last_move = None  # Clear highlight on wrong move
                 elif result == 'error':
                     # Check if it's a square query
@@ -197,4 +371,4 @@ class EndlessMode:
                     else:
                         feedback_message = f"❌ Invalid move: {move}"
         
-        return 'solved'
+        return 'failed' if failed else 'solved'
@@ -1,65 +1,125 @@
 """Puzzle validation and solution checking"""
 
 import chess
+import chess.polyglot
 
 class PuzzleEngine:
     """Handle puzzle logic and validation"""
     
-    def __init__(self, puzzle_data):
-        """Initialize with parsed puzzle data"""
+    def __init__(self, puzzle_data, checker=None):
+        """
+        Initialize with parsed puzzle data
+        
+        Args:
+            puzzle_data: Parsed puzzle (see PuzzleParser.parse)
+            checker: Optional SolutionChecker for moves other than the recorded one
+        """
         self.puzzle_data = puzzle_data
-        self.board = chess.Board(puzzle_data['fen'])
-        self.solution_moves = puzzle_data['moves']
+        self.checker = checker
+        # Puzzles decoded from a pack already carry a board, so skip the FEN
+        if puzzle_data.get('board') is not None:
+            self.board = puzzle_data['board'].copy()
+        else:
+            self.board = chess.Board(puzzle_data['fen'])
+        self.solution_moves = list(puzzle_data['moves'])
         self.current_move_index = 0
         self.completed = False
+        self._compile(0)
+    
+    @classmethod
+    def from_pack(cls, pack, index, checker=None):
+        """Build a puzzle straight from record ``index`` of a PuzzlePack"""
+        return cls(pack.get_puzzle(index), checker)
+    
+    def _compile(self, start):
+        """
+        Precompute every ply of the solution from ``start`` onwards
+        
+        Stores the move, SAN, Zobrist key of the position it is played from,
+        and the strings a user may type for it, so checking moves and giving
+        hints never has to parse or replay the line again.
+        """
+        if not start:
+            self.line_moves, self.line_sans, self.line_keys, self.line_inputs = [], [], [], []
+        else:
+            del self.line_moves[start:], self.line_sans[start:], self.line_keys[start:], self.line_inputs[start:]
+
+        board = self.board.copy(stack=False)
+        for uci in self.solution_moves[start:]:
+            try:
+                move = chess.Move.from_uci(uci)
+            except ValueError:
+                break
+            if not board.is_legal(move):
+                break  # Broken puzzle data: the line ends here
+            san = board.san(move)
+            self.line_moves.append(move)
+            self.line_sans.append(san)
+            self.line_keys.append(chess.polyglot.zobrist_hash(board))
+            self.line_inputs.append({uci, san, san.rstrip('+#')})
+            board.push(move)
     
     def check_move(self, move_str):
         """
         Check if user move matches solution
-        Returns: ('correct', move) or ('incorrect', None) or ('complete', None)
+        Returns: (result, move, opponent_san) where result is 'correct',
+        'complete', 'incorrect' or 'error' (move is then the error message)
         """
         if self.completed:
-            return ('complete', None)
+            return ('complete', None, None)
         
-        try:
-            # Parse user move
+        index = self.current_move_index
+        if index >= len(self.line_moves):
+            return ('error', 'Puzzle data is broken at this move', None)
+        expected_move = self.line_moves[index]
+        
+        # Fast path: the user typed the expected move exactly (SAN or UCI)
+        if move_str in self.line_inputs[index]:
+            user_move = expected_move
+        else:
             try:
-                user_move = self.board.parse_san(move_str)
-            except:
-                user_move = chess.Move.from_uci(move_str)
-            
-            # Get expected move
-            expected_uci = self.solution_moves[self.current_move_index]
-            expected_move = chess.Move.from_uci(expected_uci)
-            
-            # Check if move is legal first
-            if user_move not in self.board.legal_moves:
-                return ('error', 'Illegal move')
+                try:
+                    user_move = self.board.parse_san(move_str)
+                except ValueError:
+                    user_move = chess.Move.from_uci(move_str)
+            except ValueError as e:
+                return ('error', str(e), None)
             
-            if user_move == expected_move:
-                self.board.push(user_move)
-                self.current_move_index += 1
-                
-                # Make opponent's response if available
-                opponent_san = None
-                if self.current_move_index < len(self.solution_moves):
-                    opponent_uci = self.solution_moves[self.current_move_index]
-                    opponent_move = chess.Move.from_uci(opponent_uci)
-                    opponent_san = self.board.san(opponent_move)
-                    self.board.push(opponent_move)
-                    self.current_move_index += 1
-                
-                # Check if puzzle complete
-                if self.current_move_index >= len(self.solution_moves):
-                    self.completed = True
-                    return ('complete', user_move, opponent_san)
-                
-                return ('correct', user_move, opponent_san)
-            else:
-                return ('incorrect', None, None)
+            if not self.board.is_legal(user_move):
+                return ('error', 'Illegal move', None)
+        
+        accepted = user_move == expected_move
+        if not accepted and self.checker:
+            accepted, line = self.checker.check(
+                self.board, user_move, expected_move,
+                solver_moves=(len(self.solution_moves) - index + 1) // 2,
+                mate='mate' in self.puzzle_data.get('themes', []),
+                key=self.line_keys[index]
+            )
+            if accepted:
+                # Continue along the checker's line instead of the recorded one
+                self.solution_moves = self.solution_moves[:index] + [user_move.uci()] + line
+                self._compile(index)
+        
+        if not accepted:
+            return ('incorrect', None, None)
+        
+        self.board.push(user_move)
+        self.current_move_index += 1
         
-        except Exception as e:
-            return ('error', str(e))
+        # Make opponent's response if available
+        opponent_san = None
+        if self.current_move_index < len(self.line_moves):
+            opponent_san = self.line_sans[self.current_move_index]
+            self.board.push(self.line_moves[self.current_move_index])
+            self.current_move_index += 1
+        
+        # Check if puzzle complete
+        if self.current_move_index >= len(self.line_moves):
+            self.completed = True
+            return ('complete', user_move, opponent_san)
+        
+        return ('correct', user_move, opponent_san)
     
     def get_board(self):
         """Get current board state"""
@@ -71,27 +131,15 @@ class PuzzleEngine:
     
     def get_hint(self):
         """Get next expected move as hint"""
-        if self.current_move_index < len(self.solution_moves):
-            move_uci = self.solution_moves[self.current_move_index]
-            move = chess.Move.from_uci(move_uci)
-            return self.board.san(move)
+        if self.current_move_index < len(self.line_sans):
+            return self.line_sans[self.current_move_index]
         return None
     
     def get_solution_str(self):
         """Get remaining solution moves as a string"""
         if self.completed:
             return "Puzzle already solved!"
-            
-        board_copy = self.board.copy()
-        moves = []
-        
-        for i in range(self.current_move_index, len(self.solution_moves)):
-            uci = self.solution_moves[i]
-            move = chess.Move.from_uci(uci)
-            moves.append(board_copy.san(move))
-            board_copy.push(move)
-            
-        return " ".join(moves)
+        return " ".join(self.line_sans[self.current_move_index:])
     
     def get_turn_info(self):
         """Get whose turn it is"""
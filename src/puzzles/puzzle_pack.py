@@ -0,0 +1,337 @@
+"""Memory-mapped binary puzzle packs for offline play
+
+A pack is a small header followed by fixed-size records, so puzzle ``i``
+lives at a known offset and can be decoded without reading anything else.
+Boards are stored as bitboards, which lets us rebuild a ``chess.Board``
+directly instead of parsing FEN or PGN text.
+"""
+
+import csv
+import hashlib
+import mmap
+import os
+import random
+import struct
+from typing import Dict, Iterable, Iterator, List, Optional
+
+import chess
+
+# Lichess puzzle themes. The position of a theme in this tuple is its bit in
+# the theme mask, so new themes must only ever be appended.
+THEMES = (
+    'advancedPawn', 'advantage', 'anastasiaMate', 'arabianMate',
+    'attackingF2F7', 'attraction', 'backRankMate', 'bishopEndgame',
+    'bodenMate', 'capturingDefender', 'castling', 'clearance',
+    'crushing', 'defensiveMove', 'deflection', 'discoveredAttack',
+    'doubleBishopMate', 'doubleCheck', 'dovetailMate', 'enPassant',
+    'endgame', 'equality', 'exposedKing', 'fork',
+    'hangingPiece', 'hookMate', 'interference', 'intermezzo',
+    'kingsideAttack', 'knightEndgame', 'long', 'master',
+    'masterVsMaster', 'mate', 'mateIn1', 'mateIn2',
+    'mateIn3', 'mateIn4', 'mateIn5', 'middlegame',
+    'oneMove', 'opening', 'pawnEndgame', 'pin',
+    'promotion', 'queenEndgame', 'queenRookEndgame', 'queensideAttack',
+    'quietMove', 'rookEndgame', 'sacrifice', 'short',
+    'skewer', 'smotheredMate', 'superGM', 'trappedPiece',
+    'underPromotion', 'veryLong', 'xRayAttack', 'zugzwang',
+    'killBoxMate', 'vukovicMate', 'epauletteMate', 'cornerMate',
+    'swallowstailMate', 'morphysMate', 'operaMate', 'pillsburysMate',
+    'triangleMate', 'balestraMate', 'blindSwineMate', 'collinearMove',
+)
+THEME_BITS = {theme: bit for bit, theme in enumerate(THEMES)}
+
+MAX_SOLUTION_MOVES = 16
+NO_EP_SQUARE = 0xFF
+
+PACK_MAGIC = b'CPZK'
+PACK_VERSION = 1
+
+# magic, version, record size, record count
+HEADER = struct.Struct('<4sHHQ')
+
+# id, 8 bitboards (white, black, pawns, knights, bishops, rooks, queens,
+# kings), turn, castling flags, ep square, halfmove clock, fullmove number,
+# rating, theme mask (low, high), last move, move count, solution moves
+RECORD = struct.Struct('<8s8QBBBHHHQQHB%dH' % MAX_SOLUTION_MOVES)
+
+# Offsets of fields that are read on their own (rating lookups, filters)
+RATING_OFFSET = struct.calcsize('<8s8QBBBHH')
+THEMES_OFFSET = RATING_OFFSET + 2
+RATING = struct.Struct('<H')
+THEME_MASK = struct.Struct('<QQ')
+
+# Castling rights are stored as four flags instead of a rook bitboard
+CASTLING_FLAGS = (
+    (chess.BB_H1, 1),
+    (chess.BB_A1, 2),
+    (chess.BB_H8, 4),
+    (chess.BB_A8, 8),
+)
+
+
+def encode_move(move: Optional[chess.Move]) -> int:
+    """Pack a move into 16 bits: from (6), to (6), promotion piece (4)"""
+    if not move:
+        return 0
+    return move.from_square | (move.to_square << 6) | ((move.promotion or 0) << 12)
+
+
+def decode_move(code: int) -> chess.Move:
+    """Unpack a 16-bit move code"""
+    promotion = code >> 12
+    return chess.Move(code & 0x3F, (code >> 6) & 0x3F, promotion or None)
+
+
+def themes_to_mask(themes: Iterable[str]) -> int:
+    """Convert theme names to a bitmask (unknown themes are ignored)"""
+    mask = 0
+    for theme in themes:
+        bit = THEME_BITS.get(theme)
+        if bit is not None:
+            mask |= 1 << bit
+    return mask
+
+
+def mask_to_themes(mask: int) -> List[str]:
+    """Convert a theme bitmask back to theme names"""
+    return [theme for bit, theme in enumerate(THEMES) if mask >> bit & 1]
+
+
+def encode_record(puzzle: Dict) -> bytes:
+    """Encode parsed puzzle data (see PuzzleParser.parse) as a pack record"""
+    board = puzzle.get('board') or chess.Board(puzzle['fen'])
+    moves = puzzle['moves']
+    if len(moves) > MAX_SOLUTION_MOVES:
+        raise ValueError(f"Puzzle {puzzle.get('id')} has more than {MAX_SOLUTION_MOVES} solution moves")
+
+    castling = 0
+    for rook_bb, flag in CASTLING_FLAGS:
+        if board.castling_rights & rook_bb:
+            castling |= flag
+
+    codes = [encode_move(chess.Move.from_uci(uci)) for uci in moves]
+    codes += [0] * (MAX_SOLUTION_MOVES - len(codes))
+
+    last_move = None
+    if puzzle.get('last_move_uci'):
+        last_move = chess.Move.from_uci(puzzle['last_move_uci'])
+
+    theme_mask = themes_to_mask(puzzle.get('themes', []))
+
+    return RECORD.pack(
+        str(puzzle.get('id', '')).encode('ascii', 'replace')[:8],
+        board.occupied_co[chess.WHITE],
+        board.occupied_co[chess.BLACK],
+        board.pawns, board.knights, board.bishops,
+        board.rooks, board.queens, board.kings,
+        int(board.turn),
+        castling,
+        NO_EP_SQUARE if board.ep_square is None else board.ep_square,
+        min(board.halfmove_clock, 0xFFFF),
+        min(board.fullmove_number, 0xFFFF),
+        max(0, min(int(puzzle.get('rating', 1500)), 0xFFFF)),
+        theme_mask & 0xFFFFFFFFFFFFFFFF,
+        theme_mask >> 64,
+        encode_move(last_move),
+        len(moves),
+        *codes
+    )
+
+
+def decode_record(data, offset: int = 0) -> Dict:
+    """Decode a pack record into the same structure PuzzleParser produces"""
+    fields = RECORD.unpack_from(data, offset)
+    (puzzle_id, white, black, pawns, knights, bishops, rooks, queens, kings,
+     turn, castling, ep_square, halfmove, fullmove, rating,
+     themes_lo, themes_hi, last_move, move_count) = fields[:19]
+    codes = fields[19:19 + move_count]
+
+    board = chess.Board.empty()
+    board.occupied_co[chess.WHITE] = white
+    board.occupied_co[chess.BLACK] = black
+    board.occupied = white | black
+    board.pawns = pawns
+    board.knights = knights
+    board.bishops = bishops
+    board.rooks = rooks
+    board.queens = queens
+    board.kings = kings
+    board.turn = bool(turn)
+    board.castling_rights = 0
+    for rook_bb, flag in CASTLING_FLAGS:
+        if castling & flag:
+            board.castling_rights |= rook_bb
+    board.ep_square = None if ep_square == NO_EP_SQUARE else ep_square
+    board.halfmove_clock = halfmove
+    board.fullmove_number = fullmove
+
+    return {
+        'id': puzzle_id.rstrip(b'\0').decode('ascii'),
+        'board': board,
+        'fen': board.fen(),
+        'moves': [decode_move(code).uci() for code in codes],
+        'rating': rating,
+        'themes': mask_to_themes(themes_lo | (themes_hi << 64)),
+        'pgn': '',
+        'last_move_uci': decode_move(last_move).uci() if last_move else None
+    }
+
+
+class PuzzlePack:
+    """Random access to puzzles stored in a memory-mapped pack file"""
+
+    def __init__(self, path: str):
+        """Open and validate a pack file"""
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Empty puzzle pack: {path}")
+
+        magic, version, record_size, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != PACK_MAGIC or version != PACK_VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"Not a puzzle pack (or unsupported version): {path}")
+
+        # Trust the file length over the header so a crashed append is ignored
+        self.count = min(count, (len(self._mmap) - HEADER.size) // RECORD.size)
+
+    def __len__(self):
+        return self.count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping and file handle"""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def fingerprint(self, samples: int = 64) -> int:
+        """
+        64-bit stamp of the pack, for telling whether a saved index still matches it
+
+        Covers the file size and mtime, the header and ``samples`` evenly spaced
+        records, so it is cheap for any pack size yet changes when the pack is
+        rebuilt, even with the same number of puzzles.
+        """
+        stat = os.fstat(self._file.fileno())
+        digest = hashlib.blake2b(struct.pack('<QQ', stat.st_size, stat.st_mtime_ns), digest_size=8)
+        digest.update(self._mmap[:HEADER.size])
+        for index in range(0, self.count, max(1, self.count // samples)):
+            offset = self._offset(index)
+            digest.update(self._mmap[offset:offset + RECORD.size])
+        return int.from_bytes(digest.digest(), 'little')
+
+    def _offset(self, index: int) -> int:
+        if not 0 <= index < self.count:
+            raise IndexError(f"Puzzle index {index} out of range")
+        return HEADER.size + index * RECORD.size
+
+    def get_puzzle(self, index: int) -> Dict:
+        """Decode puzzle ``index`` (board, solution, rating, themes)"""
+        return decode_record(self._mmap, self._offset(index))
+
+    def get_id(self, index: int) -> str:
+        """Read only the ID of puzzle ``index``"""
+        offset = self._offset(index)
+        return self._mmap[offset:offset + 8].rstrip(b'\0').decode('ascii')
+
+    def get_rating(self, index: int) -> int:
+        """Read only the rating of puzzle ``index``"""
+        return RATING.unpack_from(self._mmap, self._offset(index) + RATING_OFFSET)[0]
+
+    def get_theme_mask(self, index: int) -> int:
+        """Read only the theme bitmask of puzzle ``index``"""
+        lo, hi = THEME_MASK.unpack_from(self._mmap, self._offset(index) + THEMES_OFFSET)
+        return lo | (hi << 64)
+
+    def random_index(self) -> int:
+        """Pick a uniformly random puzzle index"""
+        if not self.count:
+            raise IndexError("Puzzle pack is empty")
+        return random.randrange(self.count)
+
+    @staticmethod
+    def write(path: str, puzzles: Iterable[Dict]) -> int:
+        """Write a new pack (replacing any existing file), returns record count"""
+        with open(path, 'wb') as f:
+            f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, RECORD.size, 0))
+        return PuzzlePack.append(path, puzzles)
+
+    @staticmethod
+    def append(path: str, puzzles: Iterable[Dict]) -> int:
+        """Append puzzles to a pack (created if missing), returns records added"""
+        if not os.path.exists(path):
+            return PuzzlePack.write(path, puzzles)
+
+        added = 0
+        with open(path, 'r+b') as f:
+            magic, version, record_size, count = HEADER.unpack(f.read(HEADER.size))
+            if magic != PACK_MAGIC or version != PACK_VERSION or record_size != RECORD.size:
+                raise ValueError(f"Not a puzzle pack (or unsupported version): {path}")
+
+            f.seek(HEADER.size + count * RECORD.size)
+            for puzzle in puzzles:
+                f.write(encode_record(puzzle))
+                added += 1
+
+            # Header is updated last so readers never see half-written records
+            f.seek(0)
+            f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, RECORD.size, count + added))
+        return added
+
+    @staticmethod
+    def truncate(path: str, count: int):
+        """Drop every record after the first ``count`` (used to roll back a crashed run)"""
+        with open(path, 'r+b') as f:
+            magic, version, record_size, old_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != PACK_MAGIC or version != PACK_VERSION or record_size != RECORD.size:
+                raise ValueError(f"Not a puzzle pack (or unsupported version): {path}")
+            count = min(count, old_count)
+            f.seek(0)
+            f.write(HEADER.pack(PACK_MAGIC, PACK_VERSION, RECORD.size, count))
+            f.truncate(HEADER.size + count * RECORD.size)
+
+    @staticmethod
+    def iter_lichess_csv(path: str) -> Iterator[Dict]:
+        """
+        Read puzzles from the Lichess puzzle database CSV export
+
+        The CSV position is *before* the opponent's first move, so that move
+        is played here and becomes the puzzle's last move, matching the
+        structure PuzzleParser builds from the API.
+        """
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                moves = row['Moves'].split()
+                if len(moves) < 2 or len(moves) - 1 > MAX_SOLUTION_MOVES:
+                    continue
+                try:
+                    board = chess.Board(row['FEN'])
+                    first = chess.Move.from_uci(moves[0])
+                    last_move_san = board.san(first)
+                    board.push(first)
+                except ValueError:
+                    continue
+
+                yield {
+                    'id': row['PuzzleId'],
+                    'board': board,
+                    'fen': board.fen(),
+                    'moves': moves[1:],
+                    'rating': int(row.get('Rating') or 1500),
+                    'themes': row.get('Themes', '').split(),
+                    'pgn': '',
+                    'last_move_uci': moves[0],
+                    'last_move_san': last_move_san
+                }
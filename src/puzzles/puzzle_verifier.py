@@ -0,0 +1,250 @@
+"""Batch verification of puzzle packs with a pool of Stockfish workers"""
+
+import json
+import os
+import time
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+
+import chess
+import chess.engine
+
+from ai.engine_pool import EnginePool, worker_engine
+from puzzles.puzzle_pack import PuzzlePack
+from puzzles.scoring import MATE_SCORE, win_chances
+
+STATUS_OK = 'ok'
+STATUS_AMBIGUOUS = 'ambiguous'
+STATUS_BROKEN = 'broken'
+
+# Packs opened by the current worker process, keyed by path
+_worker_packs: Dict[str, PuzzlePack] = {}
+
+
+class VerifierSettings:
+    """Search limits and tolerances for judging a solution"""
+
+    def __init__(self, nodes: int = 300000, multipv: int = 3,
+                 min_win: float = 0.3, margin: float = 0.25, batch_size: int = 64):
+        """
+        Args:
+            nodes: Node budget per solver move (mate puzzles also get a mate bound)
+            multipv: Candidate moves compared at each solver move
+            min_win: Win chance the recorded move must keep (except equality puzzles)
+            margin: Win-chance gap within which another move counts as equally good
+            batch_size: Puzzles per worker job
+        """
+        self.nodes = nodes
+        self.multipv = multipv
+        self.min_win = min_win
+        self.margin = margin
+        self.batch_size = batch_size
+
+
+def _is_mate_for(score: chess.engine.Score) -> bool:
+    return score.is_mate() and score.mate() > 0
+
+
+def judge_move(scored: List[Tuple[str, chess.engine.Score]], expected: str,
+               settings: VerifierSettings, final: bool, equality: bool = False) -> Tuple[Optional[str], List[str]]:
+    """
+    Compare the recorded move with the engine's candidates at one solver move
+
+    Args:
+        scored: (uci, score) pairs from the solver's point of view, best first;
+            must include ``expected``
+        expected: Recorded solution move
+        final: Whether this is the last solver move of the puzzle
+        equality: Puzzle only asks to hold the balance, not to win
+
+    Returns:
+        (problem or None, alternative moves that are just as good)
+    """
+    scores = dict(scored)
+    expected_score = scores[expected]
+    best_score = scored[0][1]
+    expected_win = win_chances(expected_score.score(mate_score=MATE_SCORE))
+
+    if not equality and not _is_mate_for(expected_score) and expected_win < settings.min_win:
+        return "solution move does not win", []
+    if _is_mate_for(best_score) and not _is_mate_for(expected_score):
+        return f"misses mate with {scored[0][0]}", []
+    if win_chances(best_score.score(mate_score=MATE_SCORE)) - expected_win > settings.margin:
+        return f"{scored[0][0]} is clearly better", []
+
+    alternatives = []
+    for uci, score in scored:
+        if uci == expected:
+            continue
+        if _is_mate_for(expected_score):
+            # Any mate ends the puzzle; a slower mate only counts as a rival on the last move
+            if _is_mate_for(score) and (final or score.mate() <= expected_score.mate()):
+                alternatives.append(uci)
+        elif expected_win - win_chances(score.score(mate_score=MATE_SCORE)) <= settings.margin:
+            alternatives.append(uci)
+    return None, alternatives
+
+
+def verify_puzzle(engine: chess.engine.SimpleEngine, puzzle: Dict,
+                  settings: VerifierSettings) -> Dict:
+    """
+    Replay a puzzle's solution against the engine
+
+    Returns:
+        {'id', 'status', 'problems': [str], 'alternatives': {ply: [uci]}}
+    """
+    board = puzzle['board'].copy() if puzzle.get('board') is not None else chess.Board(puzzle['fen'])
+    moves = puzzle['moves']
+    themes = set(puzzle.get('themes', []))
+    solver = board.turn
+    problems = []
+    alternatives = {}
+
+    for ply in range(0, len(moves), 2):
+        try:
+            expected = chess.Move.from_uci(moves[ply])
+        except ValueError:
+            problems.append(f"ply {ply}: unreadable move {moves[ply]}")
+            break
+        if expected not in board.legal_moves:
+            problems.append(f"ply {ply}: illegal move {moves[ply]}")
+            break
+
+        remaining = (len(moves) - ply + 1) // 2
+        limit = chess.engine.Limit(nodes=settings.nodes, mate=remaining if 'mate' in themes else None)
+        infos = engine.analyse(board, limit, multipv=min(settings.multipv, board.legal_moves.count()))
+        scored = [(info['pv'][0].uci(), info['score'].pov(solver)) for info in infos if info.get('pv')]
+        if moves[ply] not in dict(scored):
+            info = engine.analyse(board, limit, root_moves=[expected])
+            scored.append((moves[ply], info['score'].pov(solver)))
+
+        final = ply + 1 >= len(moves)
+        problem, alts = judge_move(scored, moves[ply], settings, final, 'equality' in themes)
+        if problem:
+            problems.append(f"ply {ply}: {problem}")
+            break
+        if alts:
+            alternatives[ply] = alts
+
+        board.push(expected)
+        if ply + 1 < len(moves):
+            reply = chess.Move.from_uci(moves[ply + 1])
+            if reply not in board.legal_moves:
+                problems.append(f"ply {ply + 1}: illegal reply {moves[ply + 1]}")
+                break
+            board.push(reply)
+
+    if not problems and 'mate' in themes and not board.is_checkmate():
+        problems.append("mate puzzle does not end in mate")
+
+    # Alternative mates on the last move are fine; anything else is a second solution
+    last_ply = len(moves) - 1 - (len(moves) - 1) % 2
+    ambiguous = any(ply != last_ply or 'mate' not in themes for ply in alternatives)
+
+    if problems:
+        status = STATUS_BROKEN
+    elif ambiguous:
+        status = STATUS_AMBIGUOUS
+    else:
+        status = STATUS_OK
+    return {
+        'id': puzzle.get('id'),
+        'status': status,
+        'problems': problems,
+        'alternatives': alternatives
+    }
+
+
+def _verify_batch(pack_path: str, settings: VerifierSettings, start: int) -> List[Dict]:
+    """Worker job: verify ``settings.batch_size`` puzzles starting at ``start``"""
+    pack = _worker_packs.get(pack_path)
+    if pack is None:
+        pack = _worker_packs[pack_path] = PuzzlePack(pack_path)
+
+    results = []
+    for index in range(start, min(start + settings.batch_size, len(pack))):
+        puzzle = pack.get_puzzle(index)
+        try:
+            result = verify_puzzle(worker_engine(), puzzle, settings)
+        except chess.engine.EngineError as e:
+            result = {'id': puzzle['id'], 'status': STATUS_BROKEN,
+                      'problems': [f"engine error: {e}"], 'alternatives': {}}
+        result['index'] = index
+        results.append(result)
+    return results
+
+
+class PuzzleVerifier:
+    """
+    Verify every puzzle in a pack and stream results to a JSON-lines report
+
+    Puzzles are handed out in batches so workers spend their time searching
+    rather than passing messages. Indices already in the report are skipped,
+    so a stopped run can be restarted.
+    """
+
+    def __init__(self, pack_path: str, report_path: Optional[str] = None,
+                 workers: Optional[int] = None, stockfish_path: str = "stockfish",
+                 settings: Optional[VerifierSettings] = None):
+        self.pack_path = pack_path
+        self.report_path = report_path or pack_path + '.verify.jsonl'
+        self.workers = workers
+        self.stockfish_path = stockfish_path
+        self.settings = settings or VerifierSettings()
+        self.counts = {STATUS_OK: 0, STATUS_AMBIGUOUS: 0, STATUS_BROKEN: 0}
+
+    def _done_indices(self) -> set:
+        """Indices already in the report (counted towards the totals)"""
+        done = set()
+        if not os.path.exists(self.report_path):
+            return done
+        with open(self.report_path, 'r') as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                    done.add(result['index'])
+                    self.counts[result['status']] += 1
+                except (ValueError, KeyError):
+                    continue  # Torn last line from an interrupted run
+        return done
+
+    def run(self, progress: Optional[Callable[[str], None]] = print) -> Dict:
+        """
+        Verify all puzzles not yet in the report
+
+        Returns:
+            Status counts plus 'seconds' and 'per_second' for this run
+        """
+        if not EnginePool.is_available(self.stockfish_path):
+            raise RuntimeError(f"Stockfish not found: {self.stockfish_path}")
+
+        with PuzzlePack(self.pack_path) as pack:
+            total = len(pack)
+        done = self._done_indices()
+        batch_size = self.settings.batch_size
+        starts = [s for s in range(0, total, batch_size)
+                  if not all(i in done for i in range(s, min(s + batch_size, total)))]
+
+        job = partial(_verify_batch, self.pack_path, self.settings)
+        start_time = time.time()
+        verified = 0
+
+        with EnginePool(self.workers, self.stockfish_path) as pool, \
+                open(self.report_path, 'a') as report:
+            for results in pool.imap_unordered(job, starts):
+                for result in results:
+                    if result['index'] in done:
+                        continue
+                    report.write(json.dumps(result) + '\n')
+                    self.counts[result['status']] += 1
+                    verified += 1
+                report.flush()
+
+                if progress:
+                    rate = verified / max(time.time() - start_time, 1e-9)
+                    progress(f"🔍 {len(done) + verified}/{total} checked, "
+                             f"{self.counts[STATUS_BROKEN]} broken, "
+                             f"{self.counts[STATUS_AMBIGUOUS]} ambiguous ({rate:.1f}/s)")
+
+        seconds = time.time() - start_time
+        return dict(self.counts, seconds=seconds, per_second=verified / max(seconds, 1e-9))
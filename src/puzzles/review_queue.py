@@ -0,0 +1,178 @@
+"""Spaced-repetition review queue (SM-2)"""
+
+import heapq
+import itertools
+import json
+import os
+import time
+from typing import Dict, Optional
+
+DAY = 86400
+
+# SM-2 answer qualities used by the puzzle modes
+QUALITY_FAILED = 1
+QUALITY_SOLVED = 4
+
+# Puzzle fields worth keeping for offline replay
+PUZZLE_FIELDS = ('id', 'fen', 'moves', 'rating', 'themes', 'last_move_uci', 'last_move_san')
+
+
+def puzzle_payload(puzzle_data: Dict) -> Dict:
+    """Strip parsed puzzle data down to what a review needs (JSON-safe)"""
+    payload = {key: puzzle_data[key] for key in PUZZLE_FIELDS if key in puzzle_data}
+    if 'fen' not in payload and puzzle_data.get('board') is not None:
+        payload['fen'] = puzzle_data['board'].fen()
+    return payload
+
+
+class ReviewQueue:
+    """
+    SM-2 scheduler with a heap of due dates
+
+    Every change is appended to a JSON-lines journal, so recording a review
+    costs one heap push and one line write instead of rewriting the file.
+    The journal is compacted on load once it holds mostly stale lines.
+    """
+
+    REVIEW_FILE = 'puzzle_reviews.jsonl'
+
+    DEFAULT_EASE = 2.5
+    MIN_EASE = 1.3
+
+    def __init__(self, path: str = REVIEW_FILE):
+        """Load the queue from ``path`` (created on first review)"""
+        self.path = path
+        self.items: Dict[str, Dict] = {}
+        self._heap = []
+        self._counter = itertools.count()
+        self._load()
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item_id):
+        return item_id in self.items
+
+    def _load(self):
+        """Replay the journal; the last line for each item wins (removals included)"""
+        if not os.path.exists(self.path):
+            return
+
+        lines = 0
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        item = json.loads(line)
+                        if item.get('removed'):
+                            self.items.pop(item['id'], None)
+                        else:
+                            self.items[item['id']] = item
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Torn write from a crash
+        except OSError:
+            return
+
+        self._heap = [(item['due'], next(self._counter), item_id)
+                      for item_id, item in self.items.items()]
+        heapq.heapify(self._heap)
+
+        if lines > 2 * len(self.items) + 100:
+            self._compact()
+
+    def _compact(self):
+        """Rewrite the journal with one line per item"""
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'w') as f:
+                for item in self.items.values():
+                    f.write(json.dumps(item) + '\n')
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
+
+    def _append(self, item: Dict):
+        try:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(item) + '\n')
+        except OSError:
+            pass  # Queue still works in memory for this session
+
+    def record(self, item_id: str, payload: Dict, quality: int,
+               now: Optional[float] = None) -> Dict:
+        """
+        Schedule the next review of an item after an answer
+
+        Args:
+            item_id: Unique item key (e.g. puzzle ID)
+            payload: JSON-serialisable data needed to replay the item
+            quality: SM-2 answer quality, 0 (blackout) to 5 (perfect)
+        """
+        now = time.time() if now is None else now
+        item = self.items.get(item_id) or {
+            'id': item_id,
+            'ease': self.DEFAULT_EASE,
+            'interval': 0,
+            'repetitions': 0,
+            'lapses': 0
+        }
+
+        if quality < 3:
+            item['repetitions'] = 0
+            item['interval'] = 1
+            item['lapses'] += 1
+        else:
+            item['repetitions'] += 1
+            if item['repetitions'] == 1:
+                item['interval'] = 1
+            elif item['repetitions'] == 2:
+                item['interval'] = 6
+            else:
+                item['interval'] = round(item['interval'] * item['ease'])
+
+        item['ease'] = max(self.MIN_EASE,
+                           item['ease'] + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        item['due'] = now + item['interval'] * DAY
+        item['payload'] = payload
+
+        self.items[item_id] = item
+        heapq.heappush(self._heap, (item['due'], next(self._counter), item_id))
+        self._append(item)
+
+        # Rescheduling leaves stale heap entries behind; rebuild occasionally
+        if len(self._heap) > 2 * len(self.items) + 100:
+            self._heap = [(i['due'], next(self._counter), key) for key, i in self.items.items()]
+            heapq.heapify(self._heap)
+
+        return item
+
+    def remove(self, item_id: str):
+        """Forget an item (its heap entry is dropped lazily by next_due)"""
+        if self.items.pop(item_id, None) is not None:
+            self._append({'id': item_id, 'removed': True})
+
+    def record_puzzle(self, puzzle_data: Dict, solved: bool) -> Optional[Dict]:
+        """Queue a failed puzzle, or reschedule a solved one already queued"""
+        puzzle_id = puzzle_data.get('id')
+        if not puzzle_id or (solved and puzzle_id not in self.items):
+            return None
+        quality = QUALITY_SOLVED if solved else QUALITY_FAILED
+        return self.record(puzzle_id, puzzle_payload(puzzle_data), quality)
+
+    def next_due(self, now: Optional[float] = None) -> Optional[Dict]:
+        """Most overdue item, or None if nothing is due yet"""
+        now = time.time() if now is None else now
+        while self._heap:
+            due, _, item_id = self._heap[0]
+            item = self.items.get(item_id)
+            if item is None or item['due'] != due:
+                heapq.heappop(self._heap)  # Superseded by a later review
+                continue
+            return item if due <= now else None
+        return None
+
+    def due_count(self, now: Optional[float] = None) -> int:
+        """Number of items due for review"""
+        now = time.time() if now is None else now
+        return sum(1 for item in self.items.values() if item['due'] <= now)
@@ -0,0 +1,10 @@
+"""Engine-score helpers shared by the puzzle miner, verifier and solution checker"""
+
+import math
+
+MATE_SCORE = 100000
+
+
+def win_chances(cp: int) -> float:
+    """Map centipawns to [-1, 1] (Lichess' win-chance curve)"""
+    return 2 / (1 + math.exp(-0.00368208 * cp)) - 1
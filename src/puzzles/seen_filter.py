@@ -0,0 +1,160 @@
+"""Scalable Bloom filter of puzzles already served"""
+
+import hashlib
+import math
+import os
+import struct
+from typing import List, Tuple
+
+FILTER_MAGIC = b'CPZB'
+FILTER_VERSION = 1
+
+# magic, version, error rate, slice count
+FILTER_HEADER = struct.Struct('<4sHdI')
+# capacity, items added, hash count, bit count
+SLICE_HEADER = struct.Struct('<QQIQ')
+
+
+class _BloomSlice:
+    """One fixed-size Bloom filter inside the scalable filter"""
+
+    def __init__(self, capacity: int, error_rate: float, count: int = 0,
+                 hash_count: int = 0, bit_count: int = 0, bits: bytearray = None):
+        self.capacity = capacity
+        self.count = count
+        self.bit_count = bit_count or max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = hash_count or max(1, math.ceil(-math.log2(error_rate)))
+        self.bits = bits if bits is not None else bytearray((self.bit_count + 7) // 8)
+
+    def _positions(self, hashes: Tuple[int, int]):
+        h1, h2 = hashes
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.bit_count
+
+    def add(self, hashes: Tuple[int, int]):
+        for pos in self._positions(hashes):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, hashes: Tuple[int, int]) -> bool:
+        return all(self.bits[pos >> 3] >> (pos & 7) & 1 for pos in self._positions(hashes))
+
+
+class SeenFilter:
+    """
+    Scalable Bloom filter (Almeida et al.) with a memory cap
+
+    Each new slice doubles in capacity with a tighter error rate, keeping the
+    overall false-positive rate near ``error_rate``. Near ``max_bytes``
+    slices stop growing and the oldest one is dropped for each new one, so
+    puzzles seen long ago may come back but memory never exceeds the budget.
+    """
+
+    SEEN_FILE = 'seen_puzzles.bloom'
+
+    GROWTH = 2
+    TIGHTENING = 0.85
+
+    def __init__(self, path: str = SEEN_FILE, error_rate: float = 0.001,
+                 initial_capacity: int = 10000, max_bytes: int = 8 * 1024 * 1024):
+        """
+        Args:
+            path: File the filter is saved to and loaded from
+            error_rate: Target probability of treating a new puzzle as seen
+            initial_capacity: Puzzles held by the first slice
+            max_bytes: Memory budget for all slices
+        """
+        self.path = path
+        self.error_rate = error_rate
+        self.initial_capacity = initial_capacity
+        self.max_bytes = max_bytes
+        self.slices: List[_BloomSlice] = []
+        self._load()
+
+    def __len__(self):
+        """Approximate number of puzzles remembered"""
+        return sum(s.count for s in self.slices)
+
+    def __contains__(self, puzzle_id: str) -> bool:
+        hashes = self._hashes(puzzle_id)
+        return any(hashes in s for s in self.slices)
+
+    @staticmethod
+    def _hashes(puzzle_id: str) -> Tuple[int, int]:
+        """Two independent 64-bit hashes for double hashing"""
+        digest = hashlib.blake2b(puzzle_id.encode('utf-8'), digest_size=16).digest()
+        h1, h2 = struct.unpack('<QQ', digest)
+        return h1, h2 | 1
+
+    @property
+    def size_bytes(self) -> int:
+        """Memory used by the bit arrays"""
+        return sum(len(s.bits) for s in self.slices)
+
+    def _new_slice(self) -> _BloomSlice:
+        """Next slice in the geometric series, or a copy of the last at the cap"""
+        if not self.slices:
+            return _BloomSlice(self.initial_capacity, self.error_rate * (1 - self.TIGHTENING))
+
+        last = self.slices[-1]
+        capacity = last.capacity * self.GROWTH
+        generation = max(0, round(math.log(capacity / self.initial_capacity, self.GROWTH)))
+        error_rate = self.error_rate * (1 - self.TIGHTENING) * self.TIGHTENING ** generation
+        new_slice = _BloomSlice(capacity, error_rate)
+
+        if len(new_slice.bits) > self.max_bytes // 2:
+            # Stop growing and rotate same-sized slices through the budget
+            new_slice = _BloomSlice(last.capacity, error_rate,
+                                    hash_count=last.hash_count, bit_count=last.bit_count)
+        return new_slice
+
+    def add(self, puzzle_id: str):
+        """Remember a puzzle as seen"""
+        hashes = self._hashes(puzzle_id)
+        if self.slices and hashes in self.slices[-1]:
+            return
+
+        if not self.slices or self.slices[-1].count >= self.slices[-1].capacity:
+            new_slice = self._new_slice()
+            while self.slices and self.size_bytes + len(new_slice.bits) > self.max_bytes:
+                self.slices.pop(0)  # Forget the oldest history first
+            self.slices.append(new_slice)
+
+        self.slices[-1].add(hashes)
+
+    def _load(self):
+        """Load a saved filter, ignoring missing or corrupt files"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'rb') as f:
+                magic, version, error_rate, slice_count = FILTER_HEADER.unpack(f.read(FILTER_HEADER.size))
+                if magic != FILTER_MAGIC or version != FILTER_VERSION:
+                    return
+                slices = []
+                for _ in range(slice_count):
+                    capacity, count, hash_count, bit_count = SLICE_HEADER.unpack(f.read(SLICE_HEADER.size))
+                    bits = bytearray(f.read((bit_count + 7) // 8))
+                    if not bit_count or len(bits) != (bit_count + 7) // 8:
+                        return  # Truncated: lookups would index past the bits
+                    slices.append(_BloomSlice(capacity, error_rate, count, hash_count, bit_count, bits))
+                if f.read(1):
+                    return  # Trailing bytes: not a file we wrote
+        except (OSError, struct.error):
+            return
+
+        self.error_rate = error_rate
+        self.slices = slices
+
+    def save(self):
+        """Write the filter to disk"""
+        tmp_path = self.path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(FILTER_HEADER.pack(FILTER_MAGIC, FILTER_VERSION, self.error_rate, len(self.slices)))
+                for s in self.slices:
+                    f.write(SLICE_HEADER.pack(s.capacity, s.count, s.hash_count, s.bit_count))
+                    f.write(s.bits)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass  # Repeats are only a nuisance, never worth crashing over
@@ -0,0 +1,266 @@
+"""Find puzzles whose positions look alike
+
+Every puzzle becomes a fixed-width bit vector: the 12 piece bitboards, the
+squares around each king, a material signature and the theme mask.
+Similarity is the Tanimoto coefficient (shared bits / combined bits), which
+NumPy evaluates over the whole pack with a few vectorised ANDs and popcounts.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import chess
+
+from puzzles.puzzle_pack import HEADER, RECORD, themes_to_mask
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# 12 piece bitboards, 2 king zones, material, theme mask (2 words)
+FEATURE_WORDS = 17
+
+# First word of the extra row a saved matrix ends with; the second is the
+# fingerprint of the pack it was built from
+TRAILER_MAGIC = 0x4D49535A5043  # 'CPZSIM'
+
+PIECE_TYPES = (chess.PAWN, chess.KNIGHT, chess.BISHOP, chess.ROOK, chess.QUEEN, chess.KING)
+
+# Material signature: one "thermometer" bit per piece up to these counts, so
+# positions that differ by one piece share all but one bit
+MATERIAL_SLOTS = ((chess.PAWN, 8), (chess.KNIGHT, 2), (chess.BISHOP, 2),
+                  (chess.ROOK, 2), (chess.QUEEN, 1))
+
+# King square plus its neighbours
+KING_ZONES = [chess.BB_KING_ATTACKS[sq] | chess.BB_SQUARES[sq] for sq in chess.SQUARES]
+
+# Record fields the vectorised builder reads straight from the pack
+_RECORD_FIELDS = ['id', 'white', 'black', 'pawns', 'knights', 'bishops', 'rooks',
+                  'queens', 'kings', 'turn', 'castling', 'ep', 'halfmove', 'fullmove',
+                  'rating', 'themes_lo', 'themes_hi', 'last_move', 'move_count', 'moves']
+
+
+def _material_word(counts: Iterable[int]) -> int:
+    """Thermometer-encode piece counts (white slots first, then black)"""
+    word = 0
+    shift = 0
+    for count, (_, slots) in zip(counts, MATERIAL_SLOTS * 2):
+        word |= ((1 << min(count, slots)) - 1) << shift
+        shift += slots
+    return word
+
+
+def features(puzzle: Dict) -> List[int]:
+    """Feature words for one parsed puzzle (see PuzzleParser.parse)"""
+    board = puzzle.get('board') or chess.Board(puzzle['fen'])
+    words = []
+    for color in chess.COLORS:  # White first
+        for piece_type in PIECE_TYPES:
+            words.append(int(board.pieces(piece_type, color)))
+    for color in chess.COLORS:
+        king = board.king(color)
+        words.append(KING_ZONES[king] if king is not None else 0)
+
+    counts = [len(board.pieces(piece_type, color))
+              for color in chess.COLORS for piece_type, _ in MATERIAL_SLOTS]
+    words.append(_material_word(counts))
+
+    mask = themes_to_mask(puzzle.get('themes', []))
+    words += [mask & 0xFFFFFFFFFFFFFFFF, mask >> 64]
+    return words
+
+
+def tanimoto(a: List[int], b: List[int]) -> float:
+    """Similarity of two feature vectors, 0 (nothing shared) to 1 (identical)"""
+    shared = sum((x & y).bit_count() for x, y in zip(a, b))
+    combined = sum((x | y).bit_count() for x, y in zip(a, b))
+    return shared / combined if combined else 1.0
+
+
+if NUMPY_AVAILABLE:
+    if hasattr(np, 'bitwise_count'):
+        _popcount = np.bitwise_count
+    else:
+        _POPCOUNT8 = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+        def _popcount(words):
+            counts = _POPCOUNT8[words.view(np.uint8)]
+            return counts.reshape(words.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+    def _square_of(bitboards):
+        """Square index of single-bit bitboards (powers of two are exact in float64)"""
+        return np.log2(bitboards.astype(np.float64)).astype(np.intp)
+
+
+class SimilarityIndex:
+    """
+    Feature matrix over a puzzle pack with top-k Tanimoto search
+
+    With NumPy the matrix is an (N, 17) uint64 array that can be saved and
+    memory-mapped; without it, rows are lists of ints and searches are a
+    plain Python scan (fine for small collections).
+    """
+
+    CHUNK_ROWS = 65536  # Rows scored per step, bounding temporary memory
+
+    def __init__(self, matrix, fingerprint: int = 0):
+        """
+        Args:
+            matrix: One feature row per puzzle
+            fingerprint: PuzzlePack.fingerprint() of the pack it was built from
+        """
+        self.matrix = matrix
+        self.fingerprint = fingerprint
+        if NUMPY_AVAILABLE:
+            self._row_bits = _popcount(matrix).sum(axis=1, dtype=np.int32)
+        else:
+            self._row_bits = [sum(w.bit_count() for w in row) for row in matrix]
+
+    def __len__(self):
+        return len(self.matrix)
+
+    @classmethod
+    def from_puzzles(cls, puzzles: Iterable[Dict]) -> 'SimilarityIndex':
+        """Build from parsed puzzles (row order follows the input)"""
+        rows = [features(p) for p in puzzles]
+        if NUMPY_AVAILABLE:
+            matrix = np.array(rows, dtype=np.uint64).reshape(-1, FEATURE_WORDS)
+            return cls(matrix)
+        return cls(rows)
+
+    @classmethod
+    def build(cls, pack) -> 'SimilarityIndex':
+        """Build from a PuzzlePack, reading the bitboards straight from its records"""
+        if not NUMPY_AVAILABLE:
+            index = cls.from_puzzles(pack.get_puzzle(i) for i in range(len(pack)))
+            index.fingerprint = pack.fingerprint()
+            return index
+
+        formats = ['S8'] + ['<u8'] * 8 + ['u1'] * 3 + ['<u2'] * 3 + ['<u8'] * 2 + ['<u2', 'u1', ('<u2', 16)]
+        dtype = np.dtype({'names': _RECORD_FIELDS, 'formats': formats})
+        assert dtype.itemsize == RECORD.size
+        records = np.frombuffer(pack._mmap, dtype=dtype, count=len(pack), offset=HEADER.size)
+
+        count = len(records)
+        matrix = np.zeros((count, FEATURE_WORDS), dtype=np.uint64)
+        sides = (records['white'], records['black'])
+        kinds = [records[name] for name in ('pawns', 'knights', 'bishops', 'rooks', 'queens', 'kings')]
+        king_zones = np.array(KING_ZONES, dtype=np.uint64)
+
+        column = 0
+        for side in sides:
+            for kind in kinds:
+                matrix[:, column] = side & kind
+                column += 1
+        for side in sides:
+            kings = side & records['kings']
+            has_king = kings != 0
+            matrix[has_king, column] = king_zones[_square_of(kings[has_king])]
+            column += 1
+
+        material = np.zeros(count, dtype=np.uint64)
+        shift = 0
+        for side in sides:
+            for piece_type, slots in MATERIAL_SLOTS:
+                pieces = _popcount(side & kinds[piece_type - 1]).astype(np.uint64)
+                thermometer = (np.uint64(1) << np.minimum(pieces, np.uint64(slots))) - np.uint64(1)
+                material |= thermometer << np.uint64(shift)
+                shift += slots
+        matrix[:, column] = material
+        matrix[:, column + 1] = records['themes_lo']
+        matrix[:, column + 2] = records['themes_hi']
+        return cls(matrix, pack.fingerprint())
+
+    def save(self, path: str):
+        """Write the matrix and a trailer row with the pack fingerprint as a .npy file (NumPy only)"""
+        tmp_path = path + '.tmp'
+        out = np.lib.format.open_memmap(tmp_path, mode='w+', dtype=np.uint64,
+                                        shape=(len(self.matrix) + 1, FEATURE_WORDS))
+        out[:-1] = self.matrix
+        out[-1] = 0
+        out[-1, :2] = (TRAILER_MAGIC, self.fingerprint)
+        out.flush()
+        del out
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'SimilarityIndex':
+        """Memory-map a matrix written by save()"""
+        matrix = np.load(path, mmap_mode='r')
+        if (matrix.ndim != 2 or matrix.shape[1] != FEATURE_WORDS or matrix.dtype != np.uint64
+                or not len(matrix) or matrix[-1, 0] != TRAILER_MAGIC):
+            raise ValueError(f"Not a similarity matrix: {path}")
+        return cls(matrix[:-1], int(matrix[-1, 1]))
+
+    @classmethod
+    def load_or_build(cls, pack, path: Optional[str] = None) -> 'SimilarityIndex':
+        """Load the matrix stored next to a pack, rebuilding it if stale or missing"""
+        if not NUMPY_AVAILABLE:
+            return cls.build(pack)
+
+        path = path or pack.path + '.sim.npy'
+        if os.path.exists(path):
+            try:
+                index = cls.load(path)
+                # The count alone misses a pack rebuilt with the same number of puzzles
+                if len(index) == len(pack) and index.fingerprint == pack.fingerprint():
+                    return index
+            except (OSError, ValueError):
+                pass
+
+        index = cls.build(pack)
+        try:
+            index.save(path)
+        except OSError:
+            pass
+        return index
+
+    def top_k(self, query: List[int], k: int = 10,
+              exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """
+        Most similar rows to a feature vector
+
+        Returns:
+            [(row index, similarity)] best first
+        """
+        exclude = set(exclude)
+        want = k + len(exclude)
+
+        if not NUMPY_AVAILABLE:
+            scored = sorted(((tanimoto(query, row), i) for i, row in enumerate(self.matrix)),
+                            reverse=True)
+            return [(i, score) for score, i in scored if i not in exclude][:k]
+
+        q = np.array(query, dtype=np.uint64)
+        query_bits = int(_popcount(q).sum())
+        best_rows = []
+        best_scores = []
+        for start in range(0, len(self.matrix), self.CHUNK_ROWS):
+            chunk = self.matrix[start:start + self.CHUNK_ROWS]
+            shared = _popcount(chunk & q).sum(axis=1, dtype=np.int32)
+            combined = self._row_bits[start:start + len(chunk)] + query_bits - shared
+            scores = shared / np.maximum(combined, 1)
+            if len(scores) > want:
+                keep = np.argpartition(scores, -want)[-want:]
+            else:
+                keep = np.arange(len(scores))
+            best_rows.append(keep + start)
+            best_scores.append(scores[keep])
+
+        rows = np.concatenate(best_rows)
+        scores = np.concatenate(best_scores)
+        order = np.argsort(-scores, kind='stable')
+        results = []
+        for i in order:
+            row = int(rows[i])
+            if row not in exclude:
+                results.append((row, float(scores[i])))
+                if len(results) == k:
+                    break
+        return results
+
+    def similar_to(self, puzzle: Dict, k: int = 10, exclude: Iterable[int] = ()) -> List[Tuple[int, float]]:
+        """Most similar puzzles to a parsed puzzle"""
+        return self.top_k(features(puzzle), k, exclude)
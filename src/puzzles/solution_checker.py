@@ -0,0 +1,203 @@
+"""Accept alternative puzzle solutions that are just as good as the recorded one"""
+
+import shutil
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+import chess
+import chess.engine
+import chess.polyglot
+
+from ai.stockfish_engine import StockfishEngine
+from puzzles.scoring import MATE_SCORE, win_chances
+
+
+class _SearchBudgetExceeded(Exception):
+    pass
+
+
+def find_mate(board: chess.Board, solver_moves: int, first: Optional[chess.Move] = None,
+              max_nodes: int = 4000) -> Optional[List[chess.Move]]:
+    """
+    Pure-python mate search for the side to move
+
+    Returns a mating line (solver move first, best defence for the replies)
+    of at most ``solver_moves`` solver moves, or None if there is none or the
+    node budget runs out. ``first`` restricts the search to one first move.
+    """
+    nodes = [0]
+
+    def attack(depth, root=False):
+        # On the last move only checks can mate; otherwise try checks first
+        if root and first is not None:
+            moves = [first]
+        else:
+            moves = list(board.legal_moves)
+            # Ordering costs a gives_check per move, so it is paid from the budget too
+            nodes[0] += len(moves)
+            moves.sort(key=lambda m: not board.gives_check(m))
+        for move in moves:
+            if depth == 1 and not board.gives_check(move):
+                break
+            nodes[0] += 1
+            if nodes[0] > max_nodes:
+                raise _SearchBudgetExceeded
+            board.push(move)
+            try:
+                if board.is_checkmate():
+                    return [move]
+                if depth > 1 and not board.is_game_over():
+                    line = defend(depth - 1)
+                    if line is not None:
+                        return [move] + line
+            finally:
+                board.pop()
+        return None
+
+    def defend(depth):
+        # Every reply must still lose; keep the longest line as best defence
+        longest = None
+        for reply in list(board.legal_moves):
+            nodes[0] += 1
+            if nodes[0] > max_nodes:
+                raise _SearchBudgetExceeded
+            board.push(reply)
+            try:
+                line = attack(depth)
+            finally:
+                board.pop()
+            if line is None:
+                return None
+            if longest is None or len(line) + 1 > len(longest):
+                longest = [reply] + line
+        return longest
+
+    board = board.copy(stack=False)
+    try:
+        return attack(solver_moves, root=True)
+    except _SearchBudgetExceeded:
+        return None
+
+
+class SolutionChecker:
+    """
+    Judge moves that differ from a puzzle's recorded solution
+
+    Uses Stockfish (started on first use) when it is installed and a small
+    mate search otherwise. Verdicts are cached per (position, move), so a
+    retried move costs nothing.
+    """
+
+    CACHE_SIZE = 4096
+
+    def __init__(self, stockfish_path: str = "stockfish", time_limit: float = 0.08,
+                 nodes: int = 200000, margin: float = 0.15):
+        """
+        Args:
+            stockfish_path: Path to stockfish binary
+            time_limit: Seconds Stockfish may spend on one move
+            nodes: Node budget for Stockfish per move
+            margin: Win-chance loss allowed against the recorded move
+        """
+        self.stockfish_path = stockfish_path
+        self.time_limit = time_limit
+        self.nodes = nodes
+        self.margin = margin
+        self.stockfish: Optional[StockfishEngine] = None
+        self._stockfish_failed = False
+        self._cache: OrderedDict = OrderedDict()
+
+    def _engine(self) -> Optional[chess.engine.SimpleEngine]:
+        """Running Stockfish, or None to use the local fallback"""
+        if self.stockfish is None and not self._stockfish_failed:
+            if shutil.which(self.stockfish_path):
+                self.stockfish = StockfishEngine(self.stockfish_path)
+                if not self.stockfish.start():
+                    self.stockfish = None
+            self._stockfish_failed = self.stockfish is None
+        return self.stockfish.engine if self.stockfish else None
+
+    def close(self):
+        """Stop Stockfish if it was started"""
+        if self.stockfish:
+            self.stockfish.stop()
+            self.stockfish = None
+
+    def check(self, board: chess.Board, move: chess.Move, expected: chess.Move,
+              solver_moves: int, mate: bool, key: Optional[int] = None) -> Tuple[bool, Optional[List[str]]]:
+        """
+        Decide whether ``move`` solves the puzzle as well as ``expected``
+
+        Args:
+            board: Position with the solver to move
+            move: Legal move played instead of ``expected``
+            solver_moves: Solver moves left in the recorded line (this one included)
+            mate: Whether the recorded line ends in mate
+            key: Zobrist key of ``board``, if the caller already has it
+
+        Returns:
+            (accepted, new remaining line in UCI starting with the opponent's
+            reply, or None if the recorded line should not be replaced)
+        """
+        if key is None:
+            key = chess.polyglot.zobrist_hash(board)
+        key = (key, move, expected, solver_moves, mate)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        engine = self._engine()
+        if engine is not None:
+            try:
+                verdict = self._check_with_engine(engine, board, move, expected, solver_moves, mate)
+            except chess.engine.EngineError:
+                verdict = self._check_locally(board, move, solver_moves, mate)
+        else:
+            verdict = self._check_locally(board, move, solver_moves, mate)
+
+        self._cache[key] = verdict
+        if len(self._cache) > self.CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return verdict
+
+    def _check_locally(self, board, move, solver_moves, mate):
+        """Without an engine only mates can be proven"""
+        if not mate:
+            return False, None
+        line = find_mate(board, solver_moves, first=move)
+        if line is None:
+            return False, None
+        return True, [m.uci() for m in line[1:]]
+
+    def _check_with_engine(self, engine, board, move, expected, solver_moves, mate):
+        solver = board.turn
+        limit = chess.engine.Limit(time=self.time_limit, nodes=self.nodes,
+                                   mate=solver_moves if mate else None)
+        infos = engine.analyse(board, limit, multipv=2, root_moves=[move, expected])
+        scores = {info['pv'][0]: info for info in infos if info.get('pv')}
+        if move not in scores:
+            return False, None
+
+        score = scores[move]['score'].pov(solver)
+        pv = scores[move]['pv']
+        if mate:
+            accepted = score.is_mate() and 0 < score.mate() <= solver_moves
+            # The line must reach mate, or the user would be left mid-puzzle
+            if accepted:
+                probe = board.copy(stack=False)
+                for pv_move in pv:
+                    probe.push(pv_move)
+                accepted = probe.is_checkmate()
+        else:
+            ref = scores.get(expected, {}).get('score')
+            ref_win = win_chances(ref.pov(solver).score(mate_score=MATE_SCORE)) if ref else 1.0
+            accepted = win_chances(score.score(mate_score=MATE_SCORE)) >= ref_win - self.margin
+
+        if not accepted:
+            return False, None
+
+        # Follow the engine's line for as long as the recorded one would have run
+        rest = pv[1:2 * solver_moves - 1]
+        if len(rest) % 2:
+            rest = rest[:-1]
+        return True, [m.uci() for m in rest]
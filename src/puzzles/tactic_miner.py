@@ -0,0 +1,309 @@
+"""Mine tactics puzzles from stored games with a pool of Stockfish workers"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+from functools import partial
+from typing import Callable, Dict, Iterator, List, Optional
+
+import chess
+import chess.engine
+import chess.pgn
+
+from ai.engine_pool import EnginePool, worker_engine
+from puzzles.puzzle_pack import MAX_SOLUTION_MOVES, PuzzlePack
+from puzzles.scoring import MATE_SCORE, win_chances
+
+
+def _pov_cp(score: chess.engine.PovScore, color: chess.Color) -> int:
+    return score.pov(color).score(mate_score=MATE_SCORE)
+
+
+class MinerSettings:
+    """Thresholds for finding and extracting tactics"""
+
+    def __init__(self, scan_nodes: int = 60000, line_nodes: int = 600000,
+                 min_swing: float = 0.5, min_win: float = 0.6,
+                 unique_margin: float = 0.5, max_solver_moves: int = 6):
+        """
+        Args:
+            scan_nodes: Node budget per ply for the cheap first pass
+            line_nodes: Node budget for multipv checks along candidate lines
+            min_swing: Win-chance drop that marks a blunder
+            min_win: Win chance the solver must have after the blunder
+            unique_margin: Win-chance gap between best and second-best move
+            max_solver_moves: Longest solution, in solver moves
+        """
+        self.scan_nodes = scan_nodes
+        self.line_nodes = line_nodes
+        self.min_swing = min_swing
+        self.min_win = min_win
+        self.unique_margin = unique_margin
+        self.max_solver_moves = min(max_solver_moves, (MAX_SOLUTION_MOVES + 1) // 2)
+
+
+def _is_unique(infos: List[Dict], color: chess.Color, settings: MinerSettings) -> bool:
+    """True if the best move is clearly better than every alternative"""
+    if len(infos) < 2 or 'score' not in infos[1]:
+        return True
+    best = infos[0]['score'].pov(color)
+    second = infos[1]['score'].pov(color)
+    if best.is_mate():
+        return not (second.is_mate() and second.mate() > 0)
+    return (win_chances(best.score(mate_score=MATE_SCORE))
+            - win_chances(second.score(mate_score=MATE_SCORE))) >= settings.unique_margin
+
+
+def _is_forcing(board: chess.Board, move: chess.Move) -> bool:
+    return board.is_capture(move) or board.gives_check(move) or move.promotion is not None
+
+
+def extract_line(engine: chess.engine.SimpleEngine, board: chess.Board,
+                 settings: MinerSettings) -> List[chess.Move]:
+    """
+    Follow the engine's line while the solver's move stays the only one and still wins
+
+    Returns the solution (solver move first, ending on a solver move), or an
+    empty list if even the first move is ambiguous.
+    """
+    solver = board.turn
+    board = board.copy(stack=False)
+    line = []
+    limit = chess.engine.Limit(nodes=settings.line_nodes)
+
+    while len(line) // 2 < settings.max_solver_moves:
+        infos = engine.analyse(board, limit, multipv=2)
+        if not infos or not infos[0].get('pv') or not _is_unique(infos, solver, settings):
+            break
+        if win_chances(_pov_cp(infos[0]['score'], solver)) < settings.min_win:
+            break  # The advantage has faded; the tactic is over
+
+        move = infos[0]['pv'][0]
+        forcing = _is_forcing(board, move)
+        board.push(move)
+        line.append(move)
+        if board.is_game_over():
+            return line
+
+        # Continue only while the play stays forcing (the win is checked on the next pass)
+        reply = engine.play(board, limit).move
+        if reply is None:
+            break
+        forcing = forcing or _is_forcing(board, reply)
+        board.push(reply)
+        line.append(reply)
+        if not forcing:
+            break
+
+    # A solution always ends on the solver's move
+    if len(line) % 2 == 0:
+        line = line[:-1]
+    return line
+
+
+def classify_themes(board: chess.Board, line: List[chess.Move]) -> List[str]:
+    """Basic Lichess-style themes for a mined line"""
+    final = board.copy(stack=False)
+    for move in line:
+        final.push(move)
+
+    solver_moves = (len(line) + 1) // 2
+    themes = []
+    if final.is_checkmate():
+        themes.append('mate')
+        if solver_moves <= 5:
+            themes.append(f'mateIn{solver_moves}')
+    else:
+        themes.append('crushing' if solver_moves > 1 else 'advantage')
+    themes.append({1: 'oneMove', 2: 'short', 3: 'long'}.get(solver_moves, 'veryLong'))
+
+    pieces = chess.popcount(board.occupied & ~board.pawns & ~board.kings)
+    if pieces <= 6:
+        themes.append('endgame')
+    elif board.fullmove_number <= 12:
+        themes.append('opening')
+    else:
+        themes.append('middlegame')
+    return themes
+
+
+def estimate_rating(board: chess.Board, line: List[chess.Move]) -> int:
+    """Rough starting rating until real attempts calibrate it"""
+    solver_moves = (len(line) + 1) // 2
+    replay = board.copy(stack=False)
+    quiet = 0
+    for i, move in enumerate(line):
+        if i % 2 == 0 and not _is_forcing(replay, move):
+            quiet += 1
+        replay.push(move)
+    return 1100 + 250 * (solver_moves - 1) + 200 * quiet
+
+
+def puzzle_id(game_key: str, ply: int) -> str:
+    """Stable 8-character ID so re-mining a game yields the same puzzles"""
+    digest = hashlib.blake2b(f"{game_key}:{ply}".encode('utf-8'), digest_size=5).digest()
+    return base64.b32encode(digest).decode('ascii').lower()
+
+
+def mine_game(engine: chess.engine.SimpleEngine, game: chess.pgn.Game,
+              settings: MinerSettings, game_key: str) -> List[Dict]:
+    """Find puzzles in one game"""
+    board = game.board()
+    moves = list(game.mainline_moves())
+    if not moves:
+        return []
+
+    # Cheap pass: one evaluation per position
+    scan = chess.engine.Limit(nodes=settings.scan_nodes)
+    scores = []
+    positions = []
+    for move in moves:
+        positions.append(board.copy(stack=False))
+        scores.append(engine.analyse(board, scan)['score'])
+        board.push(move)
+    positions.append(board.copy(stack=False))
+    scores.append(engine.analyse(board, scan)['score'] if not board.is_game_over() else None)
+
+    puzzles = []
+    for ply, move in enumerate(moves):
+        after = scores[ply + 1]
+        if after is None:
+            continue
+        mover = positions[ply].turn
+        solver = not mover
+        swing = win_chances(_pov_cp(scores[ply], solver)) - win_chances(_pov_cp(after, solver))
+        if -swing < settings.min_swing or win_chances(_pov_cp(after, solver)) < settings.min_win:
+            continue
+
+        start = positions[ply + 1]
+        line = extract_line(engine, start, settings)
+        if not line:
+            continue
+
+        puzzles.append({
+            'id': puzzle_id(game_key, ply),
+            'fen': start.fen(),
+            'moves': [m.uci() for m in line],
+            'rating': estimate_rating(start, line),
+            'themes': classify_themes(start, line),
+            'pgn': '',
+            'last_move_uci': move.uci(),
+            'last_move_san': positions[ply].san(move)
+        })
+    return puzzles
+
+
+def _mine_offset(pgn_path: str, settings: MinerSettings, offset: int):
+    """Worker job: mine the game starting at ``offset`` of the PGN file"""
+    with open(pgn_path, encoding='utf-8', errors='replace') as f:
+        f.seek(offset)
+        game = chess.pgn.read_game(f)
+    if game is None:
+        return offset, []
+    game_key = game.headers.get('Site') or f"{os.path.basename(pgn_path)}@{offset}"
+    try:
+        return offset, mine_game(worker_engine(), game, settings, game_key)
+    except chess.engine.EngineError:
+        return offset, []
+
+
+def game_offsets(pgn_path: str) -> Iterator[int]:
+    """Yield the start offset of every game, reading headers only"""
+    with open(pgn_path, encoding='utf-8', errors='replace') as f:
+        while True:
+            offset = f.tell()
+            if chess.pgn.read_headers(f) is None:
+                return
+            yield offset
+
+
+class TacticMiner:
+    """
+    Mine a PGN collection into the local puzzle pack
+
+    Progress is checkpointed together with the pack's record count, so an
+    interrupted run resumes where it stopped without duplicate puzzles.
+    """
+
+    CHECKPOINT_EVERY = 50  # games
+
+    def __init__(self, pgn_path: str, pack_path: str, checkpoint_path: Optional[str] = None,
+                 workers: Optional[int] = None, stockfish_path: str = "stockfish",
+                 settings: Optional[MinerSettings] = None):
+        self.pgn_path = pgn_path
+        self.pack_path = pack_path
+        self.checkpoint_path = checkpoint_path or pgn_path + '.mine.json'
+        self.workers = workers
+        self.stockfish_path = stockfish_path
+        self.settings = settings or MinerSettings()
+        self.done = set()
+        self.games = 0
+        self.puzzles = 0
+
+    def _load_checkpoint(self):
+        """Restore progress and roll the pack back to the last checkpoint"""
+        if not os.path.exists(self.checkpoint_path):
+            return
+        with open(self.checkpoint_path, 'r') as f:
+            data = json.load(f)
+        self.done = set(data['done'])
+        self.games = data['games']
+        self.puzzles = data['puzzles']
+        if os.path.exists(self.pack_path):
+            PuzzlePack.truncate(self.pack_path, data['pack_count'])
+
+    def _save_checkpoint(self):
+        pack_count = 0
+        if os.path.exists(self.pack_path):
+            with PuzzlePack(self.pack_path) as pack:
+                pack_count = len(pack)
+        data = {
+            'pgn': self.pgn_path,
+            'done': sorted(self.done),
+            'games': self.games,
+            'puzzles': self.puzzles,
+            'pack_count': pack_count
+        }
+        tmp_path = self.checkpoint_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def run(self, progress: Optional[Callable[[str], None]] = print) -> Dict:
+        """
+        Mine every game not yet in the checkpoint
+
+        Returns:
+            {'games': int, 'puzzles': int, 'seconds': float}
+        """
+        if not EnginePool.is_available(self.stockfish_path):
+            raise RuntimeError(f"Stockfish not found: {self.stockfish_path}")
+
+        self._load_checkpoint()
+        start = time.time()
+        job = partial(_mine_offset, self.pgn_path, self.settings)
+        todo = (offset for offset in game_offsets(self.pgn_path) if offset not in self.done)
+        since_checkpoint = 0
+
+        with EnginePool(self.workers, self.stockfish_path) as pool:
+            try:
+                for offset, puzzles in pool.imap_unordered(job, todo):
+                    if puzzles:
+                        PuzzlePack.append(self.pack_path, puzzles)
+                    self.done.add(offset)
+                    self.games += 1
+                    self.puzzles += len(puzzles)
+                    since_checkpoint += 1
+
+                    if since_checkpoint >= self.CHECKPOINT_EVERY:
+                        self._save_checkpoint()
+                        since_checkpoint = 0
+                        if progress:
+                            rate = self.games / max(time.time() - start, 1e-9)
+                            progress(f"⛏️  {self.games} games, {self.puzzles} puzzles ({rate:.1f} games/s)")
+            finally:
+                self._save_checkpoint()
+
+        return {'games': self.games, 'puzzles': self.puzzles, 'seconds': time.time() - start}
@@ -0,0 +1,211 @@
+"""Theme and rating index over a puzzle pack
+
+Puzzles are renumbered by rating ("ranks"), so any rating range is a
+contiguous run of ranks. Each theme maps to a bitset over ranks, held as a
+Python int, which makes "fork AND endgame, rating 1600-1900" a handful of
+big-int shifts and ANDs instead of a scan over the pack.
+"""
+
+import os
+import random
+import struct
+import zlib
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from puzzles.puzzle_pack import THEMES
+
+INDEX_MAGIC = b'CPZI'
+INDEX_VERSION = 2
+
+# magic, version, puzzle count, theme count, pack fingerprint
+INDEX_HEADER = struct.Struct('<4sHQHQ')
+# theme bit, compressed bitset length
+THEME_HEADER = struct.Struct('<HI')
+
+MAX_RATING = 0xFFFF
+
+
+class ThemeIndex:
+    """Inverted theme index with a rating-sorted puzzle order"""
+
+    def __init__(self, sorted_ratings: array, by_rating: array, theme_bits: Dict[str, int],
+                 fingerprint: int = 0):
+        """
+        Args:
+            sorted_ratings: Puzzle ratings in ascending order
+            by_rating: Pack index of the puzzle at each rank
+            theme_bits: Theme name -> bitset of ranks carrying that theme
+            fingerprint: PuzzlePack.fingerprint() of the pack it was built from
+        """
+        self.sorted_ratings = sorted_ratings
+        self.by_rating = by_rating
+        self.theme_bits = theme_bits
+        self.fingerprint = fingerprint
+
+    def __len__(self):
+        return len(self.by_rating)
+
+    @classmethod
+    def build(cls, pack) -> 'ThemeIndex':
+        """Build the index with a single pass over a PuzzlePack"""
+        count = len(pack)
+        ratings = [pack.get_rating(i) for i in range(count)]
+        order = sorted(range(count), key=ratings.__getitem__)
+
+        sorted_ratings = array('H', (ratings[i] for i in order))
+        by_rating = array('I', order)
+
+        bitmaps = {}
+        for rank, index in enumerate(order):
+            mask = pack.get_theme_mask(index)
+            while mask:
+                low = mask & -mask
+                bit = low.bit_length() - 1
+                mask ^= low
+                bitmap = bitmaps.get(bit)
+                if bitmap is None:
+                    bitmap = bitmaps[bit] = bytearray((count + 7) // 8)
+                bitmap[rank >> 3] |= 1 << (rank & 7)
+
+        theme_bits = {
+            THEMES[bit]: int.from_bytes(bitmap, 'little')
+            for bit, bitmap in bitmaps.items()
+        }
+        return cls(sorted_ratings, by_rating, theme_bits, pack.fingerprint())
+
+    @classmethod
+    def load(cls, path: str) -> 'ThemeIndex':
+        """Load an index written by save()"""
+        with open(path, 'rb') as f:
+            magic, version, count, theme_count, fingerprint = INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                raise ValueError(f"Not a theme index (or unsupported version): {path}")
+
+            sorted_ratings = array('H')
+            sorted_ratings.frombytes(f.read(count * sorted_ratings.itemsize))
+            by_rating = array('I')
+            by_rating.frombytes(f.read(count * by_rating.itemsize))
+
+            theme_bits = {}
+            for _ in range(theme_count):
+                bit, length = THEME_HEADER.unpack(f.read(THEME_HEADER.size))
+                theme_bits[THEMES[bit]] = int.from_bytes(zlib.decompress(f.read(length)), 'little')
+
+        return cls(sorted_ratings, by_rating, theme_bits, fingerprint)
+
+    def save(self, path: str):
+        """Write the index; theme bitsets are zlib-compressed on disk"""
+        count = len(self.by_rating)
+        bitset_bytes = (count + 7) // 8
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, count, len(self.theme_bits),
+                                      self.fingerprint))
+            f.write(self.sorted_ratings.tobytes())
+            f.write(self.by_rating.tobytes())
+            for theme, bits in self.theme_bits.items():
+                data = zlib.compress(bits.to_bytes(bitset_bytes, 'little'))
+                f.write(THEME_HEADER.pack(THEMES.index(theme), len(data)))
+                f.write(data)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load_or_build(cls, pack, path: Optional[str] = None) -> 'ThemeIndex':
+        """Load the index stored next to a pack, rebuilding it if stale or missing"""
+        path = path or pack.path + '.idx'
+        if os.path.exists(path):
+            try:
+                index = cls.load(path)
+                # The count alone misses a pack rebuilt with the same number of puzzles
+                if len(index) == len(pack) and index.fingerprint == pack.fingerprint():
+                    return index
+            except (OSError, ValueError, zlib.error):
+                pass
+
+        index = cls.build(pack)
+        try:
+            index.save(path)
+        except OSError:
+            pass  # Read-only install: keep the in-memory index
+        return index
+
+    def _rank_range(self, min_rating: int, max_rating: int) -> Tuple[int, int]:
+        """Ranks [start, end) of puzzles rated within [min_rating, max_rating]"""
+        start = bisect_left(self.sorted_ratings, max(0, min_rating))
+        end = bisect_right(self.sorted_ratings, min(max_rating, MAX_RATING))
+        return start, max(start, end)
+
+    def _match_bits(self, themes: Iterable[str], start: int, end: int) -> Optional[int]:
+        """Bitset of matches relative to ``start``, or None when no theme filter applies"""
+        themes = list(themes)
+        if not themes:
+            return None
+
+        bits = (1 << (end - start)) - 1
+        for theme in themes:
+            bits &= self.theme_bits.get(theme, 0) >> start
+            if not bits:
+                break
+        return bits
+
+    def count(self, themes: Iterable[str] = (), min_rating: int = 0,
+              max_rating: int = MAX_RATING) -> int:
+        """Number of puzzles with all ``themes`` rated within the range"""
+        start, end = self._rank_range(min_rating, max_rating)
+        bits = self._match_bits(themes, start, end)
+        return end - start if bits is None else bits.bit_count()
+
+    def sample(self, themes: Iterable[str] = (), min_rating: int = 0,
+               max_rating: int = MAX_RATING, rng=random) -> Optional[int]:
+        """Pick a uniformly random matching puzzle, returns its pack index"""
+        start, end = self._rank_range(min_rating, max_rating)
+        bits = self._match_bits(themes, start, end)
+
+        if bits is None:
+            if start == end:
+                return None
+            return self.by_rating[rng.randrange(start, end)]
+
+        matches = bits.bit_count()
+        if not matches:
+            return None
+        return self.by_rating[start + self._nth_set_bit(bits, rng.randrange(matches))]
+
+    def query(self, themes: Iterable[str] = (), min_rating: int = 0,
+              max_rating: int = MAX_RATING, limit: Optional[int] = None) -> List[int]:
+        """Pack indices of matching puzzles in ascending rating order"""
+        start, end = self._rank_range(min_rating, max_rating)
+        bits = self._match_bits(themes, start, end)
+
+        if bits is None:
+            stop = end if limit is None else min(end, start + limit)
+            return list(self.by_rating[start:stop])
+
+        results = []
+        data = bits.to_bytes((end - start + 7) // 8, 'little')
+        for byte_pos, byte in enumerate(data):
+            while byte:
+                low = byte & -byte
+                results.append(self.by_rating[start + byte_pos * 8 + low.bit_length() - 1])
+                if limit is not None and len(results) >= limit:
+                    return results
+                byte ^= low
+        return results
+
+    def theme_counts(self) -> Dict[str, int]:
+        """Number of puzzles per theme"""
+        return {theme: bits.bit_count() for theme, bits in self.theme_bits.items()}
+
+    @staticmethod
+    def _nth_set_bit(bits: int, n: int) -> int:
+        """Position of the n-th (0-based) set bit, by bisecting on popcounts"""
+        lo, hi = 0, bits.bit_length()
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (bits & ((1 << (mid + 1)) - 1)).bit_count() > n:
+                hi = mid
+            else:
+                lo = mid + 1
+        return lo
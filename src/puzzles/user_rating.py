@@ -0,0 +1,108 @@
+"""Glicko rating for the puzzle solver"""
+
+import json
+import math
+import os
+import time
+from typing import Dict, Tuple
+
+# Glicko-1 constants
+Q = math.log(10) / 400
+
+
+def _g(rd: float) -> float:
+    """Glicko attenuation factor for an opponent's rating deviation"""
+    return 1 / math.sqrt(1 + 3 * Q * Q * rd * rd / (math.pi * math.pi))
+
+
+def expected_score(rating: float, puzzle_rating: float, puzzle_rd: float) -> float:
+    """Probability that a player rated ``rating`` solves the puzzle"""
+    return 1 / (1 + 10 ** (-_g(puzzle_rd) * (rating - puzzle_rating) / 400))
+
+
+class UserRating:
+    """Glicko-1 rating that is updated after every puzzle and saved to disk"""
+
+    RATING_FILE = 'puzzle_rating.json'
+
+    DEFAULT_RATING = 1500.0
+    DEFAULT_RD = 350.0
+    MIN_RD = 45.0  # Keep the rating responsive after many puzzles
+    RD_GROWTH_PER_DAY = 15.0  # Uncertainty grows again while away
+    PUZZLE_RD = 75.0  # Puzzle deviations are not stored in packs
+
+    def __init__(self, path: str = RATING_FILE):
+        """Load the rating from ``path`` or start a new one"""
+        self.path = path
+        self.rating = self.DEFAULT_RATING
+        self.rd = self.DEFAULT_RD
+        self.puzzles = 0
+        self.last_update = time.time()
+        self._load()
+
+    def _load(self):
+        """Load rating state, inflating RD for the time since the last puzzle"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.rating = float(data['rating'])
+            self.rd = float(data['rd'])
+            self.puzzles = int(data.get('puzzles', 0))
+            self.last_update = float(data.get('last_update', time.time()))
+        except (OSError, ValueError, KeyError, TypeError):
+            return
+
+        days = max(0.0, (time.time() - self.last_update) / 86400)
+        self.rd = min(self.DEFAULT_RD, math.sqrt(self.rd ** 2 + self.RD_GROWTH_PER_DAY ** 2 * days))
+
+    def save(self):
+        """Save rating state to disk"""
+        data = {
+            'rating': round(self.rating, 2),
+            'rd': round(self.rd, 2),
+            'puzzles': self.puzzles,
+            'last_update': self.last_update
+        }
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(data, f, indent=2)
+        except OSError:
+            pass  # Rating still works for this session
+
+    def update(self, puzzle_rating: float, solved: bool,
+               puzzle_rd: float = PUZZLE_RD) -> float:
+        """
+        Update the rating after one puzzle
+
+        Returns:
+            Rating change
+        """
+        g = _g(puzzle_rd)
+        expected = expected_score(self.rating, puzzle_rating, puzzle_rd)
+        d_squared = 1 / (Q * Q * g * g * expected * (1 - expected))
+        denominator = 1 / (self.rd ** 2) + 1 / d_squared
+
+        change = Q / denominator * g * ((1.0 if solved else 0.0) - expected)
+        self.rating += change
+        self.rd = max(self.MIN_RD, math.sqrt(1 / denominator))
+        self.puzzles += 1
+        self.last_update = time.time()
+        return change
+
+    def target_puzzle_rating(self, success_rate: float = 0.65,
+                             puzzle_rd: float = PUZZLE_RD) -> float:
+        """Puzzle rating this player is expected to solve with ``success_rate``"""
+        success_rate = min(max(success_rate, 0.01), 0.99)
+        return self.rating + 400 / _g(puzzle_rd) * math.log10(1 / success_rate - 1)
+
+    def target_range(self, success_rate: float = 0.65) -> Tuple[int, int]:
+        """Rating window around the target, wider while the rating is uncertain"""
+        target = self.target_puzzle_rating(success_rate)
+        width = max(50.0, self.rd / 2)
+        return int(target - width), int(target + width)
+
+    def to_dict(self) -> Dict:
+        """Current rating state"""
+        return {'rating': round(self.rating), 'rd': round(self.rd), 'puzzles': self.puzzles}
@@ -15,7 +15,12 @@ class Config:
         'puzzle_min_rating': 1000,
         'puzzle_max_rating': 2200,
         'coach_style': 'normal',
-        'show_explanations': True
+        'show_explanations': True,
+        'puzzle_pack': 'puzzles.pack',
+        'adaptive_puzzles': True,
+        'accept_alternatives': True,
+        'game_library': 'game_library',
+        'repertoire': 'repertoire.rep'
     }
     
     CONFIG_FILE = 'settings.json'
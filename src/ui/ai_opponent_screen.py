@@ -4,6 +4,7 @@ from chess_game.engine import ChessEngine
 from chess_game.renderer import BoardRenderer
 from chess_game.input_parser import InputParser
 from ai.ai_opponent import AIOpponent
+from ai.background import PendingText
 import time
 
 
@@ -80,10 +81,12 @@ class AIOpponentScreen:
             input("\nPress Enter to return to menu...")
             return
         
+        # Opening taunt (generated while the engine result is shown)
+        pending_taunt = ai.get_opening_taunt_async()
         print(f"\n✅ AI ready at {difficulty} difficulty!")
         
-        # Opening taunt
-        taunt = ai.get_opening_taunt()
+        taunt = pending_taunt.result()
+        pending_taunt = None
         if taunt:
             print(f"\n{taunt}")
         
@@ -121,6 +124,14 @@ class AIOpponentScreen:
                 if last_ai_message:
                     print(last_ai_message)
                 
+                # The board and move are up; fill in the taunt when it arrives
+                if pending_taunt:
+                    taunt = pending_taunt.result()
+                    pending_taunt = None
+                    if taunt:
+                        print(taunt)
+                        last_ai_message += f"\n{taunt}"
+                
                 # Show error message if exists
                 if error_message:
                     print(error_message)
@@ -153,6 +164,7 @@ class AIOpponentScreen:
                             player_last_move = None
                             last_ai_move = None
                             last_ai_message = ""  # Clear AI message after undo
+                            pending_taunt = None
                         else:
                             error_message = "\n❌ No moves to undo"
                     elif value == 'hint':
@@ -219,21 +231,19 @@ class AIOpponentScreen:
                                 
                                 self.engine.make_move(ai_move)
                                 
-                                # AI trash talks
+                                # AI trash talks (in the background; never holds up the move)
                                 try:
-                                    taunt = ai.get_move_taunt(
+                                    pending_taunt = ai.get_move_taunt_async(
                                         self.engine.get_board(),
                                         ai_move,
                                         player_last_move
                                     )
                                 except Exception as e:
-                                    taunt = "👻 Boo!"  # Fallback if trash talk fails
+                                    pending_taunt = PendingText.done("👻 Boo!")  # Fallback if trash talk fails
                                 
                                 # Store AI message to display on next turn
                                 move_display = last_ai_move[2] if isinstance(last_ai_move, tuple) else ai_move
                                 last_ai_message = f"\n🤖 AI plays: {move_display}"
-                                if taunt:
-                                    last_ai_message += f"\n{taunt}"
                                 
                                 time.sleep(1.5)  # Brief pause to read AI's move
                             else:
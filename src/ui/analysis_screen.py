@@ -4,6 +4,10 @@ from chess_game.engine import ChessEngine
 from chess_game.renderer import BoardRenderer
 from chess_game.input_parser import InputParser
 from ai.stockfish_engine import StockfishEngine
+from games.eco_index import opening_name
+from games.library import explorer_path
+from games.opening_explorer import OpeningExplorer
+from ui.library_view import show_explorer_moves, show_games_reaching
 
 
 class AnalysisScreen:
@@ -18,12 +22,22 @@ class AnalysisScreen:
             use_unicode=config.get('use_unicode', True),
             large_board=config.get('large_board', True)
         )
+        self.explorer = None
+    
+    def _open_explorer(self):
+        """Open the opening explorer of the game library, if one was built"""
+        path = explorer_path(self.config.get('game_library', 'game_library'))
+        if OpeningExplorer.exists(path):
+            try:
+                self.explorer = OpeningExplorer(path)
+            except (OSError, ValueError) as e:
+                print(f"⚠️  Opening explorer unavailable: {e}")
     
     def run(self):
         """Run analysis mode"""
         print("\n🤖 ANALYSIS MODE")
         print("Play moves and get engine analysis!")
-        print("Commands: best, eval, top3, undo, quit\n")
+        print("Commands: best, eval, top3, games, undo, quit\n")
         
         # Start Stockfish
         if not self.stockfish.start():
@@ -33,6 +47,7 @@ class AnalysisScreen:
             return
         
         print("✅ Stockfish engine ready!\n")
+        self._open_explorer()
         
         try:
             while not self.engine.is_game_over():
@@ -43,11 +58,17 @@ class AnalysisScreen:
                 eval_data = self.stockfish.get_evaluation(self.engine.get_board())
                 print(f"\n📊 Evaluation: {eval_data['evaluation_text']} ({eval_data['score']:+.2f})")
                 print(f"💡 Best move: {eval_data['best_move']}")
+                opening = opening_name(self.engine.get_board())
+                if opening:
+                    print(f"📖 Opening: {opening}")
                 
                 if self.engine.is_check():
                     print("⚠️  Check!")
                 
-                print("\n💡 Commands: best, eval, top3, undo, help, quit")
+                if self.explorer:
+                    show_explorer_moves(self.explorer, self.engine.get_board())
+                
+                print("\n💡 Commands: best, eval, top3, games, undo, help, quit")
                 user_input = input("Your move: ").strip()
                 input_type, value = InputParser.parse(user_input)
                 
@@ -59,6 +80,7 @@ class AnalysisScreen:
                         print("   best  - Show the best move")
                         print("   eval  - Show detailed position evaluation")
                         print("   top3  - Show top 3 moves with scores")
+                        print("   games - Show your games that reached this position")
                         print("   undo  - Take back your last move")
                         print("   quit  - Return to main menu")
                         print("\n📍 Square Query: Type a square (e.g., 'e4') to see possible moves")
@@ -88,6 +110,9 @@ class AnalysisScreen:
                         for i, (move, score) in enumerate(top_moves, 1):
                             print(f"   {i}. {move} ({score:+.2f})")
                         input("\nPress Enter to continue...")
+                    elif value == 'games':
+                        show_games_reaching(self.config, self.engine.get_board())
+                        input("\nPress Enter to continue...")
                     elif value == 'moves':
                         moves = self.engine.get_legal_moves()
                         print(f"Legal moves: {', '.join(moves[:20])}")
@@ -141,4 +166,7 @@ class AnalysisScreen:
         finally:
             # Always stop the engine
             self.stockfish.stop()
+            if self.explorer:
+                self.explorer.close()
+                self.explorer = None
             print("\n✅ Engine stopped")
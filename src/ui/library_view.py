@@ -0,0 +1,41 @@
+"""Show what the local game library knows about a position"""
+
+from games.library import GameLibrary
+
+
+def show_games_reaching(config, board, limit=10):
+    """Print the user's games that reached ``board``'s position"""
+    library_path = config.get('game_library', 'game_library')
+    if not GameLibrary.exists(library_path):
+        print("📚 No game library yet - import one with: python3 import_games.py my_games.pgn")
+        return
+
+    with GameLibrary(library_path) as library:
+        if library.positions.games_indexed < len(library):
+            print("📚 Indexing new games...")
+            library.update_index()
+
+        total = library.count_reaching(board)
+        if not total:
+            print("📚 None of your games reached this position")
+            return
+
+        print(f"\n📚 {total} game(s) reached this position:")
+        for game in library.games_reaching(board, limit):
+            move_number = game['ply'] // 2 + 1
+            print(f"   #{game['id']} {game.get('White', '?')} vs {game.get('Black', '?')} "
+                  f"({game.get('Date', '????.??.??')}) {game.get('Result', '*')} - move {move_number}")
+        if total > limit:
+            print(f"   ... and {total - limit} more")
+
+
+def show_explorer_moves(explorer, board, limit=5):
+    """Print the most played moves from ``board`` in the opening explorer"""
+    moves = explorer.moves(board)
+    if not moves:
+        return
+    total = sum(entry['games'] for entry in moves)
+    print(f"📖 Explorer ({total} games):")
+    for entry in moves[:limit]:
+        rating = entry['rating'] if entry['rating'] is not None else '-'
+        print(f"   {entry['san']:<7} {entry['games']:>7} games  {entry['score']:5.1f}%  avg {rating}")
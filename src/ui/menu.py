@@ -4,6 +4,7 @@ from ui.screens import PlayScreen, PuzzleScreen, SettingsScreen
 from ui.analysis_screen import AnalysisScreen
 from ui.tutor_screen import TutorScreen
 from ui.ai_opponent_screen import AIOpponentScreen
+from ui.repertoire_screen import RepertoireScreen
 from puzzles.endless_mode import EndlessMode
 
 class MainMenu:
@@ -32,8 +33,9 @@ class MainMenu:
         print("4. Analysis Mode - Play with engine 🤖")
         print("5. Tutor Mode - Learn with AI coach 🧙")
         print("6. VS AI - Battle Frankenstein! 👻💀")
-        print("7. Settings")
-        print("8. Quit")
+        print("7. Repertoire Trainer 📖")
+        print("8. Settings")
+        print("9. Quit")
         print("\n" + "="*40)
     
     def _handle_choice(self, choice):
@@ -57,9 +59,12 @@ class MainMenu:
             screen = AIOpponentScreen(self.config)
             screen.run()
         elif choice == '7':
-            screen = SettingsScreen(self.config)
+            screen = RepertoireScreen(self.config)
             screen.run()
         elif choice == '8':
+            screen = SettingsScreen(self.config)
+            screen.run()
+        elif choice == '9':
             self.running = False
             print("\nThanks for playing! 👻\n")
         else:
@@ -0,0 +1,148 @@
+"""Opening repertoire trainer screen"""
+
+import os
+import time
+
+import chess
+
+from chess_game.engine import ChessEngine
+from chess_game.renderer import BoardRenderer
+from chess_game.input_parser import InputParser
+from games.repertoire import Repertoire, pick_line
+from puzzles.review_queue import QUALITY_FAILED, QUALITY_SOLVED, ReviewQueue
+
+
+class RepertoireScreen:
+    """Drill repertoire lines on a spaced-repetition schedule"""
+
+    REVIEW_FILE = 'repertoire_reviews.jsonl'
+    MAX_TRIES = 2  # Wrong answers before the move is shown
+
+    def __init__(self, config):
+        self.config = config
+        self.renderer = BoardRenderer(
+            theme=config.get('theme', 'default'),
+            use_unicode=config.get('use_unicode', True),
+            large_board=config.get('large_board', True)
+        )
+        self.repertoire = None
+        self.reviews = None
+
+    def run(self):
+        """Run the repertoire trainer"""
+        print("\n📖 REPERTOIRE TRAINER")
+        path = self.config.get('repertoire', 'repertoire.rep')
+        if not os.path.exists(path):
+            print("📖 No repertoire yet - build one with:")
+            print("   python3 build_repertoire.py my_openings.pgn white")
+            input("\nPress Enter to return to menu...")
+            return
+
+        start = time.perf_counter()
+        try:
+            self.repertoire = Repertoire.load(path)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load repertoire: {e}")
+            input("\nPress Enter to return to menu...")
+            return
+        side = 'White' if self.repertoire.color == chess.WHITE else 'Black'
+        print(f"✅ Loaded {len(self.repertoire)} positions for {side} "
+              f"in {(time.perf_counter() - start) * 1000:.1f}ms")
+        print("Play your prepared move each turn. Commands: hint, quit\n")
+
+        self.reviews = ReviewQueue(self.REVIEW_FILE)
+        drilled = 0
+        while True:
+            picked = pick_line(self.repertoire, self.reviews)
+            if picked is None:
+                print("\n🎉 No lines due - come back later!")
+                break
+
+            line_id, node = picked
+            result = self._drill(self.repertoire.line(node))
+            if result is None:
+                break
+            self.reviews.record(line_id, {}, QUALITY_SOLVED if result else QUALITY_FAILED)
+            drilled += 1
+
+            again = input("\nNext line? (Y/n): ").strip().lower()
+            if again in ['n', 'no', 'quit', 'exit', 'menu']:
+                break
+
+        print(f"\n📊 Drilled {drilled} line(s), {self.reviews.due_count()} due for review")
+        input("\nPress Enter to return to menu...")
+
+    def _parse_move(self, board, text):
+        """Parse SAN or UCI against ``board``, or None if illegal"""
+        try:
+            return board.parse_san(text)
+        except ValueError:
+            try:
+                move = chess.Move.from_uci(text)
+            except ValueError:
+                return None
+            return move if move in board.legal_moves else None
+
+    def _drill(self, line):
+        """
+        Play through one line, the user answering for their side
+
+        Returns:
+            True if every move was found, False after a miss, None if the user quit
+        """
+        engine = ChessEngine(self.repertoire.root_fen)
+        clean = True
+        for expected in line:
+            board = engine.get_board()
+            if board.turn != self.repertoire.color:
+                print(f"👻 Opponent plays {board.san(expected)}")
+                engine.make_move(expected.uci())
+                continue
+
+            tries = 0
+            while True:
+                self.renderer.clear_screen()
+                print(self.renderer.render(board))
+                user_input = input("\nYour repertoire move: ").strip()
+                input_type, value = InputParser.parse(user_input)
+
+                if input_type == 'command':
+                    if value in ['quit', 'exit', 'menu']:
+                        return None
+                    if value in ['hint', 'solution']:
+                        piece = board.piece_at(expected.from_square)
+                        print(f"💡 Move your {chess.piece_name(piece.piece_type)} "
+                              f"on {chess.square_name(expected.from_square)}")
+                        clean = False
+                        input("Press Enter to continue...")
+                    continue
+                if input_type != 'move':
+                    continue
+
+                move = self._parse_move(board, value)
+                if move is None:
+                    print("❌ Illegal move")
+                    input("Press Enter to continue...")
+                    continue
+
+                # Trie lookup only: no engine involved
+                if move == expected:
+                    print("✅ Correct!")
+                    break
+                if self.repertoire.contains(board, move):
+                    print(f"✅ Also in your repertoire - this line continues with {board.san(expected)}")
+                    break
+
+                clean = False
+                tries += 1
+                if tries >= self.MAX_TRIES:
+                    print(f"❌ Not in your repertoire. The move was {board.san(expected)}")
+                    input("Press Enter to continue...")
+                    break
+                print("❌ Not in your repertoire - try again")
+                input("Press Enter to continue...")
+
+            engine.make_move(expected.uci())
+
+        print("\n🎉 Line complete!" if clean else "\n📖 Line complete - it will come back soon")
+        return clean
@@ -1,11 +1,17 @@
 """Game screens for different modes"""
 
+import os
+import chess
 from chess_game.engine import ChessEngine
 from chess_game.renderer import BoardRenderer
 from chess_game.input_parser import InputParser
 from puzzles.lichess_api import LichessAPI
 from puzzles.puzzle_parser import PuzzleParser
 from puzzles.puzzle_engine import PuzzleEngine
+from puzzles.puzzle_pack import PuzzlePack
+from puzzles.review_queue import ReviewQueue
+from puzzles.solution_checker import SolutionChecker
+from ui.library_view import show_games_reaching
 
 class PlayScreen:
     """Free play mode screen"""
@@ -24,7 +30,7 @@ class PlayScreen:
         """Run play mode"""
         print("\n♟️  PLAY MODE")
         print("Enter moves in algebraic notation (e.g., e4, Nf3)")
-        print("Commands: undo, moves, quit\n")
+        print("Commands: undo, moves, games, quit\n")
         
         while not self.engine.is_game_over():
             self.renderer.clear_screen()
@@ -58,6 +64,9 @@ class PlayScreen:
                     if len(moves) > 20:
                         print(f"... and {len(moves) - 20} more")
                     input("\nPress Enter to continue...")
+                elif value == 'games':
+                    show_games_reaching(self.config, self.engine.get_board())
+                    input("\nPress Enter to continue...")
             elif input_type == 'move':
                 # Try to make the move
                 board_before = self.engine.get_board().copy()
@@ -101,12 +110,19 @@ class PuzzleScreen:
     def run(self):
         """Run puzzle mode"""
         print("\n🧩 PUZZLE MODE")
-        print("Fetching puzzle from Lichess...\n")
         
+        checker = SolutionChecker() if self.config.get('accept_alternatives', True) else None
         try:
-            puzzle_json = LichessAPI.get_random_puzzle()
-            puzzle_data = PuzzleParser.parse(puzzle_json)
-            engine = PuzzleEngine(puzzle_data)
+            pack_path = self.config.get('puzzle_pack')
+            if pack_path and os.path.exists(pack_path):
+                with PuzzlePack(pack_path) as pack:
+                    engine = PuzzleEngine.from_pack(pack, pack.random_index(), checker)
+                puzzle_data = engine.puzzle_data
+            else:
+                print("Fetching puzzle from Lichess...\n")
+                puzzle_json = LichessAPI.get_random_puzzle()
+                puzzle_data = PuzzleParser.parse(puzzle_json)
+                engine = PuzzleEngine(puzzle_data, checker)
             
             # Get initial move for highlighting
             board = engine.get_board()
@@ -129,6 +145,7 @@ class PuzzleScreen:
             print(f"Themes: {', '.join(puzzle_data['themes'])}\n")
             
             feedback_message = ""
+            failed = False
             
             while not engine.is_complete():
                 self.renderer.clear_screen()
@@ -161,6 +178,7 @@ class PuzzleScreen:
                         print(f"💡 Hint: {hint}")
                         input("Press Enter to continue...")
                     elif value == 'solution':
+                        failed = True
                         solution = engine.get_solution_str()
                         print(f"🔑 Solution: {solution}")
                         input("Press Enter to continue...")
@@ -220,6 +238,7 @@ class PuzzleScreen:
                         else:
                             feedback_message = "❌ Incorrect. Try again!"
                             last_move = None  # Clear highlight on wrong move
+                            failed = True
                     elif result == 'error':
                         # Check if it's a square query
                         moves, dest_squares = engine.get_moves_from_square(value)
@@ -232,10 +251,17 @@ class PuzzleScreen:
                             input("Press Enter to continue...")
                         else:
                             feedback_message = f"❌ Invalid move: {move}"
+            
+            # Missed puzzles come back later in Endless mode
+            if failed or engine.is_complete():
+                ReviewQueue().record_puzzle(puzzle_data, solved=not failed)
         
         except Exception as e:
             print(f"❌ Error: {e}")
             input("\nPress Enter to return to menu...")
+        finally:
+            if checker:
+                checker.close()
 
 class SettingsScreen:
     """Settings configuration screen"""
@@ -256,7 +282,8 @@ class SettingsScreen:
             print(f"5. Highlight moves: {self.config.get('highlight_moves', True)}")
             print(f"6. Coach style: {self.config.get('coach_style', 'normal')}")
             print(f"7. Show explanations: {self.config.get('show_explanations', True)}")
-            print("8. Back to menu")
+            print(f"8. Accept alternative solutions: {self.config.get('accept_alternatives', True)}")
+            print("9. Back to menu")
             
             choice = input("\nSelect option: ").strip()
             
@@ -280,6 +307,9 @@ class SettingsScreen:
                 self.config.toggle('show_explanations')
                 self.config.save()
             elif choice == '8':
+                self.config.toggle('accept_alternatives')
+                self.config.save()
+            elif choice == '9':
                 break
     
     def _change_theme(self):
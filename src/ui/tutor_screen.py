@@ -1,32 +1,109 @@
 """Tutor Mode - Interactive teaching with AI coach"""
 
+import threading
+
 from chess_game.engine import ChessEngine
 from chess_game.renderer import BoardRenderer
 from chess_game.input_parser import InputParser
 from ai.stockfish_engine import StockfishEngine
 from ai.chess_coach import ChessCoach
+from ai.background import executor
+from ai.game_review import annotate_game
+from ai.local_coach import LocalCoach
+from ai.prefetch import ExplanationPrefetcher
 
 
 class TutorScreen:
     """Tutor mode with AI coaching"""
     
+    FIRST_WORD_DEADLINE = 3.0  # Seconds to wait for the LLM before showing the local explanation
+    
     def __init__(self, config):
         self.config = config
         self.engine = ChessEngine()
         self.stockfish = StockfishEngine(depth=15)
         self.coach = ChessCoach(style=config.get('coach_style', 'normal'))
+        self.local_coach = LocalCoach(style=config.get('coach_style', 'normal'))
         self.renderer = BoardRenderer(
             theme=config.get('theme', 'default'),
             use_unicode=config.get('use_unicode', True),
             large_board=config.get('large_board', True)
         )
         self.show_explanations = config.get('show_explanations', True)
+        self.prefetcher = ExplanationPrefetcher(self.coach, self.stockfish)
+    
+    def _stream_explanation(self, label, fallback, fn, *args):
+        """
+        Print the coach's explanation word by word as it is written
+        
+        The stream runs on the LLM pool while we wait for Enter; pressing
+        Enter cancels whatever is left so the next move is never held up.
+        If no word arrives in time, the local explanation is shown instead.
+        """
+        cancel = threading.Event()
+        lock = threading.Lock()
+        streamed = []
+        
+        def write(text):
+            with lock:
+                if not cancel.is_set():
+                    streamed.append(text)
+                    print(text, end='', flush=True)
+        
+        def run():
+            text = fn(*args, on_token=write, cancel=cancel)
+            if not streamed:
+                write(text or fallback)  # Nothing streamed (e.g. no API key)
+            write("\n")
+        
+        def too_slow():
+            with lock:
+                if not streamed and not cancel.is_set():
+                    print(fallback, flush=True)
+                    cancel.set()
+        
+        print(f"\n🧙 {label} (press Enter to continue):")
+        timer = threading.Timer(self.FIRST_WORD_DEADLINE, too_slow)
+        timer.daemon = True
+        timer.start()
+        executor().submit(run)
+        input()
+        timer.cancel()
+        with lock:
+            cancel.set()
+    
+    def _review_game(self):
+        """Annotate the game so far and stream the coach's one-request review"""
+        board = self.engine.get_board().copy()
+        if not board.move_stack:
+            print("❌ No moves to review yet")
+            input("Press Enter to continue...")
+            return
+        
+        review = self.coach.cached_review(board)
+        if review:
+            print(f"\n🔍 Game review:\n{review}")
+            input("\nPress Enter to continue...")
+            return
+        
+        def progress(done, total):
+            print(f"\r🔍 Analyzing move {done}/{total}...", end='', flush=True)
+        
+        annotations = annotate_game(self.stockfish, board, progress=progress)
+        print()
+        self._stream_explanation(
+            "Game review",
+            self.local_coach.review_game(board, annotations),
+            self.coach.review_game,
+            board,
+            annotations
+        )
     
     def run(self):
         """Run tutor mode"""
         print("\n🧙 TUTOR MODE")
         print("Learn chess with AI coaching!")
-        print("Commands: explain, hint, best, undo, quit\n")
+        print("Commands: explain, hint, best, review, undo, quit\n")
         
         # Start engines
         if not self.stockfish.start():
@@ -45,10 +122,14 @@ class TutorScreen:
                 eval_data = self.stockfish.get_evaluation(self.engine.get_board())
                 print(f"\n📊 {eval_data['evaluation_text']} ({eval_data['score']:+.2f})")
                 
+                # Explain likely moves while the player thinks
+                if self.show_explanations:
+                    self.prefetcher.start(self.engine.get_board(), eval_data)
+                
                 if self.engine.is_check():
                     print("⚠️  Check!")
                 
-                print("\n💡 Commands: explain, hint, best, undo, help, quit")
+                print("\n💡 Commands: explain, hint, best, review, undo, help, quit")
                 user_input = input("Your move: ").strip()
                 input_type, value = InputParser.parse(user_input)
                 
@@ -60,6 +141,7 @@ class TutorScreen:
                         print("   explain - Get AI explanation of current position")
                         print("   hint    - Show the best move")
                         print("   best    - Show top 3 moves with evaluations")
+                        print("   review  - Coach's summary of the game so far")
                         print("   undo    - Take back your last move")
                         print("   quit    - Return to main menu")
                         print("\n📍 Square Query: Type a square (e.g., 'e4') to see possible moves")
@@ -81,14 +163,16 @@ class TutorScreen:
                         for i, (move, score) in enumerate(top_moves, 1):
                             print(f"   {i}. {move} ({score:+.2f})")
                         input("\nPress Enter to continue...")
+                    elif value == 'review':
+                        self._review_game()
                     elif value == 'explain':
-                        print("\n🧙 Analyzing position...")
-                        explanation = self.coach.explain_position(
-                            self.engine.get_board(), 
+                        self._stream_explanation(
+                            "Coach",
+                            self.local_coach.explain_position(self.engine.get_board(), eval_data),
+                            self.coach.explain_position,
+                            self.engine.get_board().copy(),
                             eval_data
                         )
-                        print(f"\n{explanation}")
-                        input("\nPress Enter to continue...")
                 
                 elif input_type == 'move':
                     # Store board state before move
@@ -111,18 +195,23 @@ class TutorScreen:
                         elif analysis['classification'] == 'blunder':
                             print("💥 BLUNDER!")
                         
-                        # Get AI explanation if enabled
-                        if self.show_explanations and analysis['classification'] != 'best':
-                            print("\n🧙 Coach is analyzing...")
-                            explanation = self.coach.explain_move(
-                                board_before, 
-                                value, 
-                                analysis, 
+                        # Get AI explanation if enabled (prefetched, else streamed; Enter skips the rest)
+                        prefetched = self.prefetcher.take(board_before, value, analysis)
+                        if self.show_explanations and prefetched and analysis['classification'] != 'best':
+                            print(f"\n🧙 Coach on {value}:\n{prefetched}")
+                            input("\nPress Enter to continue...")
+                        elif self.show_explanations and analysis['classification'] != 'best':
+                            self._stream_explanation(
+                                f"Coach on {value}",
+                                self.local_coach.explain_move(board_before, value, analysis, eval_before),
+                                self.coach.explain_move,
+                                board_before,
+                                value,
+                                analysis,
                                 eval_before
                             )
-                            print(f"\n{explanation}")
-                        
-                        input("\nPress Enter to continue...")
+                        else:
+                            input("\nPress Enter to continue...")
                     else:
                         # Check if it's a square query
                         moves, dest_squares = self.engine.get_moves_from_square(value)
@@ -139,7 +228,17 @@ class TutorScreen:
                 print("\n🎉 Checkmate!")
             elif self.engine.is_game_over():
                 print("\n🤝 Game over!")
+            
+            if self.engine.is_game_over():
+                if input("\n🔍 Review the game? (y/n): ").strip().lower().startswith('y'):
+                    self._review_game()
         
         finally:
+            self.prefetcher.stop()
             self.stockfish.stop()
             print("\n✅ Tutor session ended")
+            usage = self.coach.gateway.usage_report()
+            if usage:
+                print("\n📊 LLM usage so far:")
+                for line in usage:
+                    print(f"   {line}")
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Test that LLM text is generated in the background with deadlines"""
+
+import sys
+import time
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.ai_opponent import AIOpponent
+from ai.background import PendingText, submit_text
+from ai.llm_gateway import LLMGateway
+
+
+class SlowClient:
+    """Stands in for the OpenAI client: answers after a fixed delay"""
+
+    def __init__(self, delay, text="👻 Dynamic taunt!"):
+        self.delay = delay
+        self.text = text
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        time.sleep(self.delay)
+        message = SimpleNamespace(content=self.text)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_pending_text():
+    """Test results, deadlines and fallbacks"""
+    print("🧪 Testing PendingText...")
+    fast = submit_text(lambda: "hello", fallback="canned", deadline=1.0)
+    assert fast.result() == "hello"
+
+    slow = submit_text(time.sleep, 0.5, fallback="canned", deadline=0.05)
+    start = time.monotonic()
+    assert slow.get() is None
+    assert slow.result() == "canned"
+    assert time.monotonic() - start < 0.3
+
+    empty = submit_text(lambda: None, fallback="canned")
+    assert empty.result() == "canned"
+
+    def boom():
+        raise RuntimeError("network down")
+    assert submit_text(boom, fallback="canned").result() == "canned"
+    assert PendingText.done("ready").get() == "ready"
+    print("✅ Deadlines and fallbacks work")
+
+
+def test_taunts_never_block_the_move():
+    """Test that a slow LLM only delays the taunt, up to its deadline"""
+    print("🧪 Testing taunt deadline...")
+    ai = AIOpponent(personality='spooky', gateway=LLMGateway())
+    ai.TAUNT_DEADLINE = 0.2
+    canned = ai.TAUNTS['opening'][1]
+
+    ai.gateway = LLMGateway(SlowClient(delay=1.0))
+    start = time.monotonic()
+    pending = ai.get_opening_taunt_async()
+    assert time.monotonic() - start < 0.05, "starting a taunt must not wait for the LLM"
+    assert pending.result() in canned
+    assert time.monotonic() - start < 0.5
+
+    ai.gateway = LLMGateway(SlowClient(delay=0.01))
+    board = chess.Board()
+    board.push_san('e4')
+    assert ai._pending_taunt('general', board, 'e4').result() == "👻 Dynamic taunt!"
+
+    ai.gateway = LLMGateway()
+    assert ai.get_opening_taunt() in canned
+    print("✅ Canned taunt shown when the LLM is late")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("⏱️  BACKGROUND LLM TESTS")
+    print("="*60 + "\n")
+
+    test_pending_text()
+    test_taunts_never_block_the_move()
+
+    print("\n🎉 All background LLM tests passed!")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Test streamed coach explanations"""
+
+import sys
+import threading
+import time
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.chess_coach import ChessCoach
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import LLMGateway
+from ai.local_coach import LocalCoach
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text))])
+
+
+class StreamingClient:
+    """Stands in for the OpenAI client: yields one word per delay"""
+
+    def __init__(self, words, delay=0.01):
+        self.words = words
+        self.delay = delay
+        self.calls = 0
+        self.closed = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, stream=False, **kwargs):
+        assert stream, "coach should ask for a stream"
+        self.calls += 1
+        client = self
+
+        class Stream:
+            def __iter__(self):
+                yield SimpleNamespace(choices=[])  # Usage-style chunk with no choices
+                for i, word in enumerate(client.words):
+                    time.sleep(client.delay)
+                    yield _chunk(word if i == 0 else f" {word}")
+                yield _chunk(None)
+
+            def close(self):
+                client.closed += 1
+
+        return Stream()
+
+
+def _coach(client):
+    return ChessCoach(cache=LLMCache(':memory:'), gateway=LLMGateway(client))
+
+
+def test_tokens_arrive_in_order():
+    """Test that the first word arrives long before the whole reply"""
+    print("🧪 Testing streaming...")
+    client = StreamingClient(['Knights', 'before', 'bishops', 'in', 'the', 'opening.'], delay=0.05)
+    coach = _coach(client)
+    tokens = []
+    first = []
+    start = time.monotonic()
+
+    def on_token(text):
+        if not first:
+            first.append(time.monotonic() - start)
+        tokens.append(text)
+
+    text = coach.explain_position(chess.Board(), {'score': 0.2, 'best_move': 'e4'}, on_token=on_token)
+    total = time.monotonic() - start
+    assert text == 'Knights before bishops in the opening.'
+    assert ''.join(tokens) == text
+    assert first[0] < total / 3
+    assert client.closed == 1
+    print(f"✅ First word after {first[0] * 1000:.0f}ms of {total * 1000:.0f}ms")
+
+
+def test_cancel_and_cache():
+    """Test that cancelling stops the stream and only full replies are cached"""
+    print("🧪 Testing cancellation...")
+    client = StreamingClient(['one', 'two', 'three', 'four'])
+    coach = _coach(client)
+    board = chess.Board()
+    eval_data = {'score': 0.0, 'best_move': 'd4'}
+    cancel = threading.Event()
+    tokens = []
+
+    def on_token(text):
+        tokens.append(text)
+        if len(tokens) == 2:
+            cancel.set()
+
+    assert coach.explain_position(board, eval_data, on_token=on_token, cancel=cancel) == 'one two'
+    assert client.closed == 1
+    assert len(coach.cache) == 0, "a cancelled stream must not be cached"
+
+    coach.explain_position(board, eval_data, on_token=lambda t: None)
+    cached = []
+    assert coach.explain_position(board, eval_data, on_token=cached.append) == 'one two three four'
+    assert cached == ['one two three four'] and client.calls == 2
+    print("✅ Cancelled streams dropped, cached replies sent in one piece")
+
+
+def test_stream_error():
+    """Test that a failing stream falls back to the local explanation"""
+    print("🧪 Testing stream errors...")
+    coach = _coach(SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(
+        create=lambda **kwargs: (_ for _ in ()).throw(RuntimeError("timeout"))))))
+    tokens = []
+    eval_data = {'score': 0.0, 'best_move': 'd4'}
+    text = coach.explain_position(chess.Board(), eval_data, on_token=tokens.append)
+    assert text == LocalCoach().explain_position(chess.Board(), eval_data) and tokens == [text]
+    print("✅ Local explanation shown in place of the failed one")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("⌨️  COACH STREAMING TESTS")
+    print("="*60 + "\n")
+
+    test_tokens_arrive_in_order()
+    test_cancel_and_cache()
+    test_stream_error()
+
+    print("\n🎉 All coach streaming tests passed!")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test ECO opening classification"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'src')
+
+import chess
+
+from games.eco_index import ECO_TSV, EcoIndex, default_index, opening_name
+
+
+def _board(*sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+def test_shipped_index():
+    """Test that the shipped binary matches the bundled table"""
+    print("🧪 Testing shipped index...")
+    index = default_index()
+    assert index is not None, "eco.bin missing - run build_eco_index.py"
+    assert index.openings == EcoIndex.from_tsv([ECO_TSV]).openings
+    najdorf = _board('e4', 'c5', 'Nf3', 'd6', 'd4', 'cxd4', 'Nxd4', 'Nf6', 'Nc3', 'a6')
+    assert index.lookup(najdorf) == ('B90', 'Sicilian Defense: Najdorf Variation')
+    assert index.lookup(_board('e4', 'e5', 'Nf3', 'Nc6', 'Nc3')) == ('C46', 'Three Knights Opening')
+    print(f"✅ {len(index)} openings loaded")
+
+
+def test_transpositions_and_classify():
+    """Test move-order independence and naming after the book ends"""
+    print("🧪 Testing classification...")
+    index = default_index()
+    # Reti move order into the Queen's Gambit Declined
+    qgd = _board('Nf3', 'd5', 'd4', 'Nf6', 'c4', 'e6', 'Nc3')
+    assert index.lookup(qgd) == ('D37', "Queen's Gambit Declined: Three Knights Variation")
+
+    # Out of book: the last named position names the game
+    ruy = _board('e4', 'e5', 'Nf3', 'Nc6', 'Bb5', 'a6', 'Ba4', 'Nf6', 'O-O', 'Be7', 'd3', 'b5', 'Bb3')
+    assert index.lookup(ruy) is None
+    assert index.classify(ruy) == ('C84', 'Ruy Lopez: Closed')
+    assert opening_name(ruy) == 'C84 Ruy Lopez: Closed'
+    assert opening_name(chess.Board()) is None
+
+    # Long games are classified without replaying every ply
+    board = ruy.copy()
+    for _ in range(40):
+        board.push(next(iter(board.legal_moves)))
+        if board.is_game_over():
+            break
+    start = time.perf_counter()
+    assert index.classify(board) is not None
+    print(f"✅ Transpositions and book exits named ({(time.perf_counter() - start) * 1000:.2f}ms)")
+
+
+def test_round_trip():
+    """Test save/load of a custom table with non-ASCII names"""
+    print("🧪 Testing serialisation...")
+    fd, tsv_path = tempfile.mkstemp(suffix='.tsv')
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write("eco\tname\tpgn\n")
+        f.write("D80\tGrünfeld Defense\t1. d4 Nf6 2. c4 g6 3. Nc3 d5\n")
+        f.write("A00\tGrob Opening\t1.g4\n")
+    fd, bin_path = tempfile.mkstemp(suffix='.bin')
+    os.close(fd)
+    try:
+        index = EcoIndex.from_tsv([tsv_path])
+        assert index.max_ply == 6
+        index.save(bin_path)
+        loaded = EcoIndex.load(bin_path)
+        assert loaded.openings == index.openings and loaded.max_ply == 6
+        assert loaded.lookup(_board('g4')) == ('A00', 'Grob Opening')
+        print("✅ Round trip kept every opening")
+    finally:
+        os.remove(tsv_path)
+        os.remove(bin_path)
+
+
+def test_coach_prompt_names_opening():
+    """Test that the coach's position prompt mentions the opening"""
+    print("🧪 Testing coach prompt...")
+    from ai.chess_coach import ChessCoach
+    coach = ChessCoach(api_key=None)
+    prompt = coach._build_position_prompt(_board('e4', 'c6'), {'score': 0.3, 'best_move': 'd4'})
+    assert 'Opening: B10 Caro-Kann Defense' in prompt
+    print("✅ Opening in prompt")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📖 ECO INDEX TESTS")
+    print("="*60 + "\n")
+
+    test_shipped_index()
+    test_transpositions_and_classify()
+    test_round_trip()
+    test_coach_prompt_names_opening()
+
+    print("\n🎉 All ECO index tests passed!")
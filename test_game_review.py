@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test the whole-game review: annotations, critical moments and the one-call summary"""
+
+import sys
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.chess_coach import ChessCoach
+from ai.game_review import accuracy_counts, annotate_game, critical_moments, game_hash, move_label
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import LLMGateway
+from ai.local_coach import LocalCoach
+from ai.prompt_builder import BUDGETS, prompt_tokens
+from ai.stockfish_engine import StockfishEngine
+
+MOVES = ['e4', 'e5', 'Nf3', 'Nc6', 'Bc4', 'Nd4', 'Nxe5', 'Qg5', 'Nxf7', 'Qxg2', 'Rf1', 'Qxe4+']
+# White-POV score after each ply (index 0 = start position)
+SCORES = [0.3, 0.3, 0.3, 0.3, 0.3, 0.3, 0.2, 1.8, 1.7, 0.4, 0.5, -2.5, -3.5]
+# Engine's choice where it differs from the move played
+BEST = {8: 'O-O', 9: 'Qxe5+', 10: 'd3'}
+
+
+class FakeStockfish(StockfishEngine):
+    """Engine stand-in with scripted evaluations, one per position"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def get_evaluation(self, board, depth=None):
+        self.calls += 1
+        ply = len(board.move_stack)
+        best = BEST.get(ply, MOVES[ply] if ply < len(MOVES) else None)
+        # Like the real engine: the score is from the side to move
+        score = SCORES[ply] if board.turn == chess.WHITE else -SCORES[ply]
+        return {'score': score, 'best_move': best, 'evaluation_text': ''}
+
+
+class RecordingClient:
+    """Stands in for the OpenAI client: records prompts"""
+
+    def __init__(self):
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.prompts.append(kwargs['messages'][-1]['content'])
+        message = SimpleNamespace(content="Summary: sharp game.\nKey moments:\n- 6... Qg5\nLessons: - defend")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def played_game():
+    board = chess.Board()
+    for san in MOVES:
+        board.push_san(san)
+    return board
+
+
+def test_annotations():
+    """Test one evaluation per position and mover-relative classification"""
+    print("🧪 Testing game annotation...")
+    stockfish = FakeStockfish()
+    board = played_game()
+    progress = []
+    annotations = annotate_game(stockfish, board, progress=lambda done, total: progress.append(done))
+    assert stockfish.calls == len(MOVES) + 1
+    assert progress[-1] == len(MOVES)
+    assert len(annotations) == len(MOVES)
+
+    qg5 = annotations[7]
+    assert move_label(qg5) == "4... Qg5" and qg5['color'] == 'black'
+    assert abs(qg5['eval_change'] - 0.1) < 1e-9, "Black's move that lowers White's score is good for Black"
+    assert move_label(annotations[10]) == "6. Rf1"
+    assert annotations[10]['classification'] == 'blunder'
+    assert annotations[0]['classification'] == 'best'
+    assert annotations[9]['eval_before'] == 0.4 and annotations[9]['eval_after'] == 0.5, "White's view"
+    assert [a['classification'] for a in annotations[:8]].count('blunder') == 0
+
+    counts = accuracy_counts(annotations)
+    assert counts['white'].get('blunder') == 1
+    print(f"✅ {len(annotations)} moves annotated with {stockfish.calls} engine calls")
+
+
+def test_critical_moments():
+    """Test that the worst errors are kept, in game order"""
+    print("🧪 Testing critical moments...")
+    annotations = annotate_game(FakeStockfish(), played_game())
+    moments = critical_moments(annotations, limit=2)
+    assert [move_label(m) for m in moments] == ["5. Nxf7", "6. Rf1"]
+    assert [m['ply'] for m in moments] == sorted(m['ply'] for m in moments)
+    print(f"✅ Critical: {', '.join(move_label(m) for m in moments)}")
+
+
+def test_game_hash():
+    """Test that the hash follows the moves, not the board object"""
+    print("🧪 Testing game hash...")
+    assert game_hash(played_game()) == game_hash(played_game())
+    shorter = played_game()
+    shorter.pop()
+    assert game_hash(shorter) != game_hash(played_game())
+    print("✅ Same game, same hash")
+
+
+def test_one_request_and_cache():
+    """Test that a review is one budgeted request and is reused by game hash"""
+    print("🧪 Testing one-call review...")
+    client = RecordingClient()
+    coach = ChessCoach(cache=LLMCache(':memory:'), gateway=LLMGateway(client))
+    board = played_game()
+    annotations = annotate_game(FakeStockfish(), board)
+
+    assert coach.cached_review(board) is None
+    review = coach.review_game(board, annotations)
+    assert review.startswith("Summary:")
+    assert len(client.prompts) == 1
+    prompt = client.prompts[0]
+    assert prompt_tokens(prompt) <= BUDGETS['review_game']
+    assert "6. Rf1: blunder" in prompt and "Key moments:" in prompt
+
+    assert coach.review_game(board, annotations) == review
+    assert coach.cached_review(board) == review
+    assert len(client.prompts) == 1
+    assert coach.gateway.stats()['review_game']['calls'] == 1
+    print(f"✅ One request ({prompt_tokens(prompt)} prompt tokens), then served from cache")
+
+
+def test_offline_review():
+    """Test the rule-based review when there is no LLM"""
+    print("🧪 Testing offline review...")
+    coach = ChessCoach(gateway=LLMGateway())
+    board = played_game()
+    annotations = annotate_game(FakeStockfish(), board)
+    review = coach.review_game(board, annotations)
+    assert review == LocalCoach().review_game(board, annotations)
+    assert "6. Rf1" in review and review.startswith("Summary:")
+    print("✅ Local review:\n" + review)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🔍 GAME REVIEW TESTS")
+    print("="*60 + "\n")
+
+    test_annotations()
+    test_critical_moments()
+    test_game_hash()
+    test_one_request_and_cache()
+    test_offline_review()
+
+    print("\n🎉 All game review tests passed!")
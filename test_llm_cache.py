@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Test the persistent LLM response cache"""
+
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.chess_coach import ChessCoach
+from ai.llm_cache import DAY, LLMCache, cache_key
+from ai.llm_gateway import LLMGateway
+from ai.local_coach import LocalCoach
+
+
+class CountingClient:
+    """Stands in for the OpenAI client: counts requests"""
+
+    def __init__(self, text="Control the center."):
+        self.calls = 0
+        self.text = text
+        self.fail = False
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **kwargs):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("rate limited")
+        message = SimpleNamespace(content=f" {self.text} ")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def test_hits_and_keys():
+    """Test hit/miss accounting and what the key depends on"""
+    print("🧪 Testing cache hits...")
+    cache = LLMCache(':memory:')
+    assert cache.get('m', 'sys', 'prompt', 0.7) is None
+    cache.put('m', 'sys', 'prompt', 0.7, 'answer')
+    assert cache.get('m', 'sys', 'prompt', 0.7) == 'answer'
+    assert cache.get('m', 'sys', 'prompt', 0.71) == 'answer', "temperature is bucketed"
+    assert cache.get('m', 'other', 'prompt', 0.7) is None
+    assert cache.get('m2', 'sys', 'prompt', 0.7) is None
+    assert cache_key('m', 'sys', 'prompt', 0.2) != cache_key('m', 'sys', 'prompt', 0.7)
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 3 and stats['entries'] == 1
+    print(f"✅ Hit rate {stats['hit_rate']:.0%}")
+
+
+def test_ttl_and_eviction():
+    """Test expiry and least-recently-used eviction"""
+    print("🧪 Testing TTL and eviction...")
+    cache = LLMCache(':memory:', max_entries=3, ttl=DAY)
+    for i in range(3):
+        cache.put('m', 's', f'p{i}', 0.7, f'r{i}', now=100 + i)
+    assert cache.get('m', 's', 'p0', 0.7, now=200) == 'r0'  # p1 is now the oldest access
+    cache.put('m', 's', 'p3', 0.7, 'r3', now=201)
+    assert len(cache) == 3
+    assert cache.get('m', 's', 'p1', 0.7, now=202) is None
+    assert cache.get('m', 's', 'p0', 0.7, now=202) == 'r0'
+    assert cache.get('m', 's', 'p3', 0.7, now=201 + DAY + 1) is None
+    print("✅ Expired and cold entries dropped")
+
+
+def test_persistence():
+    """Test that responses survive a restart"""
+    print("🧪 Testing persistence...")
+    fd, path = tempfile.mkstemp(suffix='.sqlite')
+    os.close(fd)
+    try:
+        cache = LLMCache(path)
+        cache.put('m', 's', 'p', 0.7, 'kept')
+        cache.close()
+        cache = LLMCache(path)
+        assert cache.get('m', 's', 'p', 0.7) == 'kept'
+        cache.close()
+        print("✅ Cache reloaded from disk")
+    finally:
+        os.remove(path)
+
+
+def test_coach_uses_cache():
+    """Test that repeat explanations skip the API and errors are not cached"""
+    print("🧪 Testing coach caching...")
+    client = CountingClient()
+    coach = ChessCoach(cache=LLMCache(':memory:'), gateway=LLMGateway(client))
+    board = chess.Board()
+    eval_data = {'score': 0.3, 'best_move': 'e4'}
+
+    client.fail = True
+    assert coach.explain_position(board, eval_data) == LocalCoach().explain_position(board, eval_data)
+    client.fail = False
+    assert coach.explain_position(board, eval_data) == "Control the center."
+    assert coach.explain_position(board, eval_data) == "Control the center."
+    assert client.calls == 2
+
+    coach.style = 'spooky'  # Different system prompt, different entry
+    coach.explain_position(board, eval_data)
+    assert client.calls == 3
+    print(f"✅ {coach.cache.stats()['hits']} cached explanation served")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("💾 LLM CACHE TESTS")
+    print("="*60 + "\n")
+
+    test_hits_and_keys()
+    test_ttl_and_eviction()
+    test_persistence()
+    test_coach_uses_cache()
+
+    print("\n🎉 All LLM cache tests passed!")
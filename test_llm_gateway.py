@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""Test the shared LLM gateway"""
+
+import sys
+import threading
+import time
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+from ai.ai_opponent import AIOpponent
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import PREFETCH, GatewayError, LLMGateway
+
+MESSAGES = [{"role": "user", "content": "Say boo"}]
+
+
+class FakeClient:
+    """Stands in for the OpenAI client; records concurrency and can fail"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.fail = False
+        self.running = 0
+        self.peak = 0
+        self.order = []
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, stream=False, **kwargs):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+            self.order.append(messages[-1]['content'])
+        try:
+            time.sleep(self.delay)
+            if self.fail:
+                raise RuntimeError("503")
+            if stream:
+                return iter([SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=w))])
+                             for w in ['Boo', '!', ' 👻']])
+            usage = SimpleNamespace(prompt_tokens=12, completion_tokens=3)
+            message = SimpleNamespace(content="Boo!")
+            return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=usage)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def test_concurrency_and_priority():
+    """Test the in-flight cap and that interactive calls go before prefetches"""
+    print("🧪 Testing concurrency and priority...")
+    client = FakeClient(delay=0.05)
+    gateway = LLMGateway(client, requests_per_minute=6000, max_concurrent=2, max_prefetch=1)
+    threads = [threading.Thread(target=gateway.complete,
+                                args=([{"role": "user", "content": f"prefetch{i}"}],),
+                                kwargs={'priority': PREFETCH}) for i in range(3)]
+    threads += [threading.Thread(target=gateway.complete,
+                                 args=([{"role": "user", "content": f"user{i}"}],))
+                for i in range(4)]
+    for t in threads:
+        t.start()
+        time.sleep(0.002)
+    for t in threads:
+        t.join()
+    assert client.peak <= 2
+    # Only the first prefetch got in before the interactive calls queued up
+    assert client.order.index('prefetch1') > client.order.index('user3')
+    print(f"✅ Peak {client.peak} in flight, order {client.order}")
+
+
+def test_rate_limit():
+    """Test that the request bucket refuses bursts past its budget"""
+    print("🧪 Testing rate limit...")
+    gateway = LLMGateway(FakeClient(), requests_per_minute=60)  # Burst of 10
+    for _ in range(10):
+        gateway.complete(MESSAGES)
+    try:
+        gateway.complete(MESSAGES, timeout=0.2)
+        assert False, "the eleventh request should wait past its timeout"
+    except GatewayError:
+        pass
+    start = time.monotonic()
+    gateway.complete(MESSAGES, timeout=2.0)  # One request refills per second
+    assert time.monotonic() - start < 1.5
+    # Speculative calls leave half the bucket for interactive ones
+    try:
+        gateway.complete(MESSAGES, priority=PREFETCH, timeout=0.1)
+        assert False
+    except GatewayError:
+        pass
+    print("✅ Bursts limited, interactive headroom kept")
+
+
+def test_circuit_breaker():
+    """Test failing fast after repeated errors and recovering"""
+    print("🧪 Testing circuit breaker...")
+    client = FakeClient()
+    gateway = LLMGateway(client, failure_threshold=3, reset_after=0.1)
+    client.fail = True
+    for _ in range(3):
+        try:
+            gateway.complete(MESSAGES)
+        except RuntimeError:
+            pass
+    assert gateway.circuit_open()
+    try:
+        gateway.complete(MESSAGES)
+        assert False
+    except GatewayError:
+        pass
+    time.sleep(0.15)
+    client.fail = False
+    assert gateway.complete(MESSAGES).choices[0].message.content == "Boo!"
+    assert not gateway.circuit_open()
+    stats = gateway.stats()['chat']
+    assert stats['calls'] == 4 and stats['errors'] == 3
+
+    # A half-open trial that never gets to send must not leave the circuit stuck
+    gateway = LLMGateway(client, tokens_per_minute=600, failure_threshold=1, reset_after=0.1)
+    client.fail = True
+    try:
+        gateway.complete(MESSAGES)  # Fails and drains the token bucket
+    except RuntimeError:
+        pass
+    assert gateway.circuit_open()
+    time.sleep(0.15)
+    client.fail = False
+    try:
+        gateway.complete(MESSAGES, timeout=0.5)  # Would be the trial, but waits for tokens and times out
+        assert False
+    except GatewayError as e:
+        assert "busy" in str(e)
+    gateway.tokens.level = gateway.tokens.capacity
+    assert gateway.complete(MESSAGES).choices[0].message.content == "Boo!"
+    assert not gateway.circuit_open()
+    print("✅ Circuit opened and closed again")
+
+
+def test_stream_and_stats():
+    """Test streaming, early close and per-kind stats"""
+    print("🧪 Testing streams and stats...")
+    gateway = LLMGateway(FakeClient(), max_concurrent=1)
+    chunks = list(gateway.stream(MESSAGES, kind='explain_position'))
+    assert ''.join(c.choices[0].delta.content for c in chunks) == 'Boo! 👻'
+
+    stream = gateway.stream(MESSAGES, kind='explain_position')
+    next(stream)
+    stream.close()  # Cancelled: frees the only slot and is not an error
+    gateway.complete(MESSAGES, kind='taunt', timeout=0.5)
+    stats = gateway.stats()
+    assert stats['explain_position']['calls'] == 2 and stats['explain_position']['errors'] == 0
+    assert stats['explain_position']['p50_first_token_ms'] is not None
+    assert stats['taunt']['prompt_tokens'] == 12 and stats['taunt']['completion_tokens'] == 3
+    print(f"✅ Stats: {stats['taunt']}")
+
+
+def test_opponent_shares_gateway():
+    """Test that taunts and the opponent's coach use one gateway"""
+    print("🧪 Testing shared gateway...")
+    gateway = LLMGateway(FakeClient())
+    ai = AIOpponent(gateway=gateway, cache=LLMCache(':memory:'))
+    assert ai.coach.gateway is gateway
+    assert ai._generate_dynamic_taunt("Say something") == "Boo!"
+    assert gateway.stats()['taunt']['calls'] == 1
+    cache = LLMCache(':memory:')
+    assert AIOpponent(cache=cache).gateway is AIOpponent(cache=cache).gateway
+    print("✅ One client for the whole process")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🚦 LLM GATEWAY TESTS")
+    print("="*60 + "\n")
+
+    test_concurrency_and_priority()
+    test_rate_limit()
+    test_circuit_breaker()
+    test_stream_and_stats()
+    test_opponent_shares_gateway()
+
+    print("\n🎉 All LLM gateway tests passed!")
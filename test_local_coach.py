@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Test the offline rule-based coach"""
+
+import sys
+import time
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.chess_coach import ChessCoach
+from ai.llm_gateway import LLMGateway
+from ai.local_coach import TEMPLATES, LocalCoach, forks, hanging_pieces, mate_in_one, mate_threat, pins
+
+# 1. e4 e5 2. Bc4 Nc6 3. Qh5 - Black to move, Qxf7# is threatened
+SCHOLAR = "r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 3 3"
+
+
+def test_features():
+    """Test the bitboard tactical features"""
+    print("🧪 Testing features...")
+    board = chess.Board(SCHOLAR)
+    assert mate_threat(board) == 'Qxf7#'
+    assert mate_in_one(board) is None
+    assert pins(board, chess.BLACK) == [chess.F7]
+    assert hanging_pieces(board, chess.WHITE) == []
+
+    board.push_san('Nf6')
+    assert mate_in_one(board) == 'Qxf7#'
+    # Knight on f6 hits the queen on h5 and the undefended pawn on e4
+    assert (chess.F6, [chess.E4, chess.H5]) in [(sq, sorted(t)) for sq, t in forks(board, chess.BLACK)]
+
+    fork = chess.Board("r3k3/8/8/1N6/8/8/8/4K3 w - - 0 1")
+    fork.push_san('Nc7+')
+    assert forks(fork, chess.WHITE)[0][0] == chess.C7
+    assert hanging_pieces(fork, chess.WHITE) == []
+    print("✅ Mate threats, pins, forks and hanging pieces found")
+
+
+def test_explanations():
+    """Test templated explanations in every style"""
+    print("🧪 Testing explanations...")
+    board = chess.Board(SCHOLAR)
+    blunder = {'classification': 'blunder', 'eval_change': -9.5, 'best_move': 'g6'}
+    for style in TEMPLATES:
+        coach = LocalCoach(style)
+        position = coach.explain_position(board, {'score': 0.3, 'best_move': 'g6'})
+        move = coach.explain_move(board, 'Nf6', blunder, {})
+        assert 'Qxf7#' in position and 'g6' in position, (style, position)
+        assert 'Nf6' in move and 'Qxf7#' in move, (style, move)
+    assert LocalCoach('spooky').explain_position(board, {'score': 0.3}).startswith('👻')
+    assert 'mate in 2' in LocalCoach().explain_puzzle({'themes': ['mateIn2', 'short']})
+    assert LocalCoach().explain_move(chess.Board(), 'e4', {'classification': 'best'}, {}).startswith('e4')
+    line = LocalCoach('advanced').explain_position(chess.Board(), {'score': 0.2, 'best_move': 'e4',
+                                                                    'pv': ['e4', 'e5', 'Nf3']})
+    assert 'PV: e4 e5 Nf3' in line
+
+    start = time.perf_counter()
+    for _ in range(100):
+        LocalCoach().explain_position(board, {'score': 0.3, 'best_move': 'g6'})
+    per_call = (time.perf_counter() - start) * 10
+    print(f"✅ All styles explained ({per_call:.2f}ms per explanation)")
+
+
+def test_feature_owner():
+    """Test that beginner wording follows whose mate or loose piece it is"""
+    print("🧪 Testing whose feature it is...")
+    board = chess.Board()
+    for san in ['f3', 'e5']:
+        board.push_san(san)
+    coach = LocalCoach('beginner')
+    blunder = {'classification': 'blunder', 'eval_change': -99.0, 'best_move': 'Nc3'}
+    text = coach.explain_move(board, 'g4', blunder, {})
+    assert "Danger! Black can checkmate right now with Qh4#." in text, text
+    assert "You can checkmate" not in text
+    board.push_san('g4')
+    assert "You can checkmate right now with Qh4#!" in coach.explain_position(board, {'score': -99.0})
+
+    # White's knight on e5 is loose and it is White's move, then Black's
+    loose = chess.Board("4k3/8/3p4/4N3/8/8/8/4K3 w - - 0 1")
+    assert "Your opponent can win the knight on e5" in coach.explain_position(loose, {'score': 3.0})
+    loose.turn = chess.BLACK
+    assert "you can win it for free" in coach.explain_position(loose, {'score': 3.0})
+    print(f"✅ {text}")
+
+
+def test_coach_falls_back_offline():
+    """Test that ChessCoach without an API key explains locally"""
+    print("🧪 Testing offline fallback...")
+    coach = ChessCoach(style='beginner', gateway=LLMGateway())
+    board = chess.Board(SCHOLAR)
+    eval_data = {'score': 0.3, 'best_move': 'g6'}
+    assert coach.explain_position(board, eval_data) == LocalCoach('beginner').explain_position(board, eval_data)
+    assert not coach.explain_puzzle({'themes': ['fork']}).startswith('⚠️')
+    print("✅ No API key, still coached")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📏 LOCAL COACH TESTS")
+    print("="*60 + "\n")
+
+    test_features()
+    test_explanations()
+    test_feature_owner()
+    test_coach_falls_back_offline()
+
+    print("\n🎉 All local coach tests passed!")
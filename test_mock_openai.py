@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test the mock OpenAI server and the latency benchmark built on it"""
+
+import random
+import sys
+import time
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.chess_coach import ChessCoach
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import LLMGateway
+from ai.mock_openai import Latency, MockOpenAIServer
+from ai.taunt_pool import parse_batch
+from benchmark_llm import percentile, run_benchmark
+
+FAST = Latency(0.02)
+MESSAGES = [{"role": "user", "content": "Explain e4."}]
+
+
+def test_latency_model():
+    """Test that sampled delays match the requested median and p99"""
+    print("🧪 Testing latency distribution...")
+    rng = random.Random(1)
+    model = Latency(0.4, 1.5)
+    samples = [model.sample(rng) for _ in range(5000)]
+    assert 0.35 < percentile(samples, 50) < 0.45
+    assert 1.2 < percentile(samples, 99) < 1.9
+    assert Latency(0.3).sample(rng) == 0.3
+    print(f"✅ p50 {percentile(samples, 50):.2f}s, p99 {percentile(samples, 99):.2f}s")
+
+
+def test_completion_and_stream():
+    """Test plain and streamed replies through the real OpenAI client"""
+    print("🧪 Testing completions...")
+    with MockOpenAIServer(FAST, tokens_per_second=100, reply_tokens=10) as server:
+        client = server.client()
+        response = client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES, max_tokens=5)
+        assert len(response.choices[0].message.content.split()) == 5
+        assert response.usage.completion_tokens == 5
+
+        start = time.monotonic()
+        pieces = [chunk.choices[0].delta.content
+                  for chunk in client.chat.completions.create(model="gpt-4o-mini", messages=MESSAGES,
+                                                              max_tokens=50, stream=True)
+                  if chunk.choices and chunk.choices[0].delta.content]
+        elapsed = time.monotonic() - start
+        assert len(pieces) == 10, "one token per chunk, capped at reply_tokens"
+        assert elapsed >= 0.02 + 9 / 100, "first-token delay plus the token rate"
+
+        batch = client.chat.completions.create(
+            model="gpt-4o-mini", max_tokens=300,
+            messages=[{"role": "user", "content": "blunder: oops\ngeneral: hi\n"
+                                                  "Write 3 taunts. Reply with only a JSON object."}])
+        taunts = parse_batch(batch.choices[0].message.content, ['blunder', 'general'])
+        assert len(taunts['blunder']) == 3 and len(taunts['general']) == 3
+    print(f"✅ Streamed {len(pieces)} tokens in {elapsed * 1000:.0f}ms")
+
+
+def test_error_injection():
+    """Test that injected errors reach the coach, which falls back to local text"""
+    print("🧪 Testing error injection...")
+    with MockOpenAIServer(FAST, error_rate=1.0, error_status=503) as server:
+        gateway = LLMGateway(server.client(max_retries=0), failure_threshold=2)
+        coach = ChessCoach(cache=LLMCache(':memory:'), gateway=gateway)
+        board = chess.Board()
+        text = coach.explain_position(board, {'score': 0.3, 'best_move': 'e4'}, on_token=lambda t: None)
+        assert not text.startswith("⚠️"), "local fallback, not an error message"
+        coach.explain_position(board, {'score': 0.4, 'best_move': 'd4'})
+        assert gateway.circuit_open()
+        assert server.errors == server.requests == 2
+    print("✅ Errors open the circuit and the coach falls back")
+
+
+def test_benchmark():
+    """Test that the benchmark reports every feature"""
+    print("🧪 Testing benchmark...")
+    with MockOpenAIServer(FAST, tokens_per_second=500, reply_tokens=8, seed=3) as server:
+        result = run_benchmark(server, rounds=2)
+    features = result['features']
+    for feature in ('tutor/explain_position', 'tutor/explain_move', 'tutor/explain_tactic',
+                    'tutor/explain_puzzle', 'tutor/review_game', 'vs_ai/taunt'):
+        assert features[feature]['runs'] == 2, feature
+    move = features['tutor/explain_move']
+    assert move['failed'] == 0
+    assert 0.02 <= move['p50_first_token'] <= move['p50_total']
+    assert move['p50_display'] == move['p50_first_token']
+    assert result['gateway']['review_game']['calls'] == 2
+    print(f"✅ explain_move first token p50 {move['p50_first_token'] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("👻 MOCK OPENAI SERVER TESTS")
+    print("="*60 + "\n")
+
+    test_latency_model()
+    test_completion_and_stream()
+    test_error_injection()
+    test_benchmark()
+
+    print("\n🎉 All mock OpenAI server tests passed!")
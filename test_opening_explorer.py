@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""Test the opening explorer built from the game library"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'src')
+
+import chess
+
+from games.game_store import GameStore
+from games.library import GameLibrary
+from games.opening_explorer import OpeningExplorer
+
+
+def _moves(*sans):
+    board = chess.Board()
+    return [board.push_san(san) for san in sans]
+
+
+def _random_game(rng, plies=20):
+    board = chess.Board()
+    moves = []
+    for _ in range(plies):
+        legal = list(board.legal_moves)
+        if not legal:
+            break
+        moves.append(rng.choice(legal))
+        board.push(moves[-1])
+    return moves
+
+
+def test_move_statistics():
+    """Test counts, score and average rating per move"""
+    print("🧪 Testing move statistics...")
+    tmp = tempfile.mkdtemp()
+    try:
+        store = GameStore(tmp)
+        store.append({'Result': '1-0', 'WhiteElo': '2000', 'BlackElo': '1800'}, _moves('e4', 'e5'))
+        store.append({'Result': '1/2-1/2', 'WhiteElo': '1600', 'BlackElo': '1600'}, _moves('e4', 'c5'))
+        store.append({'Result': '0-1'}, _moves('d4', 'd5'))
+        store.append({'Result': '*'}, _moves('c4'))
+        store.flush()
+
+        path = os.path.join(tmp, 'explorer.bin')
+        with OpeningExplorer(path) as explorer:
+            assert explorer.catch_up(store) == 4
+
+        assert OpeningExplorer.exists(path)
+        with OpeningExplorer(path) as explorer:
+            assert explorer.games_indexed == 4
+            moves = explorer.moves(chess.Board())
+            assert [m['san'] for m in moves] == ['e4', 'd4']
+            e4, d4 = moves
+            assert (e4['games'], e4['white'], e4['draws'], e4['black']) == (2, 1, 1, 0)
+            assert e4['score'] == 75.0 and e4['rating'] == 1750
+            assert d4['score'] == 0.0 and d4['rating'] is None
+
+            # Black's view after 1.e4
+            board = chess.Board()
+            board.push_san('e4')
+            scores = {m['san']: m['score'] for m in explorer.moves(board)}
+            assert scores == {'e5': 0.0, 'c5': 50.0}
+        store.close()
+        print("✅ Counts, scores and ratings correct")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_growth_and_incremental_updates():
+    """Test that the table resizes and later imports are merged"""
+    print("🧪 Testing resize and catch-up...")
+    tmp = tempfile.mkdtemp()
+    rng = random.Random(11)
+    try:
+        store = GameStore(tmp)
+        games = [_random_game(rng) for _ in range(300)]
+        for moves in games[:200]:
+            store.append({'Result': '1-0'}, moves)
+        store.flush()
+
+        path = os.path.join(tmp, 'explorer.bin')
+        explorer = OpeningExplorer(path)
+        explorer.INITIAL_CAPACITY = 16
+        explorer.BATCH_ENTRIES = 500
+        explorer.catch_up(store)
+        assert explorer.capacity > 16
+        explorer.close()
+
+        for moves in games[200:]:
+            store.append({'Result': '0-1'}, moves)
+        store.flush()
+        with OpeningExplorer(path) as explorer:
+            assert explorer.catch_up(store) == 100
+            assert explorer.games_indexed == 300
+            first_moves = explorer.moves(chess.Board())
+            assert sum(m['games'] for m in first_moves) == 300
+            assert sum(m['white'] for m in first_moves) == 200
+            assert explorer.used <= explorer.capacity * explorer.MAX_LOAD
+        store.close()
+        print("✅ Table grew and kept every count")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_crash_mid_merge():
+    """Test that a flush cut short leaves either the old or the new table, never a mix"""
+    print("🧪 Testing crash during merge...")
+    tmp = tempfile.mkdtemp()
+    try:
+        store = GameStore(tmp)
+        store.append({'Result': '1-0'}, _moves('e4', 'e5'))
+        store.flush()
+        path = os.path.join(tmp, 'explorer.bin')
+        with OpeningExplorer(path) as explorer:
+            explorer.catch_up(store)
+
+        store.append({'Result': '0-1'}, _moves('e4', 'c5'))
+        store.append({'Result': '0-1'}, _moves('d4'))
+        store.flush()
+
+        def crash_at(name, after):
+            explorer = OpeningExplorer(path)
+            step = getattr(explorer, name)
+
+            def crash(*args):
+                if after:
+                    step(*args)
+                raise RuntimeError("power cut")
+            setattr(explorer, name, crash)
+            try:
+                explorer.catch_up(store)
+                assert False
+            except RuntimeError:
+                pass
+            explorer._unmap()  # Abandoned, as after a crash
+
+        # Before the journal is written: the old table, and catch-up counts the games once
+        crash_at('_write_journal', after=False)
+        with OpeningExplorer(path) as explorer:
+            assert explorer.games_indexed == 1
+            assert explorer.catch_up(store) == 2
+            first_moves = {m['san']: m['games'] for m in explorer.moves(chess.Board())}
+            assert first_moves == {'e4': 2, 'd4': 1}
+
+        # Merged but the journal is still there: replaying it must not count twice
+        store.append({'Result': '1-0'}, _moves('e4', 'c5'))
+        store.flush()
+        crash_at('_apply', after=True)
+        assert os.path.exists(path + '.journal')
+        with OpeningExplorer(path) as explorer:
+            assert not os.path.exists(path + '.journal')
+            assert explorer.games_indexed == 4
+            assert explorer.catch_up(store) == 0
+            first_moves = {m['san']: m['games'] for m in explorer.moves(chess.Board())}
+            assert first_moves == {'e4': 3, 'd4': 1}
+        store.close()
+        print("✅ No double counting after a crash")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_library_and_lookup_speed():
+    """Test the library hook and that lookups are fast enough for every move"""
+    print("🧪 Testing lookup speed...")
+    tmp = tempfile.mkdtemp()
+    rng = random.Random(2)
+    try:
+        with GameLibrary(tmp) as library:
+            for _ in range(500):
+                library.store.append({'Result': rng.choice(['1-0', '0-1', '1/2-1/2'])},
+                                     _random_game(rng, 30))
+            library.store.flush()
+            assert library.update_explorer() == 500
+
+            board = chess.Board()
+            start = time.perf_counter()
+            for _ in range(100):
+                moves = library.explorer.moves(board)
+            elapsed = (time.perf_counter() - start) / 100
+            assert moves and elapsed < 0.005, f"{elapsed * 1000:.2f}ms"
+        print(f"✅ {elapsed * 1000:.3f}ms per position")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📖 OPENING EXPLORER TESTS")
+    print("="*60 + "\n")
+
+    test_move_statistics()
+    test_growth_and_incremental_updates()
+    test_crash_mid_merge()
+    test_library_and_lookup_speed()
+
+    print("\n🎉 All opening explorer tests passed!")
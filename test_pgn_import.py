@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test the game store and the streaming PGN importer"""
+
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+sys.path.insert(0, 'src')
+
+import chess
+
+from games.game_store import GameStore
+from games.pgn_import import PgnImporter, byte_ranges
+
+GAME = """[Event "Casual game {n}"]
+[Site "https://example.org/{n}"]
+[White "Alice"]
+[Black "Bob"]
+[Result "1-0"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+
+"""
+BROKEN = """[Event "Broken"]
+[Result "*"]
+
+1. e4 e5 2. Ke3 *
+
+"""
+
+
+def _write_pgn(path, count, opener=open):
+    with opener(path, 'wt') as f:
+        for n in range(count):
+            f.write(GAME.format(n=n))
+            if n == count // 2:
+                f.write(BROKEN)
+
+
+def test_store_roundtrip():
+    """Test that games come back exactly as stored"""
+    print("🧪 Testing game store...")
+    path = tempfile.mkdtemp()
+    try:
+        moves = [chess.Move.from_uci(uci) for uci in ('e2e4', 'e7e5', 'g1f3', 'b8c6')]
+        with GameStore(path) as store:
+            game_id = store.append({'White': 'Alice', 'Black': 'Bob'}, moves)
+            store.append({'FEN': '8/8/8/8/8/8/4k3/4K2R w K - 0 1'}, [chess.Move.from_uci('e1g1')])
+            store.flush()
+            assert game_id == 0 and len(store) == 2
+            assert store.get_headers(0)['White'] == 'Alice'
+            assert store.get_moves(0) == moves
+            assert store.get_game(1).end().board().fen().startswith('8/8/8/8/8/8/4k3/5RK1')
+
+        with GameStore(path) as store:
+            assert len(store) == 2, "Store should reopen with both games"
+            store.append({}, moves)
+        assert len(GameStore(path)) == 3
+        print("✅ Game store round-trips")
+    finally:
+        shutil.rmtree(path)
+
+
+def test_torn_write_ignored():
+    """Test that data written without an index entry is dropped"""
+    print("🧪 Testing torn writes...")
+    path = tempfile.mkdtemp()
+    try:
+        with GameStore(path) as store:
+            store.append({'Event': 'kept'}, [])
+        with open(os.path.join(path, 'games.dat'), 'ab') as f:
+            f.write(b'\x05\x00\x02')  # Crash mid-record
+        with GameStore(path) as store:
+            store.append({'Event': 'next'}, [])
+        with GameStore(path) as store:
+            assert len(store) == 2 and store.get_headers(1)['Event'] == 'next'
+        print("✅ Torn tail dropped")
+    finally:
+        shutil.rmtree(path)
+
+
+def test_byte_ranges():
+    """Test that chunks cover the file and start on a game"""
+    print("🧪 Testing chunk boundaries...")
+    tmp = tempfile.mkdtemp()
+    try:
+        pgn_path = os.path.join(tmp, 'games.pgn')
+        _write_pgn(pgn_path, 50)
+        ranges = list(byte_ranges(pgn_path, 500))
+        assert ranges[0][0] == 0 and ranges[-1][1] == os.path.getsize(pgn_path)
+        assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+        with open(pgn_path, 'rb') as f:
+            for start, _ in ranges:
+                f.seek(start)
+                assert f.read(7) == b'[Event '
+        print(f"✅ {len(ranges)} chunks")
+    finally:
+        shutil.rmtree(tmp)
+
+
+def test_import():
+    """Test importing plain and gzipped PGN with several workers"""
+    print("🧪 Testing import...")
+    tmp = tempfile.mkdtemp()
+    try:
+        for name, opener in (('games.pgn', open), ('games.pgn.gz', gzip.open)):
+            pgn_path = os.path.join(tmp, name)
+            _write_pgn(pgn_path, 40, opener)
+            library = os.path.join(tmp, name + '.lib')
+            with GameStore(library) as store:
+                stats = PgnImporter(store, workers=2, chunk_bytes=1000).import_file(pgn_path, progress=None)
+                assert stats['games'] == 40 and stats['skipped'] == 1, stats
+                assert len(store) == 40
+                # Chunks are collected in file order
+                assert [store.get_headers(i)['Event'] for i in (0, 39)] == \
+                       ['Casual game 0', 'Casual game 39']
+                assert store.get_game(7).end().board().is_checkmate()
+        print("✅ Plain and gzipped files imported")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📥 PGN IMPORT TESTS")
+    print("="*60 + "\n")
+
+    test_store_roundtrip()
+    test_torn_write_ignored()
+    test_byte_ranges()
+    test_import()
+
+    print("\n🎉 All PGN import tests passed!")
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Test the Zobrist position index over the game library"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'src')
+
+import chess
+
+from games.library import GameLibrary
+from games.pgn_import import PgnImporter
+from games.position_index import PositionIndex, position_keys
+
+GAMES = """[Event "Knights A"]
+[White "Alice"]
+[Black "Bob"]
+
+1. Nf3 Nf6 2. Nc3 d5 *
+
+[Event "Knights B"]
+[White "Carol"]
+[Black "Alice"]
+
+1. Nc3 Nf6 2. Nf3 e5 *
+
+[Event "Kings pawn"]
+
+1. e4 e5 *
+
+"""
+
+
+def _board(*sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+def test_postings_and_transpositions():
+    """Test that lookups find games by position, whatever the move order"""
+    print("🧪 Testing lookups...")
+    path = tempfile.mkdtemp()
+    try:
+        with PositionIndex(path) as index:
+            for game_id, sans in enumerate([('Nf3', 'Nf6', 'Nc3'), ('Nc3', 'Nf6', 'Nf3'), ('e4',)]):
+                moves = [m for m in _board(*sans).move_stack]
+                index.add_game(game_id, position_keys(chess.Board(), moves))
+
+        with PositionIndex(path) as index:
+            assert index.games_indexed == 3
+            assert index.lookup(_board('Nf3', 'Nf6', 'Nc3')) == [(0, 3), (1, 3)]
+            assert index.lookup(chess.Board()) == [(0, 0), (1, 0), (2, 0)]
+            assert index.lookup(_board('d4')) == []
+        print("✅ Transpositions found")
+    finally:
+        shutil.rmtree(path)
+
+
+def test_compaction():
+    """Test that many runs are merged without losing postings"""
+    print("🧪 Testing compaction...")
+    path = tempfile.mkdtemp()
+    rng = random.Random(3)
+    try:
+        index = PositionIndex(path)
+        index.BUFFER_POSTINGS = 100
+        index.MAX_RUNS = 3
+        expected = {}
+        for game_id in range(200):
+            keys = [rng.randrange(1000) for _ in range(5)]
+            index.add_game(game_id, keys)
+            for ply, key in enumerate(keys):
+                expected.setdefault(key, set()).add((game_id, ply))
+        index.flush()
+        assert len(index._runs) <= 3
+        assert len(index) == 1000
+        for key in (0, 17, 999):
+            assert set(index.lookup(key)) == expected.get(key, set())
+        index.close()
+        print("✅ Runs merged")
+    finally:
+        shutil.rmtree(path)
+
+
+def test_lookup_speed():
+    """Test that a lookup in a million postings takes milliseconds"""
+    print("🧪 Testing lookup speed...")
+    path = tempfile.mkdtemp()
+    rng = random.Random(5)
+    try:
+        index = PositionIndex(path)
+        key = None
+        for game_id in range(12500):
+            keys = [rng.getrandbits(64) for _ in range(80)]
+            key = key or keys[40]
+            index.add_game(game_id, keys)
+        index.flush()
+        postings = len(index)
+
+        start = time.perf_counter()
+        for _ in range(100):
+            result = index.lookup(key)
+        elapsed = (time.perf_counter() - start) / 100
+        assert result == [(0, 40)]
+        assert elapsed < 0.005, f"{elapsed * 1000:.2f}ms"
+        index.close()
+        print(f"✅ {elapsed * 1000:.3f}ms per lookup over {postings} postings")
+    finally:
+        shutil.rmtree(path)
+
+
+def test_import_builds_index():
+    """Test that importing a PGN indexes its positions"""
+    print("🧪 Testing index during import...")
+    tmp = tempfile.mkdtemp()
+    try:
+        pgn_path = os.path.join(tmp, 'games.pgn')
+        with open(pgn_path, 'w') as f:
+            f.write(GAMES)
+        with GameLibrary(os.path.join(tmp, 'library')) as library:
+            PgnImporter(library.store, workers=1, position_index=library.positions) \
+                .import_file(pgn_path, progress=None)
+            assert library.positions.games_indexed == 3
+
+            games = library.games_reaching(_board('Nc3', 'Nf6', 'Nf3'))
+            assert [g['Event'] for g in games] == ['Knights A', 'Knights B']
+            assert library.count_reaching(_board('e4', 'e5')) == 1
+        print("✅ Import indexed every position")
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📚 POSITION INDEX TESTS")
+    print("="*60 + "\n")
+
+    test_postings_and_transpositions()
+    test_compaction()
+    test_lookup_speed()
+    test_import_builds_index()
+
+    print("\n🎉 All position index tests passed!")
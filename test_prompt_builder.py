@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Test compact prompts, token budgets and the usage meter"""
+
+import sys
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.chess_coach import ChessCoach
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import LLMGateway
+from ai.prompt_builder import BUDGETS, EXTRA, REQUIRED, USEFUL, PromptBuilder, prompt_tokens, tactics_summary
+
+SCHOLAR = "r1bqkbnr/pppp1ppp/2n5/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR b KQkq - 3 3"
+
+
+def _board(*sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+def test_budget():
+    """Test that optional fields are dropped, lowest priority first"""
+    print("🧪 Testing token budget...")
+    prompt = (PromptBuilder('custom', budget=20)
+              .add('Keep', 'this', REQUIRED)
+              .add('Useful', 'x' * 20, USEFUL)
+              .add('Extra', 'y' * 20, EXTRA)
+              .add('Empty', None)
+              .ask("Answer briefly."))
+    text = prompt.build()
+    assert 'Keep: this' in text and text.endswith("Answer briefly.")
+    assert prompt.dropped == ['Extra'] and 'Useful' in text
+    assert prompt_tokens(text) <= 20
+    assert 'Empty' not in text
+
+    tiny = PromptBuilder('custom', budget=5).add('Keep', 'z' * 40, REQUIRED).add('Extra', 'y', EXTRA)
+    assert 'Keep' in tiny.build() and tiny.dropped == ['Extra'], "required fields are never dropped"
+    print("✅ Over-budget prompts trimmed")
+
+
+def test_coach_prompts_are_compact():
+    """Test the coach's prompts: structured, within budget, with tactics"""
+    print("🧪 Testing coach prompts...")
+    coach = ChessCoach(gateway=LLMGateway())
+    board = chess.Board(SCHOLAR)
+    position = coach._build_position_prompt(board, {'score': 0.3, 'best_move': 'g6'})
+    assert board.fen() not in position, "castling and clocks are left out"
+    assert 'Pos: ' + board.board_fen() + ' b' in position
+    assert 'threat Qxf7#' in position
+
+    move = coach._build_move_explanation_prompt(
+        board, 'Nf6', {'classification': 'blunder', 'eval_change': -9.5, 'best_move': 'g6'}, {})
+    assert 'Better: g6' in move and 'mate Qxf7#' in move
+    tactic = coach._build_tactic_prompt(board, 'g6', [('g6', 0.3), ('Qe7', 0.2)])
+    caro_kann = coach._build_position_prompt(_board('e4', 'c6'), {'score': 0.3, 'best_move': 'd4'})
+    assert 'Opening: B10 Caro-Kann Defense' in caro_kann
+
+    for kind, text in [('explain_position', position), ('explain_move', move), ('explain_tactic', tactic)]:
+        assert prompt_tokens(text) <= BUDGETS[kind], (kind, prompt_tokens(text))
+    print(f"✅ Position prompt {prompt_tokens(position)} tokens, move {prompt_tokens(move)}")
+    assert tactics_summary(chess.Board()) == ''
+
+
+def test_meter():
+    """Test per-call-type token and latency accounting"""
+    print("🧪 Testing usage meter...")
+
+    def create(messages, **kwargs):
+        usage = SimpleNamespace(prompt_tokens=40, completion_tokens=25)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="Fine."))],
+                               usage=usage)
+
+    gateway = LLMGateway(SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create))))
+    coach = ChessCoach(gateway=gateway, cache=LLMCache(':memory:'))
+    board = chess.Board(SCHOLAR)
+    blunder = {'classification': 'blunder', 'eval_change': -9.5, 'best_move': 'g6'}
+    coach.explain_move(board, 'Nf6', blunder, {})
+    coach.explain_move(board, 'Nf6', blunder, {})
+    coach.explain_position(board, {'score': 0.3, 'best_move': 'g6'})
+    coach.explain_position(board, {'score': 0.3, 'best_move': 'g6'})  # Cached: not metered
+    stats = gateway.stats()
+    assert stats['explain_move']['calls'] == 2
+    assert stats['explain_move']['prompt_tokens'] == 80
+    assert stats['explain_move']['completion_tokens'] == 50
+    assert stats['explain_position']['calls'] == 1
+    assert stats['explain_position']['avg_prompt_tokens'] == 40
+    report = gateway.usage_report()
+    assert report[0].startswith('explain_move: 2 calls, 80 prompt / 50 completion tokens')
+    print(f"✅ {report[0]}")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📏 PROMPT BUILDER TESTS")
+    print("="*60 + "\n")
+
+    test_budget()
+    test_coach_prompts_are_compact()
+    test_meter()
+
+    print("\n🎉 All prompt builder tests passed!")
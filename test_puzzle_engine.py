@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Test the precompiled solution line in PuzzleEngine (offline)"""
+
+import sys
+sys.path.insert(0, 'src')
+
+from puzzles.puzzle_engine import PuzzleEngine
+
+# Scholar's mate after 1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6??
+SCHOLAR = {
+    'id': 'sch01',
+    'fen': "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    'moves': ['h5f7'],
+    'rating': 800,
+    'themes': ['mate', 'mateIn1']
+}
+
+# 1. Rxd8 Rxd8 2. Rxd8#: a three-ply line with an opponent reply
+BACK_RANK = {
+    'id': 'back1',
+    'fen': "3rr1k1/5ppp/8/8/8/8/3R1PPP/3R2K1 w - - 0 1",
+    'moves': ['d2d8', 'e8d8', 'd1d8'],
+    'rating': 1200,
+    'themes': ['mate', 'mateIn2']
+}
+
+
+def test_compiled_line():
+    """Test that SAN and keys are computed once for every ply"""
+    print("🧪 Testing compiled line...")
+    engine = PuzzleEngine(BACK_RANK)
+    assert engine.line_sans == ['Rxd8', 'Rxd8', 'Rxd8#']
+    assert len(engine.line_keys) == 3 and len(set(engine.line_keys)) == 3
+    assert engine.get_hint() == engine.line_sans[0]
+    assert engine.get_solution_str() == " ".join(engine.line_sans)
+    print(f"✅ Line: {engine.get_solution_str()}")
+
+
+def test_input_forms():
+    """Test that SAN, SAN without check marks and UCI are all accepted"""
+    print("🧪 Testing input forms...")
+    for move_str in ('Qxf7#', 'Qxf7', 'h5f7'):
+        engine = PuzzleEngine(SCHOLAR)
+        result, move, opponent_san = engine.check_move(move_str)
+        assert result == 'complete', (move_str, result)
+        assert move.uci() == 'h5f7' and opponent_san is None
+    print("✅ All input forms accepted")
+
+
+def test_opponent_reply():
+    """Test that the stored reply is played after a correct move"""
+    print("🧪 Testing opponent reply...")
+    engine = PuzzleEngine(BACK_RANK)
+    result, _, opponent_san = engine.check_move(engine.get_hint())
+    assert result == 'correct' and opponent_san == engine.line_sans[1]
+    assert engine.get_solution_str() == engine.line_sans[2]
+    result, _, _ = engine.check_move('Rxd8')
+    assert result == 'complete' and engine.get_board().is_checkmate()
+    assert engine.check_move('Rxd8') == ('complete', None, None)
+    print("✅ Reply played")
+
+
+def test_errors():
+    """Test that every result has three fields"""
+    print("🧪 Testing errors...")
+    engine = PuzzleEngine(SCHOLAR)
+    result, message, opponent_san = engine.check_move('xyz123')
+    assert result == 'error' and message and opponent_san is None
+    assert engine.check_move('e1e3')[0] == 'error', "Illegal moves are errors"
+    assert engine.check_move('a2a3') == ('incorrect', None, None)
+
+    broken = dict(SCHOLAR, moves=['h5f7', 'a1a8'])
+    engine = PuzzleEngine(broken)
+    assert len(engine.line_moves) == 1, "Compilation stops at the illegal ply"
+    assert engine.check_move('Qxf7#')[0] == 'complete'
+    print("✅ Errors reported")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🧩 PUZZLE ENGINE TESTS")
+    print("="*60 + "\n")
+
+    test_compiled_line()
+    test_input_forms()
+    test_opponent_reply()
+    test_errors()
+
+    print("\n🎉 All puzzle engine tests passed!")
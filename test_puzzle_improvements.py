@@ -37,7 +37,7 @@ print(f"💡 Hint: {hint}")
 
 # Test invalid move
 print("\n🧪 Testing invalid move: 'xyz123'")
-result, move = engine.check_move("xyz123")
+result, move, _ = engine.check_move("xyz123")
 print(f"Result: {result}")
 if result == 'error':
     print(f"Error message: {move}")
@@ -45,7 +45,7 @@ if result == 'error':
 
 # Test incorrect but valid move
 print("\n🧪 Testing incorrect but valid move: 'e2e4'")
-result, move = engine.check_move("e2e4")
+result, move, _ = engine.check_move("e2e4")
 print(f"Result: {result}")
 if result == 'incorrect':
     print("✅ Incorrect moves are detected!")
@@ -33,7 +33,7 @@ print(f"💡 Hint: The first move is {hint}")
 
 # Test correct move
 print(f"\n🧪 Testing correct move: {puzzle_data['moves'][0]}")
-result, move = engine.check_move(puzzle_data['moves'][0])
+result, move, _ = engine.check_move(puzzle_data['moves'][0])
 print(f"Result: {result}")
 
 if result == 'correct':
@@ -46,7 +46,7 @@ else:
 # Test incorrect move
 print("\n🧪 Testing incorrect move: e2e4")
 board_before = engine.get_board().copy()
-result, move = engine.check_move("e2e4")
+result, move, _ = engine.check_move("e2e4")
 print(f"Result: {result}")
 
 if result == 'incorrect':
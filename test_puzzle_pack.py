@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Test binary puzzle packs"""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'src')
+
+import chess
+from puzzles.puzzle_pack import PuzzlePack, RECORD, encode_move, decode_move
+from puzzles.puzzle_engine import PuzzleEngine
+
+# Position after 1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6?? - White mates with Qxf7#
+SCHOLAR = {
+    'id': 'sch01',
+    'fen': 'r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4',
+    'moves': ['h5f7'],
+    'rating': 812,
+    'themes': ['mate', 'mateIn1', 'opening', 'short'],
+    'last_move_uci': 'g8f6'
+}
+
+# Promotion codes and unknown themes
+PROMOTION = {
+    'id': 'promo',
+    'fen': '8/1P6/8/8/8/8/5k2/K7 w - - 0 60',
+    'moves': ['b7b8q', 'f2e3'],
+    'rating': 1234,
+    'themes': ['promotion', 'endgame', 'unknownTheme'],
+    'last_move_uci': 'e1f2'
+}
+
+
+# Castling rights and en passant square must survive packing
+EN_PASSANT = {
+    'id': 'ep001',
+    'fen': 'r3k2r/ppp2ppp/8/3pP3/8/8/PPP2PPP/R3K2R w Kq d6 0 10',
+    'moves': ['e5d6'],
+    'rating': 1500,
+    'themes': ['enPassant'],
+    'last_move_uci': 'd7d5'
+}
+
+
+def _write_pack(puzzles):
+    fd, path = tempfile.mkstemp(suffix='.pack')
+    os.close(fd)
+    PuzzlePack.write(path, puzzles)
+    return path
+
+
+def test_move_codes():
+    """Test 16-bit move encoding round trip"""
+    print("🧪 Testing move codes...")
+    for uci in ['e2e4', 'a7a8q', 'h2h1n', 'e1g1']:
+        move = chess.Move.from_uci(uci)
+        code = encode_move(move)
+        assert code < 1 << 16, f"{uci} does not fit in 16 bits"
+        assert decode_move(code) == move, f"{uci} did not round trip"
+    print("✅ Move codes work")
+
+
+def test_round_trip():
+    """Test that records decode to the same puzzle"""
+    print("🧪 Testing pack round trip...")
+    path = _write_pack([SCHOLAR, PROMOTION, EN_PASSANT])
+    try:
+        assert os.path.getsize(path) == 16 + 3 * RECORD.size
+        with PuzzlePack(path) as pack:
+            assert len(pack) == 3
+            puzzle = pack.get_puzzle(0)
+            assert puzzle['id'] == 'sch01'
+            assert puzzle['fen'] == SCHOLAR['fen']
+            assert puzzle['moves'] == ['h5f7']
+            assert puzzle['rating'] == 812
+            assert puzzle['themes'] == ['mate', 'mateIn1', 'opening', 'short']
+            assert puzzle['last_move_uci'] == 'g8f6'
+
+            promo = pack.get_puzzle(1)
+            assert promo['fen'] == PROMOTION['fen']
+            assert promo['moves'] == ['b7b8q', 'f2e3']
+            assert promo['themes'] == ['endgame', 'promotion']
+            assert pack.get_rating(1) == 1234
+
+            ep = pack.get_puzzle(2)
+            assert ep['fen'] == EN_PASSANT['fen']
+            assert ep['board'].has_legal_en_passant()
+        print("✅ Round trip works")
+    finally:
+        os.remove(path)
+
+
+def test_append():
+    """Test appending to an existing pack"""
+    print("🧪 Testing append...")
+    path = _write_pack([SCHOLAR])
+    try:
+        assert PuzzlePack.append(path, [PROMOTION, SCHOLAR]) == 2
+        with PuzzlePack(path) as pack:
+            assert len(pack) == 3
+            assert pack.get_puzzle(2)['id'] == 'sch01'
+        print("✅ Append works")
+    finally:
+        os.remove(path)
+
+
+def test_engine_from_pack():
+    """Test building a PuzzleEngine from a pack record"""
+    print("🧪 Testing PuzzleEngine.from_pack...")
+    path = _write_pack([SCHOLAR])
+    try:
+        with PuzzlePack(path) as pack:
+            engine = PuzzleEngine.from_pack(pack, 0)
+        assert engine.get_turn_info() == "White"
+        result = engine.check_move('Qxf7#')
+        assert result[0] == 'complete', f"Unexpected result {result}"
+        print("✅ PuzzleEngine.from_pack works")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📦 PUZZLE PACK TESTS")
+    print("="*60 + "\n")
+
+    test_move_codes()
+    test_round_trip()
+    test_append()
+    test_engine_from_pack()
+
+    print("\n🎉 All puzzle pack tests passed!")
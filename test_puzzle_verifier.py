@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Test how the puzzle verifier judges engine results"""
+
+import sys
+sys.path.insert(0, 'src')
+
+from chess.engine import Cp, Mate
+
+from puzzles.puzzle_verifier import VerifierSettings, judge_move
+
+SETTINGS = VerifierSettings()
+
+
+def test_unique_solution():
+    """Test that a clearly best recorded move passes"""
+    print("🧪 Testing unique solution...")
+    problem, alts = judge_move([('d1h5', Cp(600)), ('e1g1', Cp(20))], 'd1h5', SETTINGS, final=True)
+    assert problem is None and alts == []
+    print("✅ Unique solution accepted")
+
+
+def test_broken_solutions():
+    """Test that losing or inferior recorded moves are flagged"""
+    print("🧪 Testing broken solutions...")
+    problem, _ = judge_move([('a2a3', Cp(-50))], 'a2a3', SETTINGS, final=True)
+    assert problem == "solution move does not win"
+
+    problem, _ = judge_move([('h5f7', Mate(1)), ('a2a3', Cp(900))], 'a2a3', SETTINGS, final=True)
+    assert problem and 'misses mate' in problem
+
+    problem, _ = judge_move([('b1c3', Cp(2000)), ('a2a3', Cp(250))], 'a2a3', SETTINGS, final=False)
+    assert problem and 'clearly better' in problem
+
+    # Equality puzzles only need to hold the balance
+    problem, _ = judge_move([('a2a3', Cp(0))], 'a2a3', SETTINGS, final=True, equality=True)
+    assert problem is None
+    print("✅ Broken solutions flagged")
+
+
+def test_alternatives():
+    """Test that equally good moves are recorded as alternatives"""
+    print("🧪 Testing alternatives...")
+    problem, alts = judge_move([('c3d5', Cp(800)), ('c3b5', Cp(780)), ('a2a3', Cp(10))],
+                               'c3d5', SETTINGS, final=False)
+    assert problem is None and alts == ['c3b5']
+
+    # A slower mate is not a rival before the last move...
+    problem, alts = judge_move([('h5f7', Mate(2)), ('h5h7', Mate(4))], 'h5f7', SETTINGS, final=False)
+    assert problem is None and alts == []
+
+    # ...but any mate is on the last one
+    problem, alts = judge_move([('h5f7', Mate(1)), ('h5h7', Mate(1))], 'h5f7', SETTINGS, final=True)
+    assert alts == ['h5h7']
+    print("✅ Alternatives recorded")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🔍 PUZZLE VERIFIER TESTS")
+    print("="*60 + "\n")
+
+    test_unique_solution()
+    test_broken_solutions()
+    test_alternatives()
+
+    print("\n🎉 All puzzle verifier tests passed!")
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Test the opening repertoire trie and its drill schedule"""
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'src')
+
+import chess
+import chess.polyglot
+
+from games.repertoire import Repertoire, line_id, pick_line
+from puzzles.review_queue import QUALITY_SOLVED, ReviewQueue
+
+REPERTOIRE_PGN = """[Event "Queen's Gambit"]
+
+1. d4 d5 2. c4 (2. Nf3 Nf6 3. c4) 2... Nf6 3. Nc3 *
+
+[Event "Reti"]
+
+1. Nf3 d5 2. d4 *
+
+"""
+
+
+def _board(*sans):
+    board = chess.Board()
+    for san in sans:
+        board.push_san(san)
+    return board
+
+
+def _write_pgn(text):
+    fd, path = tempfile.mkstemp(suffix='.pgn')
+    with os.fdopen(fd, 'w') as f:
+        f.write(text)
+    return path
+
+
+def test_trie_and_transpositions():
+    """Test lookups, and that transposing lines share positions"""
+    print("🧪 Testing repertoire trie...")
+    pgn_path = _write_pgn(REPERTOIRE_PGN)
+    try:
+        rep = Repertoire.from_pgn(pgn_path, chess.WHITE)
+
+        assert set(rep.moves(chess.Board())) == {chess.Move.from_uci('d2d4'), chess.Move.from_uci('g1f3')}
+        # 1.Nf3 d5 2.d4 reaches the Queen's Gambit position after 1.d4 d5 2.Nf3
+        after_d5 = _board('d4', 'd5')
+        assert rep.node(_board('Nf3', 'd5', 'd4')) == rep.node(_board('d4', 'd5', 'Nf3'))
+        assert rep.contains(after_d5, chess.Move.from_uci('c2c4'))
+        assert rep.contains(after_d5, chess.Move.from_uci('g1f3'))
+        assert not rep.contains(after_d5, chess.Move.from_uci('e2e4'))
+        assert rep.moves(_board('e4')) == []
+
+        # 1.d4 d5 2.c4 Nf6 and 1.d4 d5 2.Nf3 Nf6 3.c4 differ; both lines end as leaves
+        leaves = rep.leaves()
+        lines = [[m.uci() for m in rep.line(leaf)] for leaf in leaves]
+        assert ['d2d4', 'd7d5', 'c2c4', 'g8f6', 'b1c3'] in lines
+        assert all(rep.moves(_board_from(rep, line)) == [] for line in lines)
+        print("✅ Lookups and transpositions work")
+    finally:
+        os.remove(pgn_path)
+
+
+def _board_from(rep, ucis):
+    board = rep.root_board()
+    for uci in ucis:
+        board.push_uci(uci)
+    return board
+
+
+def test_save_and_load_speed():
+    """Test that a large repertoire round-trips and loads in milliseconds"""
+    print("🧪 Testing serialisation...")
+    rng = random.Random(4)
+    children = {}
+    root = chess.polyglot.zobrist_hash(chess.Board())
+    # Random tree of ~50,000 positions (keys are arbitrary; only structure matters)
+    frontier = [root]
+    nodes = 1
+    while nodes < 50000:
+        parent = frontier[rng.randrange(len(frontier))]
+        child = rng.getrandbits(64)
+        children.setdefault(parent, {})[rng.randrange(1, 1 << 12)] = child
+        frontier.append(child)
+        nodes += 1
+    rep = Repertoire._from_edges(chess.BLACK, root, children)
+
+    fd, path = tempfile.mkstemp(suffix='.rep')
+    os.close(fd)
+    try:
+        rep.save(path)
+        start = time.perf_counter()
+        loaded = Repertoire.load(path)
+        elapsed = time.perf_counter() - start
+        assert len(loaded) == len(rep) and loaded.color == chess.BLACK
+        assert loaded.keys == rep.keys and loaded.edge_child == rep.edge_child
+        leaf = loaded.leaves()[-1]
+        assert loaded.line(leaf) == rep.line(leaf)
+        assert elapsed < 0.05, f"{elapsed * 1000:.1f}ms"
+        print(f"✅ {len(loaded)} positions loaded in {elapsed * 1000:.2f}ms")
+    finally:
+        os.remove(path)
+
+
+def test_drill_schedule():
+    """Test that new lines come in order and reviews come back when due"""
+    print("🧪 Testing drill schedule...")
+    pgn_path = _write_pgn(REPERTOIRE_PGN)
+    tmp = tempfile.mkdtemp()
+    try:
+        rep = Repertoire.from_pgn(pgn_path, chess.WHITE)
+        reviews = ReviewQueue(os.path.join(tmp, 'reviews.jsonl'))
+        now = time.time()
+
+        seen = []
+        while True:
+            picked = pick_line(rep, reviews, now)
+            if picked is None:
+                break
+            seen.append(picked)
+            reviews.record(picked[0], {}, QUALITY_SOLVED, now=now)
+        assert [node for _, node in seen] == rep.leaves()
+        assert seen[0][0] == line_id(rep, seen[0][1])
+
+        # A day later the first line is due again
+        picked = pick_line(rep, reviews, now + 86400 + 1)
+        assert picked is not None and picked[0] == seen[0][0]
+
+        # A line that left the repertoire is dropped instead of blocking the reviews behind it
+        reviews.record('00000000deadbeef', {}, QUALITY_SOLVED, now=now - 86400)
+        picked = pick_line(rep, reviews, now + 86400 + 1)
+        assert picked is not None and picked[0] == seen[0][0]
+        assert '00000000deadbeef' not in reviews
+        assert '00000000deadbeef' not in ReviewQueue(reviews.path), "removal is journaled"
+        print("✅ Lines scheduled by spaced repetition")
+    finally:
+        os.remove(pgn_path)
+        shutil.rmtree(tmp)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📖 REPERTOIRE TESTS")
+    print("="*60 + "\n")
+
+    test_trie_and_transpositions()
+    test_save_and_load_speed()
+    test_drill_schedule()
+
+    print("\n🎉 All repertoire tests passed!")
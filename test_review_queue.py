@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Test the spaced-repetition review queue"""
+
+import os
+import sys
+import tempfile
+import time
+sys.path.insert(0, 'src')
+
+from puzzles.review_queue import ReviewQueue, DAY, QUALITY_FAILED, QUALITY_SOLVED
+
+PUZZLE = {
+    'id': 'abc12',
+    'fen': 'r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4',
+    'moves': ['h5f7'],
+    'rating': 812,
+    'themes': ['mate', 'mateIn1'],
+    'pgn': '1. e4 e5 2. Bc4 Nc6 3. Qh5 Nf6',
+    'last_move_uci': 'g8f6'
+}
+
+
+def _temp_path():
+    fd, path = tempfile.mkstemp(suffix='.jsonl')
+    os.close(fd)
+    os.remove(path)
+    return path
+
+
+def test_sm2_schedule():
+    """Test SM-2 intervals after failing and then solving"""
+    print("🧪 Testing SM-2 schedule...")
+    queue = ReviewQueue(_temp_path())
+    now = 1_000_000.0
+
+    item = queue.record('p1', {}, QUALITY_FAILED, now=now)
+    assert item['interval'] == 1 and item['lapses'] == 1
+    assert item['ease'] < ReviewQueue.DEFAULT_EASE
+
+    intervals = []
+    for _ in range(4):
+        now = item['due']
+        item = queue.record('p1', {}, QUALITY_SOLVED, now=now)
+        intervals.append(item['interval'])
+    assert intervals[:2] == [1, 6], intervals
+    assert intervals[2] > 6 and intervals[3] > intervals[2], intervals
+    print(f"✅ Intervals after failing: {intervals}")
+
+
+def test_due_order():
+    """Test that the most overdue item comes first"""
+    print("🧪 Testing due order...")
+    queue = ReviewQueue(_temp_path())
+    queue.record('late', {}, QUALITY_FAILED, now=0)
+    queue.record('early', {}, QUALITY_FAILED, now=-DAY)
+    queue.record('future', {}, QUALITY_FAILED, now=10 * DAY)
+
+    assert queue.next_due(now=-DAY) is None
+    assert queue.next_due(now=DAY / 2)['id'] == 'early'
+    assert queue.next_due(now=2 * DAY)['id'] == 'early'
+
+    # Rescheduling 'early' pushes it behind 'late'
+    queue.record('early', {}, QUALITY_SOLVED, now=2 * DAY)
+    assert queue.next_due(now=2 * DAY)['id'] == 'late'
+    assert queue.due_count(now=2 * DAY) == 1
+    print("✅ Due order works")
+
+
+def test_persistence():
+    """Test that reviews survive a restart"""
+    print("🧪 Testing persistence...")
+    path = _temp_path()
+    try:
+        queue = ReviewQueue(path)
+        assert queue.record_puzzle(PUZZLE, solved=True) is None, "Solved puzzles are not queued"
+        queue.record_puzzle(PUZZLE, solved=False)
+        queue.record_puzzle(PUZZLE, solved=True)
+
+        reloaded = ReviewQueue(path)
+        assert len(reloaded) == 1
+        item = reloaded.items['abc12']
+        assert item['repetitions'] == 1 and item['lapses'] == 1
+        assert item['payload']['moves'] == ['h5f7']
+        assert 'pgn' not in item['payload']
+        print("✅ Persistence works")
+    finally:
+        os.remove(path)
+
+
+def test_many_items():
+    """Test that the queue stays fast with tens of thousands of items"""
+    print("🧪 Testing 20,000 reviews...")
+    path = _temp_path()
+    try:
+        queue = ReviewQueue(path)
+        start = time.time()
+        for i in range(20000):
+            queue.record(f'p{i}', {'id': f'p{i}'}, QUALITY_FAILED, now=-i)
+        record_time = time.time() - start
+
+        start = time.time()
+        for _ in range(1000):
+            queue.next_due()
+        due_time = time.time() - start
+        assert queue.next_due()['id'] == 'p19999'
+
+        start = time.time()
+        assert len(ReviewQueue(path)) == 20000
+        load_time = time.time() - start
+        print(f"✅ record {record_time / 20:.3f}ms, next_due {due_time:.3f}ms, load {load_time * 1000:.0f}ms")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🔁 REVIEW QUEUE TESTS")
+    print("="*60 + "\n")
+
+    test_sm2_schedule()
+    test_due_order()
+    test_persistence()
+    test_many_items()
+
+    print("\n🎉 All review queue tests passed!")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test the seen-puzzle Bloom filter"""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'src')
+
+from puzzles.seen_filter import SeenFilter
+
+
+def _temp_path():
+    fd, path = tempfile.mkstemp(suffix='.bloom')
+    os.close(fd)
+    os.remove(path)
+    return path
+
+
+def test_membership():
+    """Test that added puzzles are always found"""
+    print("🧪 Testing membership...")
+    seen = SeenFilter(_temp_path(), initial_capacity=1000)
+    for i in range(5000):
+        seen.add(f'puz{i}')
+    assert all(f'puz{i}' in seen for i in range(5000)), "Bloom filters never miss"
+    assert len(seen.slices) > 1, "Filter should have scaled past the first slice"
+    print(f"✅ {len(seen)} puzzles in {len(seen.slices)} slices")
+
+
+def test_false_positive_rate():
+    """Test that the false-positive rate stays near the target"""
+    print("🧪 Testing false-positive rate...")
+    seen = SeenFilter(_temp_path(), error_rate=0.01, initial_capacity=1000)
+    for i in range(20000):
+        seen.add(f'puz{i}')
+    false_positives = sum(f'other{i}' in seen for i in range(20000))
+    rate = false_positives / 20000
+    assert rate < 0.02, f"False-positive rate {rate:.4f} too high"
+    print(f"✅ False-positive rate {rate:.4f} (target 0.01)")
+
+
+def test_memory_budget():
+    """Test that the filter never exceeds its memory budget"""
+    print("🧪 Testing memory budget...")
+    budget = 64 * 1024
+    seen = SeenFilter(_temp_path(), initial_capacity=1000, max_bytes=budget)
+    for i in range(200000):
+        seen.add(f'puz{i}')
+        assert seen.size_bytes <= budget
+    assert 'puz199999' in seen, "Recent puzzles must be remembered"
+    print(f"✅ {seen.size_bytes} bytes used of {budget}")
+
+
+def test_persistence():
+    """Test that the filter survives a restart"""
+    print("🧪 Testing persistence...")
+    path = _temp_path()
+    try:
+        seen = SeenFilter(path, initial_capacity=100)
+        for i in range(1000):
+            seen.add(f'puz{i}')
+        seen.save()
+
+        reloaded = SeenFilter(path, initial_capacity=100)
+        assert len(reloaded) == len(seen)
+        assert all(f'puz{i}' in reloaded for i in range(1000))
+        reloaded.add('puz1000')
+        assert 'puz1000' in reloaded
+        print("✅ Persistence works")
+    finally:
+        os.remove(path)
+
+
+def test_damaged_file_ignored():
+    """Test that a truncated or padded file is dropped instead of breaking lookups"""
+    print("🧪 Testing damaged files...")
+    path = _temp_path()
+    try:
+        seen = SeenFilter(path, initial_capacity=100)
+        for i in range(50):
+            seen.add(f'puz{i}')
+        seen.save()
+        with open(path, 'rb') as f:
+            data = f.read()
+
+        for damaged in (data[:len(data) // 2], data + b'\0'):
+            with open(path, 'wb') as f:
+                f.write(damaged)
+            reloaded = SeenFilter(path, initial_capacity=100)
+            assert len(reloaded.slices) == 0
+            assert 'x' not in reloaded
+            reloaded.add('x')
+            assert 'x' in reloaded
+        print("✅ Damaged files start a fresh filter")
+    finally:
+        os.remove(path)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🌸 SEEN FILTER TESTS")
+    print("="*60 + "\n")
+
+    test_membership()
+    test_false_positive_rate()
+    test_memory_budget()
+    test_persistence()
+    test_damaged_file_ignored()
+
+    print("\n🎉 All seen filter tests passed!")
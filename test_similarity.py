@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test position-similarity search over a puzzle pack"""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'src')
+
+import chess
+
+from puzzles.puzzle_pack import PuzzlePack
+from puzzles.similarity import NUMPY_AVAILABLE, SimilarityIndex, features, tanimoto
+
+FENS = [
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4",
+    "r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/2N5/PPPP1PPP/R1B1K1NR w KQkq - 4 4",
+    "6k1/5ppp/8/8/8/8/5PPP/R3R1K1 w - - 0 1",
+    "3rr1k1/5ppp/8/8/8/8/3R1PPP/3R2K1 w - - 0 1",
+    "k7/8/2K5/8/8/8/8/7R w - - 0 1",
+    "8/8/4k3/8/3PK3/8/8/8 w - - 0 1",
+]
+THEMES = [['mate', 'opening'], ['mate', 'opening'], ['mate', 'backRankMate'],
+          ['mate', 'backRankMate'], ['mate', 'endgame'], ['endgame', 'pawnEndgame']]
+
+
+def _puzzles():
+    return [{'id': f'sim{i}', 'fen': fen, 'moves': ['a1a2'], 'rating': 1500, 'themes': themes}
+            for i, (fen, themes) in enumerate(zip(FENS, THEMES))]
+
+
+def _temp_path(suffix):
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    os.remove(path)
+    return path
+
+
+def test_features():
+    """Test the feature vector and Tanimoto similarity"""
+    print("🧪 Testing features...")
+    puzzles = _puzzles()
+    vectors = [features(p) for p in puzzles]
+    assert all(len(v) == 17 for v in vectors)
+    assert vectors[0][0] == int(chess.Board(FENS[0]).pieces(chess.PAWN, chess.WHITE))
+    assert tanimoto(vectors[0], vectors[0]) == 1.0
+    assert tanimoto(vectors[0], vectors[1]) > tanimoto(vectors[0], vectors[5])
+    assert tanimoto(vectors[2], vectors[3]) > tanimoto(vectors[2], vectors[0])
+    print("✅ Features and similarity look right")
+
+
+def test_pack_build_matches_parsed():
+    """Test that the pack builder produces the same rows as parsed puzzles"""
+    print("🧪 Testing pack build...")
+    path = _temp_path('.pack')
+    try:
+        PuzzlePack.write(path, _puzzles())
+        with PuzzlePack(path) as pack:
+            built = SimilarityIndex.build(pack)
+        parsed = SimilarityIndex.from_puzzles(_puzzles())
+        assert [list(map(int, row)) for row in built.matrix] == \
+               [list(map(int, row)) for row in parsed.matrix]
+        print("✅ Pack rows match parsed rows")
+    finally:
+        os.remove(path)
+
+
+def test_top_k():
+    """Test nearest-neighbour queries"""
+    print("🧪 Testing top-k...")
+    index = SimilarityIndex.from_puzzles(_puzzles())
+    results = index.similar_to(_puzzles()[2], k=2)
+    assert results[0] == (2, 1.0), "A puzzle is most similar to itself"
+    assert results[1][0] == 3, "The other back-rank puzzle comes next"
+
+    results = index.similar_to(_puzzles()[0], k=1, exclude=[0])
+    assert results[0][0] == 1
+    print(f"✅ Top matches: {results}")
+
+
+def test_save_and_load():
+    """Test that a saved matrix reloads (NumPy only)"""
+    print("🧪 Testing save/load...")
+    if not NUMPY_AVAILABLE:
+        print("⚠️  NumPy not installed, skipping")
+        return
+    pack_path = _temp_path('.pack')
+    try:
+        PuzzlePack.write(pack_path, _puzzles())
+        with PuzzlePack(pack_path) as pack:
+            first = SimilarityIndex.load_or_build(pack)
+            assert os.path.exists(pack_path + '.sim.npy')
+            second = SimilarityIndex.load_or_build(pack)
+        assert (first.matrix == second.matrix).all()
+        assert second.fingerprint == first.fingerprint
+
+        # Same number of puzzles, different order: the saved matrix is stale
+        PuzzlePack.write(pack_path, _puzzles()[::-1])
+        with PuzzlePack(pack_path) as pack:
+            rebuilt = SimilarityIndex.load_or_build(pack)
+            fresh = SimilarityIndex.build(pack)
+        assert (rebuilt.matrix == fresh.matrix).all()
+        assert not (rebuilt.matrix == first.matrix).all()
+        print("✅ Matrix reloaded, and rebuilt for a changed pack")
+    finally:
+        for path in (pack_path, pack_path + '.sim.npy'):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🔍 SIMILARITY SEARCH TESTS")
+    print("="*60 + "\n")
+
+    test_features()
+    test_pack_build_matches_parsed()
+    test_top_k()
+    test_save_and_load()
+
+    print("\n🎉 All similarity tests passed!")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""Test acceptance of alternative puzzle solutions"""
+
+import sys
+import time
+sys.path.insert(0, 'src')
+
+import chess
+
+from puzzles.puzzle_engine import PuzzleEngine
+from puzzles.solution_checker import SolutionChecker, find_mate
+
+# Forces the local mate search even where Stockfish is installed
+NO_ENGINE = 'no-such-stockfish'
+
+
+def test_find_mate():
+    """Test the local mate search"""
+    print("🧪 Testing local mate search...")
+    board = chess.Board("k7/8/2K5/8/8/8/8/7R w - - 0 1")
+    line = find_mate(board, 2, first=chess.Move.from_uci('c6b6'))
+    assert line and line[0].uci() == 'c6b6' and len(line) == 3
+    assert find_mate(board, 2, first=chess.Move.from_uci('h1h8')) is None
+    assert board.fen() == "k7/8/2K5/8/8/8/8/7R w - - 0 1", "Search must not touch the board"
+    print(f"✅ Found {' '.join(m.uci() for m in line)}")
+
+
+def test_mate_search_time():
+    """Test that a mate in three, or a search that runs out of budget, stays under 100ms"""
+    print("🧪 Testing mate search time...")
+    board = chess.Board("r5rk/5p1p/5R2/4B3/8/8/7P/7K w - - 0 1")
+    start = time.perf_counter()
+    line = find_mate(board, 3, first=chess.Move.from_uci('f6a6'))  # As the checker calls it
+    found = time.perf_counter() - start
+    assert line and line[0].uci() == 'f6a6' and len(line) == 5
+    assert found < 0.1, f"mate in 3 took {found * 1000:.0f}ms"
+
+    start = time.perf_counter()
+    assert find_mate(chess.Board(), 3) is None
+    exhausted = time.perf_counter() - start
+    assert exhausted < 0.1, f"exhausting the budget took {exhausted * 1000:.0f}ms"
+    print(f"✅ Mate in 3 in {found * 1000:.0f}ms, no mate in {exhausted * 1000:.0f}ms")
+
+
+def test_alternative_mate_accepted():
+    """Test that a different mate in one completes the puzzle"""
+    print("🧪 Testing alternative mate...")
+    puzzle = {
+        'id': 'alt1',
+        'fen': "6k1/5ppp/8/8/8/8/5PPP/R3R1K1 w - - 0 1",
+        'moves': ['e1e8'],
+        'rating': 1000,
+        'themes': ['mate', 'mateIn1']
+    }
+    checker = SolutionChecker(NO_ENGINE)
+    engine = PuzzleEngine(puzzle, checker)
+
+    start = time.time()
+    result = engine.check_move('Ra8')
+    elapsed = time.time() - start
+    assert result[0] == 'complete', result
+    assert engine.get_board().is_checkmate()
+    assert elapsed < 0.1, f"Took {elapsed * 1000:.0f}ms"
+    print(f"✅ Ra8# accepted in {elapsed * 1000:.1f}ms")
+
+
+def test_alternative_line_followed():
+    """Test that the puzzle continues along the alternative's line"""
+    print("🧪 Testing alternative line...")
+    puzzle = {
+        'id': 'alt2',
+        'fen': "k7/8/2K5/8/8/8/8/7R w - - 0 1",
+        'moves': ['c6c7', 'a8a7', 'h1a1'],
+        'rating': 1200,
+        'themes': ['mate', 'mateIn2']
+    }
+    engine = PuzzleEngine(puzzle, SolutionChecker(NO_ENGINE))
+    result = engine.check_move('Kb6')
+    assert result[0] == 'correct', result
+    assert engine.solution_moves[0] == 'c6b6'
+    assert engine.check_move(engine.get_hint())[0] == 'complete'
+    assert engine.get_board().is_checkmate()
+    print("✅ Alternative line played to mate")
+
+
+def test_wrong_moves_rejected_and_cached():
+    """Test that non-mating moves are rejected and verdicts are cached"""
+    print("🧪 Testing rejection and cache...")
+    checker = SolutionChecker(NO_ENGINE)
+    board = chess.Board("k7/8/2K5/8/8/8/8/7R w - - 0 1")
+    move = chess.Move.from_uci('h1h8')
+    expected = chess.Move.from_uci('c6c7')
+    assert checker.check(board, move, expected, 2, mate=True) == (False, None)
+    assert len(checker._cache) == 1
+    checker.check(board, move, expected, 2, mate=True)
+    assert len(checker._cache) == 1
+
+    # Without an engine, non-mate puzzles only accept the recorded move
+    assert checker.check(board, move, expected, 2, mate=False) == (False, None)
+    print("✅ Wrong moves rejected")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("✅ SOLUTION CHECKER TESTS")
+    print("="*60 + "\n")
+
+    test_find_mate()
+    test_mate_search_time()
+    test_alternative_mate_accepted()
+    test_alternative_line_followed()
+    test_wrong_moves_rejected_and_cached()
+
+    print("\n🎉 All solution checker tests passed!")
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Test the offline tactic miner (with a scripted engine in place of Stockfish)"""
+
+import io
+import json
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+import chess
+import chess.engine
+import chess.pgn
+
+from puzzles.puzzle_pack import PuzzlePack
+from puzzles.tactic_miner import (MinerSettings, TacticMiner, classify_themes, estimate_rating,
+                                  extract_line, game_offsets, mine_game, puzzle_id, win_chances)
+
+PGN = """[Event "One"]
+[Site "https://example.org/a"]
+
+1. e4 e5 2. Qh5 Nc6 3. Bc4 Nf6 4. Qxf7# 1-0
+
+[Event "Two"]
+[Site "https://example.org/b"]
+
+1. d4 d5 2. c4 *
+"""
+
+
+class ScriptedEngine:
+    """Engine stand-in: scores and multipv lines per position, everything else level"""
+
+    def __init__(self, scores=None, lines=None, replies=None):
+        self.scores = scores or {}  # board_fen -> White-POV Score
+        self.lines = lines or {}  # board_fen -> [(uci, White-POV Score), ...]
+        self.replies = replies or {}  # board_fen -> uci
+
+    def analyse(self, board, limit, multipv=None):
+        if multipv:
+            return [{'score': chess.engine.PovScore(score, chess.WHITE), 'pv': [chess.Move.from_uci(uci)]}
+                    for uci, score in self.lines.get(board.board_fen(), [])[:multipv]]
+        score = self.scores.get(board.board_fen(), chess.engine.Cp(0))
+        return {'score': chess.engine.PovScore(score, chess.WHITE)}
+
+    def play(self, board, limit):
+        uci = self.replies.get(board.board_fen())
+        return SimpleNamespace(move=chess.Move.from_uci(uci) if uci else next(iter(board.legal_moves)))
+
+
+def _fen_after(pgn_moves):
+    board = chess.Board()
+    for san in pgn_moves.split():
+        board.push_san(san)
+    return board.board_fen()
+
+
+def _temp_path(suffix):
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    os.remove(path)
+    return path
+
+
+def test_game_offsets():
+    """Test that game offsets point at the start of each game"""
+    print("🧪 Testing game offsets...")
+    path = _temp_path('.pgn')
+    try:
+        with open(path, 'w') as f:
+            f.write(PGN)
+        offsets = list(game_offsets(path))
+        assert len(offsets) == 2
+        with open(path) as f:
+            f.seek(offsets[1])
+            assert f.readline().startswith('[Event "Two"]')
+        print("✅ Offsets found")
+    finally:
+        os.remove(path)
+
+
+def test_line_classification():
+    """Test themes and rating estimate for a mate in one"""
+    print("🧪 Testing theme classification...")
+    board = chess.Board("r1bqkb1r/pppp1ppp/2n2n2/4p2Q/2B1P3/8/PPPP1PPP/RNB1K1NR w KQkq - 4 4")
+    line = [chess.Move.from_uci('h5f7')]
+    themes = classify_themes(board, line)
+    assert 'mate' in themes and 'mateIn1' in themes and 'oneMove' in themes
+    assert 'opening' in themes
+    assert estimate_rating(board, line) == 1100
+    # Each solver move is judged in its own position: exd5 is a capture only after ...d5
+    line = [chess.Move.from_uci(uci) for uci in ('e2e4', 'd7d5', 'e4d5')]
+    assert estimate_rating(chess.Board(), line) == 1100 + 250 + 200
+    assert win_chances(0) == 0 and win_chances(1000) > 0.9
+    print(f"✅ Themes: {themes}")
+
+
+def test_puzzle_ids():
+    """Test that IDs are stable and fit the pack's ID field"""
+    print("🧪 Testing puzzle IDs...")
+    first = puzzle_id('https://example.org/a', 6)
+    assert first == puzzle_id('https://example.org/a', 6)
+    assert first != puzzle_id('https://example.org/a', 7)
+    assert len(first) == 8
+    print(f"✅ ID: {first}")
+
+
+def test_checkpoint_rollback():
+    """Test that resuming drops puzzles written after the last checkpoint"""
+    print("🧪 Testing checkpoint rollback...")
+    pack_path = _temp_path('.pack')
+    checkpoint_path = _temp_path('.json')
+    puzzle = {
+        'id': 'abc', 'fen': chess.STARTING_FEN, 'moves': ['e2e4'],
+        'rating': 1200, 'themes': ['opening']
+    }
+    try:
+        PuzzlePack.write(pack_path, [dict(puzzle, id=f'p{i}') for i in range(5)])
+        with open(checkpoint_path, 'w') as f:
+            json.dump({'done': [0, 120], 'games': 2, 'puzzles': 3, 'pack_count': 3}, f)
+
+        miner = TacticMiner('games.pgn', pack_path, checkpoint_path)
+        miner._load_checkpoint()
+        assert miner.done == {0, 120} and miner.games == 2
+        with PuzzlePack(pack_path) as pack:
+            assert len(pack) == 3
+            assert pack.get_id(2) == 'p2'
+        assert os.path.getsize(pack_path) == 16 + 3 * 132
+
+        PuzzlePack.append(pack_path, [puzzle])
+        with PuzzlePack(pack_path) as pack:
+            assert len(pack) == 4 and pack.get_id(3) == 'abc'
+        print("✅ Rollback works")
+    finally:
+        for path in (pack_path, checkpoint_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+
+def test_mine_game():
+    """Test the mining loop: blunder detection, unique-move lines and the winning check"""
+    print("🧪 Testing mining with a scripted engine...")
+    game = chess.pgn.read_game(io.StringIO(PGN))
+    blunder = _fen_after("e4 e5 Qh5 Nc6 Bc4 Nf6")
+    engine = ScriptedEngine(
+        scores={blunder: chess.engine.Mate(1)},
+        lines={blunder: [('h5f7', chess.engine.Mate(1)), ('c4f7', chess.engine.Cp(-50))]})
+    puzzles = mine_game(engine, game, MinerSettings(), 'https://example.org/a')
+    assert len(puzzles) == 1
+    puzzle = puzzles[0]
+    assert puzzle['moves'] == ['h5f7'] and puzzle['last_move_san'] == 'Nf6'
+    assert puzzle['id'] == puzzle_id('https://example.org/a', 5)
+    assert 'mateIn1' in puzzle['themes']
+
+    # Two equally good moves: not a puzzle
+    engine.lines[blunder] = [('h5f7', chess.engine.Mate(1)), ('c4f7', chess.engine.Mate(2))]
+    assert mine_game(engine, game, MinerSettings(), 'a') == []
+
+    # The line stops once the solver's best move no longer wins
+    board = chess.Board()
+    board.push_san('e4')
+    board.push_san('d5')
+    engine = ScriptedEngine(
+        lines={board.board_fen(): [('e4d5', chess.engine.Cp(900)), ('b1c3', chess.engine.Cp(0))],
+               _fen_after("e4 d5 exd5 Qxd5"): [('b1c3', chess.engine.Cp(20)), ('g1f3', chess.engine.Cp(-800))]},
+        replies={_fen_after("e4 d5 exd5"): 'd8d5'})
+    line = extract_line(engine, board, MinerSettings())
+    assert [m.uci() for m in line] == ['e4d5']
+    print(f"✅ Mined {puzzle['moves']} after {puzzle['last_move_san']}")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("⛏️  TACTIC MINER TESTS")
+    print("="*60 + "\n")
+
+    test_game_offsets()
+    test_line_classification()
+    test_puzzle_ids()
+    test_mine_game()
+    test_checkpoint_rollback()
+
+    print("\n🎉 All tactic miner tests passed!")
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Test batched taunt pre-generation"""
+
+import json
+import sys
+import time
+from types import SimpleNamespace
+sys.path.insert(0, 'src')
+
+import chess
+
+from ai.ai_opponent import AIOpponent
+from ai.llm_cache import LLMCache
+from ai.llm_gateway import LLMGateway
+from ai.taunt_pool import TauntPool, parse_batch
+
+
+class BatchClient:
+    """Stands in for the OpenAI client: answers batch prompts with JSON"""
+
+    def __init__(self, per_kind=5):
+        self.per_kind = per_kind
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, messages, **kwargs):
+        self.calls += 1
+        prompt = messages[-1]['content']
+        kinds = [line.split(':')[0] for line in prompt.splitlines()[:-1]]
+        reply = {kind: [f"👻 {kind} taunt {self.calls}.{i}" for i in range(self.per_kind)] for kind in kinds}
+        message = SimpleNamespace(content=f"```json\n{json.dumps(reply)}\n```")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+class JunkClient(BatchClient):
+    """Replies that parse_batch rejects"""
+
+    def _create(self, messages, **kwargs):
+        self.calls += 1
+        message = SimpleNamespace(content="Boo! {not json")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _wait_for(predicate, timeout=2.0):
+    end = time.monotonic() + timeout
+    while time.monotonic() < end and not predicate():
+        time.sleep(0.01)
+    return predicate()
+
+
+def test_parse_batch():
+    """Test tolerant parsing of the structured reply"""
+    print("🧪 Testing batch parsing...")
+    text = 'Sure!\n```json\n{"blunder": ["Boo!", "", 3, "' + 'x' * 200 + '"], "general": "oops"}\n```'
+    assert parse_batch(text, ['blunder', 'general', 'mistake']) == {'blunder': ['Boo!']}
+    assert parse_batch("no json here", ['blunder']) == {}
+    assert parse_batch("{broken", ['blunder']) == {}
+    print("✅ Malformed replies ignored")
+
+
+def test_pool_refills_in_batches():
+    """Test one request per batch, zero-wait takes and low-water refills"""
+    print("🧪 Testing pools...")
+    client = BatchClient()
+    pool = TauntPool(LLMGateway(client), {'blunder': 'Mock a blunder', 'general': 'Gloat'}, "Be spooky",
+                     batch_size=5, low_water=2)
+    pool.fill()
+    pool.fill()  # Already refilling: no second request
+    assert _wait_for(lambda: pool.size('blunder') == 5 and pool.size('general') == 5)
+    assert client.calls == 1
+
+    served = []
+    for _ in range(3):
+        start = time.perf_counter()
+        served.append(pool.take('blunder'))
+        assert time.perf_counter() - start < 0.01
+    assert all(t.startswith("👻 blunder") for t in served) and len(set(served)) == 3
+    assert _wait_for(lambda: pool.size('blunder') == 7)  # Hit low water: one more batch
+    assert client.calls == 2
+    assert pool.take('unknown') is None
+    print(f"✅ {client.calls} requests for {len(served)} taunts, pools topped up")
+
+
+def test_backoff_after_bad_batches():
+    """Test that unusable replies back off, then stop refilling, instead of a batch per event"""
+    print("🧪 Testing refill backoff...")
+    client = JunkClient()
+    pool = TauntPool(LLMGateway(client), {'blunder': 'Mock a blunder'}, "Be spooky",
+                     retry_after=0.1, max_failures=2)
+    pool.fill()
+    assert _wait_for(lambda: pool.failures == 1)
+    for _ in range(10):
+        assert pool.take('blunder') is None
+    assert client.calls == 1, "backing off"
+
+    time.sleep(0.15)
+    pool.take('blunder')
+    assert _wait_for(lambda: pool.failures == 2)
+    time.sleep(0.3)
+    for _ in range(10):
+        pool.take('blunder')
+    time.sleep(0.05)
+    assert client.calls == 2, "given up after max_failures"
+    print(f"✅ {client.calls} batch requests for 21 events")
+
+
+def test_opponent_uses_pool():
+    """Test that the opponent's move taunts come from the pool"""
+    print("🧪 Testing opponent taunts...")
+    client = BatchClient(per_kind=10)
+    ai = AIOpponent(personality='spooky', gateway=LLMGateway(client), cache=LLMCache(':memory:'))
+    ai.taunt_pool.fill()  # What start() does at game start
+    assert _wait_for(lambda: ai.taunt_pool.size('general') == 10)
+
+    board = chess.Board()
+    board.push_san('e4')
+    taunts = []
+    for _ in range(20):
+        assert _wait_for(lambda: ai.taunt_pool.size('general') > 0)  # A move's worth of time
+        taunts.append(ai._pending_taunt('general', board, 'e4'))
+    assert all(p.ready() and p.get().startswith("👻 general") for p in taunts)
+    _wait_for(lambda: ai.taunt_pool.size('general') > 2)
+    assert client.calls <= 3, f"{client.calls} requests for 20 taunts"
+
+    silent = AIOpponent(personality='spooky', gateway=LLMGateway())
+    assert silent._pending_taunt('blunder').get() in AIOpponent.TAUNTS['blunder'][1]
+    print(f"✅ 20 taunts from {client.calls} requests")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🎃 TAUNT POOL TESTS")
+    print("="*60 + "\n")
+
+    test_parse_batch()
+    test_pool_refills_in_batches()
+    test_backoff_after_bad_batches()
+    test_opponent_uses_pool()
+
+    print("\n🎉 All taunt pool tests passed!")
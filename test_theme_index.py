@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""Test the theme/rating puzzle index"""
+
+import os
+import random
+import sys
+import tempfile
+sys.path.insert(0, 'src')
+
+from puzzles.puzzle_pack import PuzzlePack
+from puzzles.theme_index import ThemeIndex
+
+THEME_POOL = ['fork', 'pin', 'endgame', 'middlegame', 'mate', 'mateIn2', 'skewer']
+START_FEN = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1'
+
+
+def _make_puzzles(count, seed=7):
+    rng = random.Random(seed)
+    return [{
+        'id': f'p{i:05d}',
+        'fen': START_FEN,
+        'moves': ['e7e5'],
+        'rating': rng.randint(600, 2800),
+        'themes': rng.sample(THEME_POOL, rng.randint(0, 3))
+    } for i in range(count)]
+
+
+def _brute_force(puzzles, themes, lo, hi):
+    return sorted(
+        i for i, p in enumerate(puzzles)
+        if lo <= p['rating'] <= hi and all(t in p['themes'] for t in themes)
+    )
+
+
+def _with_index(puzzles, check):
+    fd, path = tempfile.mkstemp(suffix='.pack')
+    os.close(fd)
+    try:
+        PuzzlePack.write(path, puzzles)
+        with PuzzlePack(path) as pack:
+            check(pack, ThemeIndex.load_or_build(pack))
+    finally:
+        for p in (path, path + '.idx'):
+            if os.path.exists(p):
+                os.remove(p)
+
+
+def test_queries_match_scan():
+    """Test that index queries agree with a full scan"""
+    print("🧪 Testing index queries...")
+    puzzles = _make_puzzles(3000)
+
+    def check(pack, index):
+        for themes, lo, hi in [((), 0, 9999), (('fork',), 1600, 1900),
+                               (('fork', 'endgame'), 1600, 1900),
+                               (('mate', 'pin', 'skewer'), 0, 9999),
+                               (('nonexistent',), 0, 9999), (('pin',), 3000, 3100)]:
+            expected = _brute_force(puzzles, themes, lo, hi)
+            assert index.count(themes, lo, hi) == len(expected), (themes, lo, hi)
+            assert sorted(index.query(themes, lo, hi)) == expected, (themes, lo, hi)
+            sample = index.sample(themes, lo, hi)
+            assert (sample is None) == (not expected)
+            assert sample is None or sample in expected
+    _with_index(puzzles, check)
+    print("✅ Queries match a full scan")
+
+
+def test_sampling_is_uniform():
+    """Test that sampling covers all matches"""
+    print("🧪 Testing sampling...")
+    puzzles = _make_puzzles(500)
+
+    def check(pack, index):
+        expected = set(_brute_force(puzzles, ('fork', 'endgame'), 0, 9999))
+        rng = random.Random(1)
+        seen = {index.sample(('fork', 'endgame'), rng=rng) for _ in range(len(expected) * 30)}
+        assert seen == expected, f"Sampled {len(seen)} of {len(expected)} matches"
+    _with_index(puzzles, check)
+    print("✅ Sampling reaches every match")
+
+
+def test_reload():
+    """Test that a saved index loads back identically"""
+    print("🧪 Testing save/load...")
+    puzzles = _make_puzzles(1000)
+
+    def check(pack, index):
+        loaded = ThemeIndex.load(pack.path + '.idx')
+        assert list(loaded.by_rating) == list(index.by_rating)
+        assert loaded.theme_counts() == index.theme_counts()
+    _with_index(puzzles, check)
+    print("✅ Save/load works")
+
+
+def test_rebuilt_pack_reindexed():
+    """Test that a pack rebuilt with the same puzzle count gets a fresh index"""
+    print("🧪 Testing stale index...")
+    puzzles = _make_puzzles(500)
+    fd, path = tempfile.mkstemp(suffix='.pack')
+    os.close(fd)
+    try:
+        PuzzlePack.write(path, puzzles)
+        with PuzzlePack(path) as pack:
+            ThemeIndex.load_or_build(pack)
+        reordered = puzzles[::-1]
+        PuzzlePack.write(path, reordered)
+        with PuzzlePack(path) as pack:
+            index = ThemeIndex.load_or_build(pack)
+            assert sorted(index.query(('fork',), 1600, 1900)) == _brute_force(reordered, ('fork',), 1600, 1900)
+            assert ThemeIndex.load(path + '.idx').fingerprint == pack.fingerprint()
+        print("✅ Rebuilt pack detected")
+    finally:
+        for p in (path, path + '.idx'):
+            if os.path.exists(p):
+                os.remove(p)
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("🗂️  THEME INDEX TESTS")
+    print("="*60 + "\n")
+
+    test_queries_match_scan()
+    test_sampling_is_uniform()
+    test_reload()
+    test_rebuilt_pack_reindexed()
+
+    print("\n🎉 All theme index tests passed!")
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Test the Glicko puzzle rating and adaptive selection"""
+
+import os
+import sys
+import tempfile
+sys.path.insert(0, 'src')
+
+from puzzles.user_rating import UserRating, expected_score
+from puzzles.puzzle_pack import PuzzlePack
+from puzzles.review_queue import ReviewQueue
+from puzzles.theme_index import ThemeIndex
+from puzzles.endless_mode import EndlessMode
+from test_theme_index import _make_puzzles
+
+
+def _temp_path(suffix):
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    os.remove(path)
+    return path
+
+
+def test_updates():
+    """Test that solving raises and failing lowers the rating"""
+    print("🧪 Testing rating updates...")
+    rating = UserRating(_temp_path('.json'))
+    assert rating.rating == 1500 and rating.rd == 350
+
+    change = rating.update(1500, solved=True)
+    assert change > 0 and rating.rd < 350
+    rd_after_one = rating.rd
+
+    change = rating.update(1500, solved=False)
+    assert change < 0 and rating.rd < rd_after_one
+
+    # Beating a much easier puzzle barely moves a settled rating
+    for _ in range(100):
+        rating.update(rating.rating, solved=True)
+        rating.update(rating.rating, solved=False)
+    assert rating.rd <= 50
+    assert abs(rating.update(rating.rating - 800, solved=True)) < 1
+    print("✅ Rating updates work")
+
+
+def test_target_rating():
+    """Test that the target puzzle gives the requested success rate"""
+    print("🧪 Testing target rating...")
+    rating = UserRating(_temp_path('.json'))
+    rating.rating = 1700
+    target = rating.target_puzzle_rating(0.65)
+    assert target < 1700
+    assert abs(expected_score(1700, target, UserRating.PUZZLE_RD) - 0.65) < 1e-9
+    low, high = rating.target_range(0.65)
+    assert low < target < high
+    print(f"✅ Target for 1700 at 65%: {target:.0f}")
+
+
+def test_persistence():
+    """Test that the rating survives a restart"""
+    print("🧪 Testing persistence...")
+    path = _temp_path('.json')
+    try:
+        rating = UserRating(path)
+        rating.update(1800, solved=True)
+        rating.save()
+
+        reloaded = UserRating(path)
+        assert abs(reloaded.rating - rating.rating) < 0.01
+        assert reloaded.puzzles == 1
+        print("✅ Persistence works")
+    finally:
+        os.remove(path)
+
+
+def test_adaptive_selection():
+    """Test that endless mode picks puzzles near the target rating"""
+    print("🧪 Testing adaptive selection...")
+    path = _temp_path('.pack')
+    try:
+        PuzzlePack.write(path, _make_puzzles(3000))
+        with PuzzlePack(path) as pack:
+            mode = EndlessMode({'adaptive_puzzles': True})
+            mode.user_rating = UserRating(_temp_path('.json'))
+            mode.user_rating.rating = 2000
+            mode.user_rating.rd = 60
+            mode.pack = pack
+            mode.index = ThemeIndex.build(pack)
+
+            low, high = mode.user_rating.target_range()
+            for _ in range(50):
+                rating = mode._fetch_puzzle()['rating']
+                assert low <= rating <= high, f"{rating} outside {low}-{high}"
+        print(f"✅ Puzzles selected within {low}-{high}")
+    finally:
+        os.remove(path)
+
+
+def test_reviews_are_unrated():
+    """Test that re-solving a review puzzle reschedules it without moving the rating"""
+    print("🧪 Testing review attempts...")
+    mode = EndlessMode({})
+    mode.user_rating = UserRating(_temp_path('.json'))
+    mode.reviews = ReviewQueue(_temp_path('.jsonl'))
+    puzzle = {'id': 'abc12', 'fen': '8/8/8/8/8/8/8/K6k w - - 0 1', 'moves': ['a1a2'],
+              'rating': 1500, 'themes': ['endgame']}
+
+    assert mode._record_result(puzzle, solved=False) < 0
+    rating, puzzles = mode.user_rating.rating, mode.user_rating.puzzles
+    due = mode.reviews.items['abc12']['due']
+
+    assert mode._record_result({**puzzle, 'review': True}, solved=True) is None
+    assert mode.user_rating.rating == rating and mode.user_rating.puzzles == puzzles
+    assert mode.reviews.items['abc12']['repetitions'] == 1
+    assert mode.reviews.items['abc12']['due'] >= due
+    print("✅ Reviews rescheduled, rating untouched")
+
+
+if __name__ == "__main__":
+    print("\n" + "="*60)
+    print("📈 USER RATING TESTS")
+    print("="*60 + "\n")
+
+    test_updates()
+    test_target_rating()
+    test_persistence()
+    test_adaptive_selection()
+    test_reviews_are_unrated()
+
+    print("\n🎉 All user rating tests passed!")
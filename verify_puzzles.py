@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""Check every puzzle in a pack with Stockfish and report broken or ambiguous ones
+
+Results are appended to a JSON-lines report (one line per puzzle), so a
+stopped run picks up where it left off:
+
+    python3 verify_puzzles.py puzzles.pack [report.jsonl] [workers]
+"""
+
+import sys
+sys.path.insert(0, 'src')
+
+from puzzles.puzzle_verifier import PuzzleVerifier
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python3 verify_puzzles.py <puzzles.pack> [report.jsonl] [workers]")
+        sys.exit(1)
+
+    pack_path = sys.argv[1]
+    report_path = sys.argv[2] if len(sys.argv) > 2 else None
+    workers = int(sys.argv[3]) if len(sys.argv) > 3 else None
+
+    verifier = PuzzleVerifier(pack_path, report_path, workers=workers)
+    print(f"🔍 Verifying {pack_path} (report: {verifier.report_path})...")
+    try:
+        stats = verifier.run()
+    except (RuntimeError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n⚠️  Stopped; run again to resume")
+        sys.exit(1)
+
+    print(f"✅ {stats['ok']} ok, {stats['ambiguous']} ambiguous, {stats['broken']} broken "
+          f"({stats['per_second']:.1f} puzzles/s)")
+
+
+if __name__ == "__main__":
+    main()